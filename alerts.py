@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Envio Assíncrono de Alertas do Bot DreadmystDB
+A verificação só enfileira os alertas; cada destino (console, arquivo de log, JSONL,
+webhook) tem a sua fila limitada e uma thread que a esvazia em lotes, então uma rajada
+de correspondências ou um webhook lento não atrasam a próxima busca.
+
+Quando a fila de um destino enche, vale a política configurada para ele:
+    block        A verificação espera a fila andar (até BLOCK_TIMEOUT; depois descarta)
+    drop_new     Descarta o alerta novo
+    drop_oldest  Descarta o alerta mais antigo da fila
+    coalesce     Agrupa os alertas excedentes em um único resumo
+
+Os destinos são compartilhados pelos perfis do processo (um arquivo de log, uma thread
+e um handle por destino); as estatísticas das filas entram nas métricas (metrics.py).
+"""
+
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+from metrics import RollingHistogram, register_collector
+
+# Alertas que cabem na fila de cada destino
+DEFAULT_QUEUE_SIZE = 1000
+# Máximo de alertas escritos/enviados de uma vez
+DEFAULT_BATCH_SIZE = 100
+# Espera da thread por mais alertas antes de escrever um lote incompleto (segundos)
+LINGER = 0.005
+# Espera máxima da política 'block' antes de descartar o alerta (segundos)
+BLOCK_TIMEOUT = 1.0
+# Buffer do handle dos arquivos de alertas
+FILE_BUFFER_SIZE = 64 * 1024
+# Nomes de itens listados no resumo da política 'coalesce'
+COALESCE_NAMES = 10
+
+POLICIES = ('block', 'drop_new', 'drop_oldest', 'coalesce')
+
+_SINKS: Dict[tuple, 'AlertSink'] = {}
+_SINKS_LOCK = threading.Lock()
+
+
+class AlertSink:
+    """
+    Destino de alertas com fila limitada, esvaziada em lotes por uma thread própria
+
+    Subclasses implementam write_batch (e release, se guardam recursos abertos).
+    """
+
+    kind = 'sink'
+    default_policy = 'block'
+
+    def __init__(self, target: Optional[str] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 policy: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        policy = policy or self.default_policy
+        if policy not in POLICIES:
+            raise ValueError(f"Política de fila inválida para {self.kind}: {policy} (use {', '.join(POLICIES)})")
+        self.target = target
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self.batch_size = max(1, int(batch_size))
+        self.queue: deque = deque()
+        self.stats = {'queued': 0, 'sent': 0, 'dropped': 0, 'coalesced': 0, 'failed': 0,
+                      'batches': 0, 'max_depth': 0}
+        self.write_seconds = RollingHistogram()
+        self.refs = 0
+        self._coalesced: List[dict] = []
+        # Verificações esperando espaço na fila (política 'block')
+        self._blocked = 0
+        self._cond = threading.Condition()
+        # Serializa as escritas da thread e do modo síncrono
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}:{self.target}" if self.target else self.kind
+
+    def offer(self, record: dict) -> bool:
+        """Enfileira um alerta aplicando a política da fila cheia; False se ele foi descartado"""
+        with self._cond:
+            if len(self.queue) >= self.queue_size:
+                if self.policy == 'coalesce':
+                    self._coalesced.append(record)
+                    self.stats['coalesced'] += 1
+                    return True
+                if self.policy == 'drop_oldest':
+                    self.queue.popleft()
+                    self.stats['dropped'] += 1
+                elif self.policy == 'block':
+                    deadline = time.monotonic() + BLOCK_TIMEOUT
+                    self._blocked += 1
+                    while len(self.queue) >= self.queue_size and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or self._thread is None:
+                            break
+                        self._cond.wait(remaining)
+                    self._blocked -= 1
+                if len(self.queue) >= self.queue_size:
+                    self.stats['dropped'] += 1
+                    return False
+            self.queue.append(record)
+            self.stats['queued'] += 1
+            depth = len(self.queue)
+            if depth > self.stats['max_depth']:
+                self.stats['max_depth'] = depth
+            # Só acorda a thread quando a fila sai do vazio (ela espera LINGER pelo resto do lote)
+            if depth == 1:
+                self._cond.notify_all()
+            return True
+
+    def start(self):
+        """Inicia a thread que esvazia a fila (na primeira vez que for necessária)"""
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name=f"alertas-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[dict]:
+        """Retira um lote da fila (com o resumo dos alertas agrupados, se houver); chamar com _cond"""
+        batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+        if self._coalesced and len(batch) < self.batch_size:
+            batch.append(self.summary_record(self._coalesced))
+            self._coalesced = []
+        if self._blocked:
+            self._cond.notify_all()
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self.queue and not self._coalesced and not self._closed:
+                    self._cond.wait()
+                if not self.queue and not self._coalesced:
+                    return
+                if len(self.queue) < self.batch_size and not self._closed and not self._blocked:
+                    self._cond.wait(LINGER)
+                batch = self._next_batch()
+            self._deliver(batch)
+
+    def drain(self):
+        """Escreve na thread atual tudo o que estiver na fila"""
+        while True:
+            with self._cond:
+                if not self.queue and not self._coalesced:
+                    return
+                batch = self._next_batch()
+            self._deliver(batch)
+
+    def _deliver(self, batch: List[dict]):
+        start = time.perf_counter()
+        with self._write_lock:
+            try:
+                self.write_batch(batch)
+                outcome = 'sent'
+            except Exception as e:
+                print(f"Erro ao enviar alertas para {self.name}: {e}", file=sys.stderr)
+                outcome = 'failed'
+        with self._cond:
+            self.stats[outcome] += len(batch)
+            self.stats['batches'] += 1
+            self.write_seconds.add(time.perf_counter() - start)
+
+    @staticmethod
+    def summary_record(records: Sequence[dict]) -> dict:
+        """Alerta único que representa os alertas agrupados pela política 'coalesce'"""
+        names = [record.get('name', '?') for record in records[:COALESCE_NAMES]]
+        more = f" e mais {len(records) - len(names)}" if len(records) > len(names) else ""
+        message = (f"\n{'=' * 60}\n📦 {len(records)} alertas agrupados (fila cheia): "
+                   f"{', '.join(names)}{more}\n{'=' * 60}\n")
+        return {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'coalesced': len(records),
+                'names': names, 'urls': [record.get('url') for record in records], 'message': message}
+
+    def write_batch(self, records: List[dict]):
+        raise NotImplementedError
+
+    def release(self):
+        """Libera os recursos do destino (arquivos, sessões) depois do último lote"""
+
+    def close(self, timeout: float = 5.0):
+        """Escreve os alertas pendentes e encerra a thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.drain()
+        self.release()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Profundidade atual da fila, contadores e p95 da escrita dos lotes"""
+        with self._cond:
+            return {'depth': len(self.queue) + len(self._coalesced), **self.stats,
+                    'write_p95': self.write_seconds.snapshot()['p95']}
+
+
+class ConsoleSink(AlertSink):
+    """Imprime os alertas (um lote por escrita no stdout)"""
+
+    kind = 'console'
+
+    def write_batch(self, records: List[dict]):
+        sys.stdout.write("".join(record['message'] + "\n" for record in records))
+        sys.stdout.flush()
+
+
+class FileSink(AlertSink):
+    """Acrescenta os alertas ao arquivo de log por um handle aberto durante toda a execução"""
+
+    kind = 'file'
+
+    def __init__(self, target: str, **options):
+        super().__init__(target, **options)
+        self._file = None
+
+    def write_batch(self, records: List[dict]):
+        if self._file is None:
+            self._file = open(self.target, 'a', encoding='utf-8', buffering=FILE_BUFFER_SIZE)
+        self._file.write("".join(f"\n{record['time']}\n{record['message']}\n" for record in records))
+        self._file.flush()
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlSink(FileSink):
+    """Um alerta por linha em JSON (sem o texto formatado), para outros programas lerem"""
+
+    kind = 'jsonl'
+
+    def write_batch(self, records: List[dict]):
+        if self._file is None:
+            self._file = open(self.target, 'a', encoding='utf-8', buffering=FILE_BUFFER_SIZE)
+        self._file.write("".join(
+            json.dumps({key: value for key, value in record.items() if key != 'message'}, ensure_ascii=False) + "\n"
+            for record in records
+        ))
+        self._file.flush()
+
+
+class WebhookSink(AlertSink):
+    """Envia cada lote em um POST JSON ({"alerts": [...]}) para a URL configurada"""
+
+    kind = 'webhook'
+    default_policy = 'coalesce'
+
+    def __init__(self, target: str, timeout: float = 10.0, **options):
+        super().__init__(target, **options)
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def write_batch(self, records: List[dict]):
+        response = self.session.post(self.target, json={'alerts': records}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def release(self):
+        self.session.close()
+
+
+SINK_CLASSES = {sink_class.kind: sink_class for sink_class in (ConsoleSink, FileSink, JsonlSink, WebhookSink)}
+
+
+def acquire_sink(kind: str, target: Optional[str] = None, **options) -> AlertSink:
+    """
+    Destino compartilhado do processo para (tipo, alvo), criado na primeira vez
+
+    As opções (tamanho da fila, política, lote) valem a partir de quem cria o destino.
+    """
+    with _SINKS_LOCK:
+        sink = _SINKS.get((kind, target))
+        if sink is None:
+            sink_class = SINK_CLASSES[kind]
+            sink = _SINKS[(kind, target)] = sink_class(target, **options) if target else sink_class(**options)
+        sink.refs += 1
+        return sink
+
+
+def release_sink(sink: AlertSink):
+    """Devolve um destino; o último a devolver escreve os pendentes e o fecha"""
+    with _SINKS_LOCK:
+        sink.refs -= 1
+        if sink.refs > 0:
+            return
+        _SINKS.pop((sink.kind, sink.target), None)
+    sink.close()
+
+
+def sink_stats() -> Dict[str, Dict[str, float]]:
+    """Estatísticas das filas de todos os destinos abertos no processo"""
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+    return {sink.name: sink.snapshot() for sink in sinks}
+
+
+def close_all_sinks():
+    """Escreve os alertas pendentes de todos os destinos (chamado também ao sair do processo)"""
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+        _SINKS.clear()
+    for sink in sinks:
+        sink.close()
+
+
+def _prometheus_lines(stats: Dict[str, Dict[str, float]]) -> List[str]:
+    if not stats:
+        return []
+    lines = ["# HELP dreadbot_alert_queue_depth Alertas aguardando envio em cada destino",
+             "# TYPE dreadbot_alert_queue_depth gauge"]
+    lines.extend(f'dreadbot_alert_queue_depth{{sink="{sink}"}} {values["depth"]}' for sink, values in stats.items())
+    lines += ["# HELP dreadbot_alerts_total Alertas por destino e resultado",
+              "# TYPE dreadbot_alerts_total counter"]
+    for sink, values in stats.items():
+        for outcome in ('sent', 'dropped', 'coalesced', 'failed'):
+            lines.append(f'dreadbot_alerts_total{{sink="{sink}",outcome="{outcome}"}} {values[outcome]}')
+    return lines
+
+
+register_collector('alerts', sink_stats, _prometheus_lines)
+atexit.register(close_all_sinks)
+
+
+class AlertDispatcher:
+    """
+    Alertas de um monitor: formata o registro e o entrega aos destinos configurados
+
+    Com asynchronous=False os destinos são escritos na própria chamada (como antes),
+    o que é útil em scripts e benchmarks que capturam o stdout.
+    """
+
+    def __init__(self, sinks: Sequence[AlertSink], asynchronous: bool = True):
+        self.sinks = list(sinks)
+        self.asynchronous = asynchronous
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'AlertDispatcher':
+        """
+        Destinos a partir do config do monitor
+
+        alert_method (console/file/both) e log_file continuam valendo; alert_jsonl e
+        alert_webhook acrescentam destinos. alert_queue_size, alert_batch_size e
+        alert_policy ({"webhook": "coalesce", ...}) ajustam as filas.
+        """
+        method = config.get('alert_method', 'console')
+        policies = config.get('alert_policy') or {}
+        options = {'queue_size': config.get('alert_queue_size') or DEFAULT_QUEUE_SIZE,
+                   'batch_size': config.get('alert_batch_size') or DEFAULT_BATCH_SIZE}
+        wanted = []
+        if method in ('console', 'both'):
+            wanted.append(('console', None))
+        if method in ('file', 'both'):
+            wanted.append(('file', config.get('log_file', 'alerts.log')))
+        if config.get('alert_jsonl'):
+            wanted.append(('jsonl', config['alert_jsonl']))
+        if config.get('alert_webhook'):
+            wanted.append(('webhook', config['alert_webhook']))
+        sinks = [acquire_sink(kind, target, policy=policies.get(kind), **options) for kind, target in wanted]
+        return cls(sinks, asynchronous=config.get('alert_async', True))
+
+    def submit(self, record: dict):
+        """Entrega o alerta a cada destino (enfileira ou, no modo síncrono, escreve)"""
+        for sink in self.sinks:
+            if self.asynchronous:
+                sink.start()
+                sink.offer(record)
+            else:
+                sink.offer(record)
+                sink.drain()
+
+    def queue_stats(self) -> Dict[str, Dict[str, float]]:
+        """Estatísticas das filas dos destinos deste monitor"""
+        return {sink.name: sink.snapshot() for sink in self.sinks}
+
+    def summary(self) -> str:
+        """Resumo de uma linha: profundidade e descartes de cada fila"""
+        parts = []
+        for name, stats in self.queue_stats().items():
+            part = f"{name} {stats['depth']} na fila (máx. {stats['max_depth']})"
+            lost = stats['dropped'] + stats['failed']
+            if lost or stats['coalesced']:
+                part += f", {stats['dropped']} descartados, {stats['coalesced']} agrupados, {stats['failed']} com erro"
+            parts.append(part)
+        return "; ".join(parts)
+
+    def close(self):
+        """Devolve os destinos (o último monitor a usá-los escreve os alertas pendentes)"""
+        sinks, self.sinks = self.sinks, []
+        for sink in sinks:
+            release_sink(sink)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Arquivo Histórico de Anúncios do Bot DreadmystDB
+Grava todos os itens extraídos em cada verificação (não só os que passam nos filtros)
+em um banco SQLite, indexado por slot, qualidade, stat normalizado, nível, preço e
+horários de primeira/última aparição, para consultas rápidas sobre o histórico.
+
+Uso: python archive.py --quality Holy --slot chest --stat "STR>=40" --max-price 100000 --dias 7
+"""
+
+import re
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from bot import TradeMonitor, Item
+
+DEFAULT_ARCHIVE_FILE = "trade_archive.db"
+
+# Qualidade do item (primeira palavra do nome) -> valor usado no filtro "quality" do site
+ITEM_QUALITIES = {'Junk': 1, 'Normal': 2, 'Radiant': 3, 'Blessed': 4, 'Holy': 5, 'Godly': 6}
+
+_STAT_VALUE_RE = re.compile(r'^\+?(\d+)\s+(.+)$')
+_STAT_CONDITION_RE = re.compile(r'^\s*(.+?)\s*(>=|<=|=)\s*(\d+)\s*$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    listing_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    quality INTEGER,
+    slot TEXT,
+    item_level INTEGER,
+    price INTEGER,
+    seller TEXT,
+    affix_quality TEXT,
+    time_left TEXT,
+    url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_stats (
+    listing_id INTEGER NOT NULL,
+    stat TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (listing_id, stat)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_items_slot ON items (slot, quality, last_seen, price);
+CREATE INDEX IF NOT EXISTS idx_items_quality ON items (quality, last_seen, price);
+CREATE INDEX IF NOT EXISTS idx_items_level ON items (item_level);
+CREATE INDEX IF NOT EXISTS idx_items_price ON items (price);
+CREATE INDEX IF NOT EXISTS idx_items_first_seen ON items (first_seen);
+CREATE INDEX IF NOT EXISTS idx_items_last_seen ON items (last_seen);
+CREATE INDEX IF NOT EXISTS idx_item_stats_value ON item_stats (stat, value);
+"""
+
+
+def item_quality(name: str) -> Optional[int]:
+    """Qualidade do item a partir do nome ("Holy Breastplate..." -> 5)"""
+    return ITEM_QUALITIES.get(name.split(' ', 1)[0]) if name else None
+
+
+class ItemArchive:
+    """
+    Arquivo SQLite de todos os anúncios vistos
+
+    Os itens são acumulados com add() e gravados em lote, em uma única transação,
+    por flush() (uma vez por verificação). A conexão é aberta no primeiro uso, na
+    thread que vai usá-la (a GUI cria o monitor em uma thread e verifica em outra).
+    """
+
+    def __init__(self, path: str = DEFAULT_ARCHIVE_FILE,
+                 normalize_stat: Callable[[str], str] = TradeMonitor.normalize_stat):
+        self.path = path
+        self.normalize_stat = normalize_stat
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Item] = {}
+        self._last_batch: List[int] = []
+        # Nome do stat no card -> nome normalizado (poucos nomes distintos, milhões de stats)
+        self._stat_names: Dict[str, str] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def add(self, item: Item):
+        """Acumula um item para a próxima gravação"""
+        self._pending[item.listing_id] = item
+
+    def add_many(self, items: Iterable[Item]):
+        for item in items:
+            self.add(item)
+
+    def stat_values(self, item: Item) -> List[Tuple[str, int]]:
+        """
+        Stats do item como pares (nome normalizado, valor)
+
+        Afixos que normalizam para o mesmo stat têm os valores somados, como no
+        vetor de stats usado pelos filtros (bot.stat_vector).
+        """
+        values: Dict[str, int] = {}
+        for stat in item.stats:
+            match = _STAT_VALUE_RE.match(stat.strip())
+            if match:
+                name = match.group(2)
+                normalized = self._stat_names.get(name)
+                if normalized is None:
+                    normalized = self._stat_names[name] = self.normalize_stat(name)
+                values[normalized] = values.get(normalized, 0) + int(match.group(1))
+        return list(values.items())
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """
+        Grava os itens acumulados em uma única transação
+
+        Itens novos são inseridos com first_seen = last_seen = now; os já arquivados
+        só têm last_seen, preço e tempo restante atualizados.
+
+        Returns:
+            Número de itens gravados
+        """
+        if not self._pending:
+            return 0
+        now = time.time() if now is None else now
+        items = [item for listing_id, item in self._pending.items() if listing_id.isdigit()]
+        self._pending = {}
+
+        rows = []
+        stat_rows = []
+        for item in items:
+            listing_id = int(item.listing_id)
+            rows.append((listing_id, item.name, item_quality(item.name), item.slot, item.level,
+                         item.gold, item.seller, item.affix_quality, item.time_left, item.url,
+                         now, now))
+            stat_rows.extend((listing_id, stat, value) for stat, value in self.stat_values(item))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (listing_id) DO UPDATE SET last_seen = excluded.last_seen, "
+                "price = excluded.price, time_left = excluded.time_left",
+                rows
+            )
+            self.conn.executemany("INSERT OR IGNORE INTO item_stats VALUES (?, ?, ?)", stat_rows)
+        self._last_batch = [row[0] for row in rows]
+        return len(rows)
+
+    def touch_last_batch(self, now: Optional[float] = None):
+        """Atualiza last_seen dos itens da última gravação (página sem alterações: continuam listados)"""
+        if not self._last_batch:
+            return
+        now = time.time() if now is None else now
+        with self.conn:
+            self.conn.executemany("UPDATE items SET last_seen = ? WHERE listing_id = ?",
+                                  [(now, listing_id) for listing_id in self._last_batch])
+
+    def query(self, quality: Optional[int] = None, slot: Optional[str] = None,
+              min_level: Optional[int] = None, max_level: Optional[int] = None,
+              min_price: Optional[int] = None, max_price: Optional[int] = None,
+              stats: Optional[List[Tuple[str, str, int]]] = None, since: Optional[float] = None,
+              limit: Optional[int] = 100) -> List[Dict]:
+        """
+        Consulta o arquivo
+
+        Args:
+            quality: Qualidade (1=Junk ... 6=Godly)
+            slot: Slot normalizado (ex: "chest")
+            stats: Condições (stat, operador, valor), com operador ">=", "<=" ou "="
+            since: Só itens vistos a partir deste horário (epoch)
+            limit: Máximo de resultados (None = todos), do visto mais recentemente ao mais antigo
+
+        Returns:
+            Itens como dicts, com os stats em um dict {nome: valor}
+        """
+        where, params = [], []
+        for column, op, value in (('quality', '=', quality), ('slot', '=', slot),
+                                  ('item_level', '>=', min_level), ('item_level', '<=', max_level),
+                                  ('price', '>=', min_price), ('price', '<=', max_price),
+                                  ('last_seen', '>=', since)):
+            if value is not None:
+                where.append(f"i.{column} {op} ?")
+                params.append(value)
+        # Com slot ou qualidade, o índice de items é o mais seletivo e os stats são conferidos
+        # item a item; sem eles, a primeira condição de stat usa o índice (stat, value)
+        driven_by_stat = slot is None and quality is None
+        for stat, op, value in stats or []:
+            if op not in ('>=', '<=', '='):
+                raise ValueError(f"Operador inválido: {op}")
+            if driven_by_stat:
+                where.append(f"i.listing_id IN (SELECT listing_id FROM item_stats WHERE stat = ? AND value {op} ?)")
+                driven_by_stat = False
+            else:
+                where.append(f"EXISTS (SELECT 1 FROM item_stats s WHERE s.listing_id = i.listing_id "
+                             f"AND s.stat = ? AND s.value {op} ?)")
+            params.extend((self.normalize_stat(stat), value))
+
+        sql = "SELECT i.* FROM items i"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY i.last_seen DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        cursor = self.conn.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        results = [dict(zip(columns, row)) for row in cursor]
+        if results:
+            placeholders = ",".join("?" * len(results))
+            stat_map: Dict[int, Dict[str, int]] = {}
+            for listing_id, stat, value in self.conn.execute(
+                    f"SELECT listing_id, stat, value FROM item_stats WHERE listing_id IN ({placeholders})",
+                    [row['listing_id'] for row in results]):
+                stat_map.setdefault(listing_id, {})[stat] = value
+            for row in results:
+                row['stats'] = stat_map.get(row['listing_id'], {})
+        return results
+
+    def summary(self) -> Dict:
+        """Totais do arquivo"""
+        total, first, last = self.conn.execute(
+            "SELECT COUNT(*), MIN(first_seen), MAX(last_seen) FROM items").fetchone()
+        return {'items': total, 'first_seen': first, 'last_seen': last}
+
+    def analyze(self):
+        """Atualiza as estatísticas do SQLite usadas para escolher os índices"""
+        self.conn.execute("ANALYZE")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def parse_stat_condition(text: str) -> Tuple[str, str, int]:
+    """Converte "STR>=40" em ("STR", ">=", 40)"""
+    match = _STAT_CONDITION_RE.match(text)
+    if not match:
+        raise ValueError(f"Condição de stat inválida: {text!r} (use, por exemplo, STR>=40)")
+    return match.group(1), match.group(2), int(match.group(3))
+
+
+def main():
+    """Função principal"""
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Consulta o arquivo histórico de anúncios do Bot DreadmystDB')
+    parser.add_argument('-a', '--arquivo', default=DEFAULT_ARCHIVE_FILE,
+                        help=f'Banco do arquivo (padrão: {DEFAULT_ARCHIVE_FILE})')
+    parser.add_argument('--quality', help='Qualidade (nome, ex: Holy, ou número de 1 a 6)')
+    parser.add_argument('--slot', help='Slot (ex: chest, hands, "main hand")')
+    parser.add_argument('--stat', action='append', default=[], help='Condição de stat, ex: "STR>=40" (pode ser repetido)')
+    parser.add_argument('--min-level', type=int, help='Nível mínimo')
+    parser.add_argument('--max-level', type=int, help='Nível máximo')
+    parser.add_argument('--min-price', type=int, help='Preço mínimo em gold')
+    parser.add_argument('--max-price', type=int, help='Preço máximo em gold')
+    parser.add_argument('--dias', type=float, help='Só itens vistos nos últimos N dias')
+    parser.add_argument('--limite', type=int, default=50, help='Máximo de resultados (padrão: 50)')
+    parser.add_argument('--resumo', action='store_true', help='Mostra apenas os totais do arquivo')
+
+    args = parser.parse_args()
+    archive = ItemArchive(args.arquivo)
+
+    if args.resumo:
+        summary = archive.summary()
+        print(f"📦 {summary['items']} anúncios arquivados")
+        if summary['items']:
+            print(f"   De {datetime.fromtimestamp(summary['first_seen']):%Y-%m-%d %H:%M} "
+                  f"a {datetime.fromtimestamp(summary['last_seen']):%Y-%m-%d %H:%M}")
+        return
+
+    quality = None
+    if args.quality:
+        quality = int(args.quality) if args.quality.isdigit() else ITEM_QUALITIES.get(args.quality.capitalize())
+        if quality is None:
+            parser.error(f"Qualidade desconhecida: {args.quality}")
+    try:
+        stats = [parse_stat_condition(condition) for condition in args.stat]
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    results = archive.query(
+        quality=quality,
+        slot=TradeMonitor.normalize_slot_name(args.slot) if args.slot else None,
+        min_level=args.min_level, max_level=args.max_level,
+        min_price=args.min_price, max_price=args.max_price,
+        stats=stats,
+        since=time.time() - args.dias * 86400 if args.dias else None,
+        limit=args.limite
+    )
+    elapsed = time.perf_counter() - start
+
+    for row in results:
+        stats_text = ", ".join(f"+{value} {stat}" for stat, value in row['stats'].items())
+        price = f"{row['price']:,}g" if row['price'] is not None else "?"
+        print(f"{datetime.fromtimestamp(row['last_seen']):%Y-%m-%d %H:%M}  {row['name']} (iLvl {row['item_level']}) "
+              f"- {price} - {stats_text}")
+        print(f"    {row['url']}")
+    print(f"\n{len(results)} resultado(s) em {elapsed * 1000:.1f}ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
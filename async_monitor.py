@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Motor Assíncrono do Bot de Monitoramento DreadmystDB
+Executa vários perfis de filtro (arquivos de configuração) em um único event loop,
+compartilhando o pool de conexões HTTP. O parse do HTML roda em um executor para
+não bloquear o loop enquanto outras requisições aguardam a rede.
+
+Uso: python async_monitor.py -c perfil1.json -c perfil2.json ...
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Optional
+
+import aiohttp
+
+from bot import TradeMonitor, Item
+from dispatcher import archive_writers, group_by_query
+from metrics import serve_metrics
+from profile_index import ProfileIndex, match_group
+
+# Timeout total de cada requisição (mesmo valor do TradeMonitor)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """
+    Ganchos do aiohttp que medem DNS, conexão e TTFB de cada requisição
+
+    As amostras vão para as métricas passadas em trace_request_ctx (PhaseMetrics do perfil).
+    """
+    def timer(phase_start: str):
+        async def on_start(session, context, params):
+            setattr(context, phase_start, time.perf_counter())
+        return on_start
+
+    def recorder(phase: str, phase_start: str):
+        async def on_end(session, context, params):
+            started = getattr(context, phase_start, None)
+            if started is not None and context.trace_request_ctx is not None:
+                context.trace_request_ctx.record(phase, time.perf_counter() - started)
+        return on_end
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(timer('dns_start'))
+    config.on_dns_resolvehost_end.append(recorder('dns', 'dns_start'))
+    config.on_connection_create_start.append(timer('connect_start'))
+    config.on_connection_create_end.append(recorder('connect', 'connect_start'))
+    config.on_request_start.append(timer('request_start'))
+    config.on_request_end.append(recorder('ttfb', 'request_start'))
+    return config
+
+
+class AsyncTradeMonitor(TradeMonitor):
+    """Monitor de trade assíncrono (mesma configuração, filtros e alertas do TradeMonitor)"""
+
+    async def fetch_page_async(self, http: aiohttp.ClientSession, page: int = 1,
+                               executor: Optional[Executor] = None,
+                               conditional: bool = False) -> Optional[List[Item]]:
+        """
+        Busca uma página de trade e extrai os itens no executor (lança aiohttp.ClientError em erro de rede)
+
+        Com conditional=True, retorna None se a página não mudou (ver TradeMonitor.fetch_page).
+        """
+        url = self.build_url()
+        if page > 1:
+            url += f"&page={page}"
+        headers = {'User-Agent': self.session.headers['User-Agent']}
+        if conditional:
+            headers.update(self.conditional_headers(url))
+        start = time.perf_counter()
+        # DNS, conexão e TTFB são medidos pelos ganchos de trace_config()
+        async with http.get(url, headers=headers, trace_request_ctx=self.metrics) as response:
+            headers_at = time.perf_counter()
+            response.raise_for_status()
+            body = await response.read()
+            end = time.perf_counter()
+            html = body.decode(response.get_encoding(), errors='replace') if response.status != 304 else None
+        self.metrics.record('body', end - headers_at)
+        self.metrics.record('fetch', end - start)
+
+        if self.config.get('debug', False):
+            print(f"  [DEBUG] Página {page} - Status da requisição: {response.status}")
+            print(f"  [DEBUG] Página {page} - Tamanho da resposta: {len(body)} bytes")
+
+        if conditional and self.page_unchanged(url, response.status, response.headers, html, len(body)):
+            return None
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        items = await loop.run_in_executor(executor, self.parse_items, html)
+        elapsed = time.perf_counter() - start
+        self.metrics.record('parse', elapsed)
+        if page == 1:
+            self.poll_stats['parse_seconds'] += elapsed
+            self.poll_stats['parsed'] += 1
+        return items
+
+    async def fetch_items_async(self, http: aiohttp.ClientSession,
+                                executor: Optional[Executor] = None) -> List[Item]:
+        """Equivalente assíncrono de fetch_items (inclui o crawl de várias páginas)"""
+        self.last_fetch_unchanged = False
+        self.last_fetch_error = None
+        try:
+            items = await self.fetch_page_async(http, 1, executor,
+                                                conditional=self.config.get('skip_unchanged', True))
+            if items is None:
+                self.last_fetch_unchanged = True
+                return []
+
+            max_pages = self.get_crawl_pages()
+            workers = self.get_crawl_workers()
+            page = 2
+            while page <= max_pages and items and not self.page_already_seen(items):
+                batch = range(page, min(page + workers, max_pages + 1))
+                results = await asyncio.gather(
+                    *(self.fetch_page_async(http, p, executor) for p in batch),
+                    return_exceptions=True
+                )
+                stop = False
+                for batch_page, page_items in zip(batch, results):
+                    if isinstance(page_items, BaseException):
+                        print(f"Erro ao buscar página {batch_page}: {page_items}", file=sys.stderr)
+                        stop = True
+                        break
+                    if not page_items or self.page_already_seen(page_items):
+                        stop = True
+                        break
+                    items.extend(page_items)
+                if stop:
+                    break
+                page += workers
+
+            if max_pages > 1:
+                unique_items = {}
+                for item in items:
+                    unique_items.setdefault(item.listing_id, item)
+                items = list(unique_items.values())
+
+            return items
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Erro ao buscar itens: {e}", file=sys.stderr)
+            self.last_fetch_error = e
+            return []
+        except Exception as e:
+            print(f"Erro inesperado: {e}", file=sys.stderr)
+            return []
+
+    async def poll_async(self, http: aiohttp.ClientSession, executor: Optional[Executor] = None) -> int:
+        """Executa uma verificação completa (busca, filtros e alertas)"""
+        items = await self.fetch_items_async(http, executor)
+        return self.process_items(items, unchanged=self.last_fetch_unchanged)
+
+    async def run_async(self, http: aiohttp.ClientSession, executor: Optional[Executor] = None,
+                        polls: Optional[int] = None):
+        """
+        Executa o monitor em loop no event loop atual
+
+        Args:
+            http: Sessão aiohttp compartilhada entre os perfis
+            executor: Executor usado para o parse do HTML (None = executor padrão do loop)
+            polls: Número de verificações (None = até ser cancelado)
+        """
+        done = 0
+        while polls is None or done < polls:
+            await self.poll_async(http, executor)
+            done += 1
+            delay = self.next_poll_delay()
+            if polls is None or done < polls:
+                await asyncio.sleep(delay)
+
+
+async def run_group_async(group: List[AsyncTradeMonitor], http: aiohttp.ClientSession,
+                          executor: Optional[Executor] = None, polls: Optional[int] = None):
+    """
+    Executa um grupo de perfis que fazem a mesma consulta ao site
+
+    A página é buscada uma vez por ciclo (pelo primeiro perfil) e os itens são
+    distribuídos para os filtros locais de todos os perfis do grupo (em grupos
+    grandes, avaliados de uma vez por profile_index.match_group). A espera entre
+    ciclos vem do agendador do primeiro perfil, com os anúncios novos e o erro
+    da busca do grupo (intervalo adaptativo e recuo com Retry-After).
+    """
+    index = ProfileIndex(group)
+    writers = archive_writers(group)
+    done = 0
+    while polls is None or done < polls:
+        start = time.perf_counter()
+        items = await group[0].fetch_items_async(http, executor)
+        unchanged = group[0].last_fetch_unchanged
+        matches = match_group(index, group, items) if not unchanged else None
+        for i, monitor in enumerate(group):
+            if matches is not None:
+                monitor.process_items(items, unchanged=unchanged, matched=matches[0][i],
+                                      evaluated=matches[1], archive=writers[i])
+            else:
+                monitor.process_items(items, unchanged=unchanged, archive=writers[i])
+        group[0].metrics.record('poll', time.perf_counter() - start)
+        done += 1
+        delay = group[0].next_poll_delay()
+        if polls is None or done < polls:
+            await asyncio.sleep(delay)
+
+
+async def run_profiles(monitors: List[AsyncTradeMonitor], max_connections: int = 20,
+                       executor: Optional[Executor] = None, polls: Optional[int] = None,
+                       shared_fetch: bool = True):
+    """
+    Executa vários perfis em um único event loop
+
+    Args:
+        monitors: Perfis a executar
+        max_connections: Tamanho do pool de conexões compartilhado
+        executor: Executor para o parse (None = ThreadPoolExecutor criado aqui)
+        polls: Número de verificações por perfil (None = até ser cancelado)
+        shared_fetch: Se True, perfis com a mesma consulta ao site compartilham uma única busca
+    """
+    if shared_fetch:
+        groups = list(group_by_query(monitors).values())
+    else:
+        groups = [[monitor] for monitor in monitors]
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+    try:
+        connector = aiohttp.TCPConnector(limit=max_connections)
+        async with aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT,
+                                         trace_configs=[trace_config()]) as http:
+            await asyncio.gather(*(run_group_async(group, http, executor, polls) for group in groups))
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bot de Monitoramento DreadmystDB (vários perfis, assíncrono)')
+    parser.add_argument('-c', '--config', action='append', dest='configs',
+                        help='Arquivo de configuração de um perfil (pode ser repetido; padrão: config.json)')
+    parser.add_argument('--conexoes', type=int, default=20,
+                        help='Máximo de conexões HTTP simultâneas (padrão: 20)')
+
+    args = parser.parse_args()
+
+    monitors = [AsyncTradeMonitor(config_file) for config_file in (args.configs or ['config.json'])]
+
+    print("🤖 Bot de Monitoramento DreadmystDB (assíncrono) iniciado!")
+    for config_file, monitor in zip(args.configs or ['config.json'], monitors):
+        print(f"📋 {config_file}: {monitor.build_url()} (a cada {monitor.config.get('check_interval', 30)}s)")
+    print("\n" + "="*60)
+    print("Aguardando novos itens...")
+    print("="*60 + "\n")
+
+    metrics_server = serve_metrics(monitors)
+    try:
+        asyncio.run(run_profiles(monitors, max_connections=args.conexoes))
+    except KeyboardInterrupt:
+        print("\n\n🛑 Bot interrompido pelo usuário.")
+    finally:
+        for monitor in monitors:
+            monitor.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Filtros em Lote do Bot DreadmystDB (itens x perfis com NumPy)
+Converte os itens de uma busca em colunas (slot, qualidade de affix, presença de cada
+stat, matriz de valores dos stats, preço) e avalia os filtros compilados de todos os
+perfis como máscaras booleanas vetorizadas, em vez de chamar item_matches_filters uma
+vez por item e por perfil. O resultado é idêntico ao de CompiledFilter.matches.
+
+NumPy é opcional: sem ele, match_profiles retorna None e cada perfil filtra os itens
+da forma normal.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from bot import TradeMonitor, Item, CompiledFilter, STAT_NAMES
+
+# Abaixo disso, filtrar item a item é mais rápido que montar as colunas
+BATCH_MIN_PROFILES = 8
+
+
+class ItemBatch:
+    """
+    Itens de uma busca em formato de colunas
+
+    Os stats dos itens são reduzidos a um vocabulário com os nomes normalizados que
+    aparecem no lote; stat_presence[i, v] indica se o item i tem o stat v.
+    """
+
+    def __init__(self, items: Sequence[Item], normalize_stat: Callable[[str], str],
+                 normalize_slot: Callable[[str], str]):
+        self.items = items
+        self.size = len(items)
+
+        slot_codes: Dict[str, int] = {}
+        affix_codes: Dict[str, int] = {}
+        stat_codes: Dict[str, int] = {}
+        normalized_stats: Dict[str, int] = {}
+        slots = np.full(self.size, -1, dtype=np.int32)
+        affixes = np.full(self.size, -1, dtype=np.int32)
+        rows, cols = [], []
+
+        for i, item in enumerate(items):
+            if item.slot:
+                slots[i] = slot_codes.setdefault(normalize_slot(item.slot), len(slot_codes))
+            if item.affix_quality:
+                affixes[i] = affix_codes.setdefault(item.affix_quality.lower(), len(affix_codes))
+            for stat in item.stats:
+                code = normalized_stats.get(stat)
+                if code is None:
+                    code = stat_codes.setdefault(normalize_stat(stat).upper(), len(stat_codes))
+                    normalized_stats[stat] = code
+                rows.append(i)
+                cols.append(code)
+
+        self.slot_codes = slot_codes
+        self.affix_codes = affix_codes
+        self.stat_vocabulary = list(stat_codes)
+        # Itens sem slot/affix (-1) apontam para a última posição das tabelas de consulta
+        self.slots = np.where(slots < 0, len(slot_codes), slots)
+        self.affixes = np.where(affixes < 0, len(affix_codes), affixes)
+
+        self.stat_presence = np.zeros((self.size, len(stat_codes)), dtype=np.float32)
+        self.stat_presence[rows, cols] = 1.0
+
+        self.stat_values = np.frombuffer(b''.join(item.stat_values for item in items),
+                                         dtype='<u2').reshape(-1, len(STAT_NAMES))
+        self.gold = np.fromiter((item.gold or 0 for item in items), dtype=np.float64, count=self.size)
+
+    def lookup(self, codes: Dict[str, int], wanted) -> 'np.ndarray':
+        """Tabela de consulta (código -> bool) com os valores desejados de uma coluna"""
+        table = np.zeros(len(codes) + 1, dtype=bool)
+        table[[codes[value] for value in wanted if value in codes]] = True
+        return table
+
+
+class BatchMatcher:
+    """
+    Avalia os filtros compilados de vários perfis sobre um lote de itens
+
+    Cada stat configurado (em qualquer perfil) vira uma coluna booleana "o item tem
+    um stat que corresponde a este", calculada uma única vez por lote com um produto
+    de matrizes. Perfis com filtros idênticos são avaliados uma única vez.
+    """
+
+    def __init__(self, filters: Sequence[CompiledFilter],
+                 normalize_stat: Callable[[str], str] = TradeMonitor.normalize_stat,
+                 normalize_slot: Callable[[str], str] = TradeMonitor.normalize_slot_name):
+        if not HAS_NUMPY:
+            raise ImportError("numpy não está instalado (pip install numpy)")
+        self.filters = list(filters)
+        self.normalize_stat = normalize_stat
+        self.normalize_slot = normalize_slot
+
+        # Stats configurados distintos (já normalizados) -> coluna da matriz de termos
+        self.terms: Dict[str, int] = {}
+        for compiled in self.filters:
+            for term in compiled.primary_stats + compiled.stats:
+                self.terms.setdefault(term, len(self.terms))
+
+        # Perfis com a mesma assinatura compartilham a avaliação
+        self.unique: Dict[tuple, int] = {}
+        self.profile_slot: List[int] = []
+        for compiled in self.filters:
+            self.profile_slot.append(self.unique.setdefault(compiled.signature, len(self.unique)))
+        self.unique_filters: List[CompiledFilter] = [None] * len(self.unique)
+        for compiled, slot in zip(self.filters, self.profile_slot):
+            self.unique_filters[slot] = compiled
+
+    def term_matrix(self, batch: ItemBatch) -> 'np.ndarray':
+        """Matriz itens x stats configurados: o item tem um stat que corresponde ao configurado"""
+        term_of_vocab = np.zeros((len(batch.stat_vocabulary), len(self.terms)), dtype=np.float32)
+        for v, item_stat in enumerate(batch.stat_vocabulary):
+            for term, t in self.terms.items():
+                # Mesma regra de CompiledFilter._stat_mask
+                if term == item_stat or term in item_stat or item_stat in term:
+                    term_of_vocab[v, t] = 1.0
+        return (batch.stat_presence @ term_of_vocab) > 0
+
+    def evaluate(self, compiled: CompiledFilter, batch: ItemBatch, terms: 'np.ndarray') -> 'np.ndarray':
+        """Máscara dos itens do lote que passam nos filtros de um perfil"""
+        n = batch.size
+        if compiled.accept_all:
+            return np.ones(n, dtype=bool)
+
+        is_or = compiled.filter_mode == 'OR'
+        result = np.ones(n, dtype=bool)
+
+        if compiled.has_slot_filter:
+            slot_matches = batch.lookup(batch.slot_codes, compiled.slots)[batch.slots]
+        else:
+            slot_matches = np.ones(n, dtype=bool)
+
+        if compiled.has_primary_stat_filter:
+            primary = terms[:, [self.terms[term] for term in compiled.primary_stats]]
+            if compiled.primary_stats_mode == 'AND':
+                result = primary.all(axis=1)
+            else:
+                result = primary.any(axis=1)
+
+        if compiled.has_stat_filter:
+            stat_matches = terms[:, [self.terms[term] for term in compiled.stats]].any(axis=1)
+        else:
+            stat_matches = np.ones(n, dtype=bool)
+
+        if compiled.has_affix_quality_filter:
+            result = result & batch.lookup(batch.affix_codes, compiled.affix_qualities)[batch.affixes]
+
+        if is_or:
+            result = result & (slot_matches | stat_matches)
+        else:
+            result = result & slot_matches & stat_matches
+
+        if compiled.has_thresholds:
+            result &= self.thresholds(compiled, batch)
+        return result
+
+    @staticmethod
+    def scores(compiled: CompiledFilter, batch: ItemBatch) -> 'np.ndarray':
+        """Pontuação de cada item do lote (equivalente a CompiledFilter.score)"""
+        total = np.zeros(batch.size, dtype=np.float64)
+        for index, weight in compiled.score_weights:
+            if index >= 0:
+                total += weight * batch.stat_values[:, index].astype(np.float64)
+        if compiled.score_per_gold:
+            paid = batch.gold > 0
+            total = np.where(paid, total * 1000 / np.where(paid, batch.gold, 1.0), 0.0)
+        return total
+
+    def thresholds(self, compiled: CompiledFilter, batch: ItemBatch) -> 'np.ndarray':
+        """Máscara dos itens que passam nos mínimos por stat e na pontuação mínima"""
+        result = np.ones(batch.size, dtype=bool)
+        for index, minimum in compiled.stat_minimums:
+            if index >= 0:
+                result &= batch.stat_values[:, index] >= minimum
+            elif minimum > 0:
+                result[:] = False
+        if compiled.min_score is not None and compiled.score_weights:
+            result &= self.scores(compiled, batch) >= compiled.min_score
+        return result
+
+    def match_matrix(self, items: Sequence[Item]) -> 'np.ndarray':
+        """Matriz booleana itens x perfis"""
+        batch = ItemBatch(items, self.normalize_stat, self.normalize_slot)
+        terms = self.term_matrix(batch)
+        unique = np.empty((batch.size, len(self.unique_filters)), dtype=bool)
+        for j, compiled in enumerate(self.unique_filters):
+            unique[:, j] = self.evaluate(compiled, batch, terms)
+        return unique[:, self.profile_slot]
+
+    def match(self, items: Sequence[Item]) -> Dict[int, List[int]]:
+        """
+        Lista esparsa de correspondências
+
+        Returns:
+            Índice do item -> índices dos perfis que ele satisfaz (só itens com alguma correspondência)
+        """
+        rows, cols = np.nonzero(self.match_matrix(items))
+        if not len(rows):
+            return {}
+        starts = np.flatnonzero(np.diff(rows)) + 1
+        return {int(group_rows[0]): group_cols.tolist()
+                for group_rows, group_cols in zip(np.split(rows, starts), np.split(cols, starts))}
+
+
+def match_profiles(monitors: Sequence[TradeMonitor], items: Sequence[Item]) -> Optional[List[Set[str]]]:
+    """
+    Avalia os filtros de vários perfis de uma vez
+
+    Returns:
+        Para cada perfil, os listing_ids dos itens que passam nos seus filtros; None se o
+        lote não compensar (NumPy ausente, poucos perfis, nenhum item ou algum perfil em debug)
+    """
+    if (not HAS_NUMPY or len(monitors) < BATCH_MIN_PROFILES or not items
+            or any(monitor.config.get('debug', False) for monitor in monitors)):
+        return None
+    matrix = BatchMatcher([monitor.get_compiled_filter() for monitor in monitors]).match_matrix(items)
+    listing_ids = [item.listing_id for item in items]
+    return [{listing_ids[i] for i in np.flatnonzero(matrix[:, j])} for j in range(len(monitors))]
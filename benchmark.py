@@ -0,0 +1,1609 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do Bot DreadmystDB
+Uso: python benchmark.py <benchmark> [opções]
+
+Os benchmarks rodam offline, usando o retorno.html salvo como amostra da página de trade.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from bot import TradeMonitor, Item, AFFIX_QUALITIES
+
+FIXTURE_HTML = Path(__file__).parent / "retorno.html"
+
+# Configurações variadas usadas para comparar implementações de filtro
+FILTER_CONFIGS = [
+    {},
+    {"stats": ["STR", "INT", "COU"], "slots": ["chest", "hands"]},
+    {"stats": ["STR", "INT", "COU"], "slots": ["chest", "hands"], "filter_mode": "OR"},
+    {"primary_stats": ["AGI", "STR"], "primary_stats_mode": "AND"},
+    {"primary_stats": ["AGI", "STR"], "primary_stats_mode": "OR", "stats": ["Fire Res", "HP"]},
+    {"primary_stats": ["INT"], "slots": ["head", "Helmet"], "affix_quality": ["Superior", "Exquisite"]},
+    {"stats": ["Resist Fire", "Ranged Critical", "Spell Crit"], "filter_mode": "or"},
+    {"slots": ["off hand", "shield", "ranged"], "stats": ["Crit"]},
+    {"affix_quality": ["Fine"]},
+    {"primary_stats": ["Courage", "Willpower"], "stats": ["Wpn Dmg"], "slots": ["main hand"], "filter_mode": "OR"},
+    {"stat_min": {"STR": 10, "Fire Res": 5}},
+    {"stats": ["Crit", "HP"], "filter_mode": "OR", "stat_min": {"HP": 20}},
+    {"score_weights": {"STR": 2, "Melee Crit": 5, "Resist Fire": 1}, "min_score": 60},
+    {"slots": ["chest"], "score_weights": {"INT": 1, "HP": 0.5}, "score_per_gold": True, "min_score": 1},
+]
+
+
+def make_monitor(config: dict = None, monitor_class=TradeMonitor) -> TradeMonitor:
+    """Cria um monitor a partir de um config em memória (sem tocar no config.json)"""
+    fd, path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # Registro de vistos só em memória, para não deixar arquivos .seen no diretório temporário;
+            # alertas escritos na própria verificação, dentro do redirect_stdout dos benchmarks
+            json.dump({"seen_file": "", "alert_async": False, **(config or {})}, f)
+        return monitor_class(path)
+    finally:
+        os.remove(path)
+
+
+class StubTradeServer:
+    """
+    Servidor HTTP local que responde qualquer rota com o retorno.html
+
+    Uso:
+        with StubTradeServer(latency=0.05) as server:
+            monitor.BASE_URL = server.trade_url
+
+    Com etag=True, envia um ETag do corpo e responde 304 a GETs condicionais.
+    O corpo pode ser trocado durante o benchmark atribuindo server.html.
+    """
+
+    def __init__(self, html: str = None, latency: float = 0.0, etag: bool = False):
+        self.html = (html or FIXTURE_HTML.read_text(encoding='utf-8')).encode('utf-8')
+        self.latency = latency
+        self.etag = etag
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Mantém as conexões abertas (keep-alive)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                html = stub.html
+                etag = f'"{hashlib.md5(html).hexdigest()}"' if stub.etag else None
+                if etag and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(html)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(html)
+                with stub._lock:
+                    stub.bytes_sent += len(html)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        server_class = type('StubServer', (ThreadingHTTPServer,), {'request_queue_size': 256})
+        self._server = server_class(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def trade_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/trade"
+
+
+def load_fixture_items(monitor: TradeMonitor) -> list:
+    """Extrai os itens do retorno.html"""
+    html = FIXTURE_HTML.read_text(encoding='utf-8')
+    return monitor.parse_items(html)
+
+
+def synthetic_items(monitor: TradeMonitor, base_items: list, count: int, seed: int = 1234) -> list:
+    """Gera itens variados combinando slots, stats e affixes reais do retorno.html"""
+    rng = random.Random(seed)
+    names = [item.name for item in base_items] + ["Holy Trinket of Nothing"]
+    stat_pool = sorted({stat for item in base_items for stat in item.stats})
+    stat_pool += ["+12 Ranged Critical", "+7 Block Rating", "+40 Meditate", "+3 Unknown Stat"]
+    affixes = [None, None, "Fine", "Pristine", "Superior", "Exquisite"]
+    items = []
+    for i in range(count):
+        name = rng.choice(names)
+        items.append(Item(
+            listing_id=str(100000 + i),
+            name=name,
+            item_level=str(rng.randint(20, 25)),
+            stats=rng.sample(stat_pool, rng.randint(0, 4)),
+            price=f"{rng.randint(1, 2000) * 1000:,}g",
+            seller="bench",
+            time_left="1 day left",
+            url=f"https://dreadmystdb.com/trade/{100000 + i}",
+            slot=monitor.detect_slot(name),
+            affix_quality=rng.choice(affixes)
+        ))
+    return items
+
+
+# Stats secundários vistos nos cards: (nome, cor do span, valor em relação aos primários)
+SECONDARY_STATS = [
+    ("Fire Res", "text-orange-500", 2.8), ("Frost Res", "text-sky-400", 2.8),
+    ("Shadow Res", "text-violet-500", 2.8), ("Holy Res", "text-yellow-300", 2.8),
+    ("Melee Crit", "text-amber-400", 0.9), ("Spell Crit", "text-amber-400", 0.9),
+    ("Ranged Crit", "text-amber-400", 0.9), ("Wpn Dmg", "text-red-500", 0.17),
+    ("Shields", "text-zinc-400", 0.34), ("Axes", "text-rose-400", 0.34), ("Wands", "text-rose-400", 0.34),
+    ("Meditate", "text-indigo-400", 0.5), ("Block Rating", "text-zinc-400", 0.3), ("HP", "text-red-400", 5.0),
+]
+PRIMARY_STATS = [("STR", "text-orange-400"), ("AGI", "text-green-400"), ("INT", "text-cyan-400"),
+                 ("WIL", "text-purple-400"), ("COU", "text-yellow-400")]
+NAME_ADJECTIVES = ["Dispatching", "Volcanic", "Diabolic", "Abundant", "Beguiling", "Defiant", "Armored",
+                   "Scorching", "Blinding", "Concentrating", "Divine", "Chaotic", "Rupturing", "Twisted"]
+NAME_ANIMALS = ["Lion", "Squid", "Valor", "Snake", "Gibbon", "Goat", "Dolphin", "Otter", "Horse", "Whale",
+                "Pig", "Eagle", "Bear"]
+PRICES = [15_000, 25_000, 29_999, 30_000, 50_000, 60_000, 100_000, 150_000, 200_000, 250_000,
+          500_000, 1_000_000, 1_800_000]
+
+CARD_TEMPLATE = """<div class="entity-card" id="listing-{listing_id}">
+  <!-- Item Icon -->
+  <div class="entity-icon border-2 quality-{quality}-border">
+    <img class="w-full h-full object-cover" alt="{name}" loading="lazy" src="/game_assets/icons/items/icon_item_pl_torso_c01.png" />
+  </div>
+
+  <!-- Item Info -->
+  <div class="flex-1 min-w-0">
+    <a class="block" href="/trade/{listing_id}">
+      <h3 class="font-medium quality-{quality} truncate hover:underline">
+        {name}
+      </h3>
+</a>    <p class="text-text-muted text-sm">
+      iLvl {level}
+{spans}      <span class="mx-1">&bull;</span>
+      by <span class="text-text-secondary">{seller}</span>
+    </p>
+  </div>
+
+  <!-- Price & Time -->
+  <div class="text-right flex-shrink-0">
+    <div class="text-gold font-medium">{price:,}g</div>
+    <div class="text-text-muted text-xs">
+      {time_left}
+    </div>
+  </div>
+
+  <!-- Delete button (owner only) -->
+</div>
+"""
+
+
+def generate_trade_page(cards: int, seed: int = 1234, first_id: int = 20000) -> str:
+    """
+    Gera uma página de trade com N cards no mesmo HTML do retorno.html
+
+    Cada card segue o padrão dos anúncios reais: dois stats primários com o mesmo valor
+    e um secundário proporcional a eles (dois no caso de HP/Mana), às vezes com a
+    qualidade de affix. Os IDs são decrescentes, como na listagem por mais recentes.
+    """
+    from bot import _CARD_START_RE, _find_div_end
+
+    html = FIXTURE_HTML.read_text(encoding='utf-8')
+    first = _CARD_START_RE.search(html)
+    last = first
+    for last in _CARD_START_RE.finditer(html):
+        pass
+    head, tail = html[:first.start()], html[_find_div_end(html, last.start()):]
+
+    rng = random.Random(seed)
+    bases = [keyword.title() for keywords in TradeMonitor.SLOT_KEYWORDS.values() for keyword in keywords]
+    bases.append("Trinket")  # Sem slot conhecido
+    rendered = []
+    for i in range(cards):
+        godly = rng.random() < 0.15
+        primary = rng.randint(20, 60) if not godly else rng.randint(30, 70)
+        spans = []
+        if rng.random() < 0.3:
+            spans.append(("text-gold", rng.choice(AFFIX_QUALITIES)))
+        secondary, color, ratio = rng.choice(SECONDARY_STATS)
+        spans.append((color, f"+{max(1, round(primary * ratio))} {secondary}"))
+        if secondary == "HP":
+            spans.append(("text-blue-400", f"+{round(primary * ratio)} Mana"))
+        for stat, color in rng.sample(PRIMARY_STATS, 2 if secondary != "HP" else 1):
+            spans.append((color, f"+{primary} {stat}"))
+        rendered.append(CARD_TEMPLATE.format(
+            listing_id=first_id + cards - i,
+            quality="legendary" if godly else "epic",
+            name=f"{'Godly' if godly else 'Holy'} {rng.choice(bases)} of the "
+                 f"{rng.choice(NAME_ADJECTIVES)} {rng.choice(NAME_ANIMALS)}",
+            level=rng.choice((24, 25, 25, 25)),
+            spans="".join(f'          <span class="{color} ml-1">{text}</span>\n' for color, text in spans),
+            seller=f"seller{rng.randint(1, 200)}",
+            price=rng.choice(PRICES),
+            time_left=rng.choice(("about 24 hours left", "1 day left", "about 12 hours left"))
+        ))
+    return head + "\n\n          ".join(rendered) + tail
+
+
+def bench_filters(args):
+    """Compara o filtro compilado com a implementação de referência"""
+    monitor = make_monitor()
+    base_items = load_fixture_items(monitor)
+    corpus = base_items + synthetic_items(monitor, base_items, 2000)
+
+    print("=" * 60)
+    print("Benchmark de filtros")
+    print("=" * 60)
+    print(f"Itens do retorno.html: {len(base_items)}")
+
+    # 1. Equivalência com a implementação original
+    mismatches = 0
+    for config in FILTER_CONFIGS:
+        monitor.config = dict(config)
+        for item in corpus:
+            expected = monitor.item_matches_filters_reference(item)
+            if monitor.item_matches_filters(item) != expected:
+                mismatches += 1
+                print(f"  ❌ Divergência: config={config} item={item.name} stats={item.stats}")
+    total_checks = len(FILTER_CONFIGS) * len(corpus)
+    print(f"\nEquivalência: {total_checks - mismatches}/{total_checks} resultados idênticos")
+
+    # 2. Microbenchmark
+    items = synthetic_items(monitor, base_items, args.items, seed=42)
+    monitor.config = dict(FILTER_CONFIGS[4])
+    monitor.config["slots"] = ["chest", "hands", "head"]
+
+    start = time.perf_counter()
+    reference_hits = sum(1 for item in items if monitor.item_matches_filters_reference(item))
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled_hits = sum(1 for item in items if monitor.item_matches_filters(item))
+    compiled_time = time.perf_counter() - start
+
+    print(f"\n{args.items} itens:")
+    print(f"  Referência: {reference_time:.3f}s ({reference_hits} correspondências)")
+    print(f"  Compilado:  {compiled_time:.3f}s ({compiled_hits} correspondências)")
+    print(f"  Speedup:    {reference_time / compiled_time:.1f}x")
+
+    return 1 if mismatches else 0
+
+
+def bench_parser(args):
+    """Compara os backends de parse (bs4 x lxml) no retorno.html"""
+    from bot import HAS_LXML
+
+    monitor = make_monitor()
+    html = FIXTURE_HTML.read_text(encoding='utf-8')
+
+    print("=" * 60)
+    print(f"Benchmark de parse ({len(html) // 1024} KB, {args.repeat} repetições)")
+    print("=" * 60)
+
+    if not HAS_LXML:
+        print("❌ lxml não está instalado")
+        return 1
+
+    reference = monitor.parse_items(html, backend='bs4')
+    fast = monitor.parse_items(html, backend='lxml')
+    identical = reference == fast
+    print(f"Itens: bs4={len(reference)}, lxml={len(fast)} -> {'idênticos' if identical else 'DIFERENTES'}")
+
+    # Streaming: apenas os fragmentos dos cards são parseados, em chunks de 8KB
+    from bot import iter_card_fragments
+    chunks = [html[i:i + 8192] for i in range(0, len(html), 8192)]
+    streamed = [monitor.parse_card_fragment(fragment) for fragment in iter_card_fragments(chunks)]
+    identical = identical and streamed == reference
+    print(f"Itens: streaming={len(streamed)} -> {'idênticos' if streamed == reference else 'DIFERENTES'}")
+
+    timings = {}
+    for backend in ('bs4', 'lxml'):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            monitor.parse_items(html, backend=backend)
+        timings[backend] = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for fragment in iter_card_fragments(chunks):
+            monitor.parse_card_fragment(fragment)
+    timings['stream'] = (time.perf_counter() - start) / args.repeat
+
+    print(f"\n  bs4:     {timings['bs4'] * 1000:.2f} ms/página")
+    print(f"  lxml:    {timings['lxml'] * 1000:.2f} ms/página")
+    print(f"  stream:  {timings['stream'] * 1000:.2f} ms/página (lxml, só os cards)")
+    print(f"  Speedup: {timings['bs4'] / timings['lxml']:.1f}x (lxml), {timings['bs4'] / timings['stream']:.1f}x (stream)")
+    return 0 if identical else 1
+
+
+def bench_async(args):
+    """Compara N perfis em threads (TradeMonitor) com N perfis no asyncio (AsyncTradeMonitor)"""
+    import asyncio
+    from async_monitor import AsyncTradeMonitor, run_profiles
+
+    # skip_unchanged desligado: mede o ciclo completo (download, parse e filtros)
+    config = {"quality": [5, 6], "min_level": 24, "stats": ["STR"], "check_interval": 0,
+              "skip_unchanged": False}
+
+    print("=" * 60)
+    print(f"Benchmark: {args.profiles} perfis x {args.polls} verificações "
+          f"(latência simulada: {args.latency * 1000:.0f}ms)")
+    print("=" * 60)
+
+    with StubTradeServer(latency=args.latency) as server:
+        # 1. Uma thread por perfil (modelo atual do bot/GUI)
+        monitors = [make_monitor(config) for _ in range(args.profiles)]
+        for monitor in monitors:
+            monitor.BASE_URL = server.trade_url
+
+        def run_thread(monitor):
+            for _ in range(args.polls):
+                monitor.process_items(monitor.fetch_items())
+
+        peak_threads = threading.active_count()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            threads = [threading.Thread(target=run_thread, args=(m,)) for m in monitors]
+            for thread in threads:
+                thread.start()
+            peak_threads = max(peak_threads, threading.active_count())
+            for thread in threads:
+                thread.join()
+            thread_time = time.perf_counter() - start
+        thread_requests = server.requests
+
+        # 2. Todos os perfis em um único event loop
+        server.requests = 0
+        async_monitors = []
+        for _ in range(args.profiles):
+            monitor = make_monitor(config, AsyncTradeMonitor)
+            monitor.BASE_URL = server.trade_url
+            async_monitors.append(monitor)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            asyncio.run(run_profiles(async_monitors, max_connections=args.profiles, polls=args.polls,
+                                     shared_fetch=False))
+            async_time = time.perf_counter() - start
+        async_requests = server.requests
+
+    print(f"\nThreads:  {thread_time:.2f}s, {thread_requests} requisições, "
+          f"{thread_requests / thread_time:.0f} req/s, pico de {peak_threads} threads")
+    print(f"Asyncio:  {async_time:.2f}s, {async_requests} requisições, "
+          f"{async_requests / async_time:.0f} req/s, 1 thread de loop + executor de parse")
+    return 0
+
+
+def bench_conditional(args):
+    """Simula verificações em que a página só muda a cada N verificações, com e sem skip_unchanged"""
+    html = FIXTURE_HTML.read_text(encoding='utf-8')
+    config = {"quality": [5, 6], "min_level": 24, "stats": ["STR"], "check_interval": 0}
+
+    print("=" * 60)
+    print(f"Benchmark: {args.polls} verificações, página muda a cada {args.change_every}")
+    print("=" * 60)
+
+    results = {}
+    for label, options, etag in (("Sem skip_unchanged", {"skip_unchanged": False}, False),
+                                 ("Hash dos anúncios", {}, False),
+                                 ("GET condicional (ETag)", {}, True)):
+        with StubTradeServer(html, etag=etag) as server:
+            monitor = make_monitor({**config, **options})
+            monitor.BASE_URL = server.trade_url
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for poll in range(args.polls):
+                    if poll and poll % args.change_every == 0:
+                        # Um anúncio novo no topo da listagem
+                        server.html = html.replace('listing-', f'listing-{poll}', 1).encode('utf-8')
+                    items = monitor.fetch_items()
+                    monitor.process_items(items, unchanged=monitor.last_fetch_unchanged)
+                elapsed = time.perf_counter() - start
+            results[label] = (elapsed, server.bytes_sent, monitor.poll_stats)
+
+    for label, (elapsed, bytes_sent, stats) in results.items():
+        skipped = stats['not_modified'] + stats['same_hash']
+        print(f"\n{label}:")
+        print(f"  Tempo:   {elapsed:.2f}s ({elapsed / args.polls * 1000:.1f}ms por verificação)")
+        print(f"  Baixado: {bytes_sent / 1024:.0f} KB")
+        print(f"  Parse:   {stats['parsed']} páginas, {stats['parse_seconds'] * 1000:.0f}ms")
+        print(f"  Ignoradas: {skipped} ({stats['not_modified']} HTTP 304, {stats['same_hash']} mesmos anúncios)")
+    return 0
+
+
+def bench_seen(args):
+    """Compara o set de strings original com o SeenStore (memória, consulta e carga do arquivo)"""
+    import tracemalloc
+    from seen_store import SeenStore, FileSeenStore
+
+    rng = random.Random(1234)
+    # IDs crescentes com lacunas, como os anúncios do site
+    ids, current = [], 2_000_000
+    for _ in range(args.items):
+        current += rng.randint(1, 20)
+        ids.append(str(current))
+    lookups = [rng.choice(ids) if rng.random() < 0.5 else str(rng.randint(2_000_000, current)) for _ in range(100_000)]
+
+    print("=" * 60)
+    print(f"Benchmark: registro de vistos com {args.items} anúncios")
+    print("=" * 60)
+
+    def measure(factory):
+        tracemalloc.start()
+        store = factory()
+        for listing_id in ids:
+            store.add(listing_id)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        hits = sum(1 for listing_id in lookups if listing_id in store)
+        return store, memory, time.perf_counter() - start, hits
+
+    _, set_memory, set_time, set_hits = measure(set)
+    store, store_memory, store_time, store_hits = measure(lambda: SeenStore(max_items=args.items))
+    print(f"\nset de strings: {set_memory / 1024:.0f} KB, {set_time / len(lookups) * 1e6:.2f} µs por consulta")
+    print(f"SeenStore:      {store_memory / 1024:.0f} KB, {store_time / len(lookups) * 1e6:.2f} µs por consulta")
+    print(f"  Memória: {set_memory / store_memory:.1f}x menor")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.seen")
+        file_store = FileSeenStore(path, max_items=args.items)
+        for listing_id in ids:
+            file_store.add(listing_id)
+        file_store.close()
+        start = time.perf_counter()
+        loaded = FileSeenStore(path, max_items=args.items)
+        load_time = time.perf_counter() - start
+        loaded.close()
+        print(f"\nArquivo: {os.path.getsize(path) / 1024:.0f} KB, carregado em {load_time * 1000:.1f}ms "
+              f"({len(loaded)} anúncios)")
+
+    identical = set_hits == store_hits and len(loaded) == len(store)
+    print(f"Resultados idênticos: {'sim' if identical else 'NÃO'}")
+    return 0 if identical else 1
+
+
+def bench_scheduler(args):
+    """Simula um dia de anúncios (picos e horas paradas) com intervalo fixo e adaptativo"""
+    from scheduler import PollScheduler
+
+    rng = random.Random(1234)
+    day = 24 * 3600
+    # Anúncios novos por minuto em cada hora do dia: madrugada parada, picos à noite
+    hourly_rate = [0.1] * 7 + [1.0] * 11 + [6.0] * 4 + [0.5] * 2
+    arrivals, t = [], 0.0
+    while t < day:
+        rate = hourly_rate[int(t // 3600)] / 60
+        t += rng.expovariate(rate)
+        arrivals.append(t)
+    arrivals = [a for a in arrivals if a < day]
+
+    print("=" * 60)
+    print(f"Benchmark: {len(arrivals)} anúncios em 24h simuladas (check_interval={args.interval}s)")
+    print("=" * 60)
+
+    for label, adaptive in (("Fixo", False), ("Adaptativo", True)):
+        scheduler = PollScheduler(check_interval=args.interval, adaptive=adaptive)
+        polls, delays, next_arrival, now = 0, [], 0, 0.0
+        while now < day:
+            polls += 1
+            new = 0
+            while next_arrival < len(arrivals) and arrivals[next_arrival] <= now:
+                delays.append(now - arrivals[next_arrival])
+                next_arrival += 1
+                new += 1
+            now += scheduler.record_poll(new, now=now)
+        delays.sort()
+        p95 = delays[int(len(delays) * 0.95)] if delays else 0.0
+        print(f"\n{label}:")
+        print(f"  Verificações: {polls}")
+        print(f"  Atraso até o alerta: média {sum(delays) / len(delays):.1f}s, p95 {p95:.1f}s")
+    return 0
+
+
+def bench_archive(args):
+    """Grava N itens sintéticos no arquivo histórico e mede consultas indexadas"""
+    from archive import ItemArchive
+
+    monitor = make_monitor()
+    base_items = load_fixture_items(monitor)
+    items = synthetic_items(monitor, base_items, args.items)
+    now = time.time()
+    span = 60 * 86400  # Itens espalhados pelos últimos 60 dias
+
+    print("=" * 60)
+    print(f"Benchmark: arquivo histórico com {args.items} itens")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ItemArchive(os.path.join(tmp, "bench.db"), monitor.normalize_stat)
+        start = time.perf_counter()
+        batch = 1000
+        for i in range(0, len(items), batch):
+            archive.add_many(items[i:i + batch])
+            archive.flush(now=now - span + span * i / len(items))
+        archive.analyze()
+        insert_time = time.perf_counter() - start
+        print(f"\nGravação: {insert_time:.1f}s ({args.items / insert_time:.0f} itens/s)")
+
+        week_ago = now - 7 * 86400
+        queries = [
+            ("Holy chest com STR >= 40 abaixo de 100k na última semana",
+             dict(quality=5, slot='chest', stats=[('STR', '>=', 40)], max_price=100_000, since=week_ago)),
+            ("Godly com INT >= 30 e COU >= 30, iLvl 25",
+             dict(quality=6, min_level=25, stats=[('INT', '>=', 30), ('COU', '>=', 30)])),
+            ("Qualquer item com Fire Res >= 90 abaixo de 50k",
+             dict(stats=[('Fire Res', '>=', 90)], max_price=50_000)),
+            ("Mãos vistas na última semana",
+             dict(slot='hands', since=week_ago)),
+        ]
+        for label, query in queries:
+            archive.query(**query)  # Aquece o cache de páginas do SQLite
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                results = archive.query(**query)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"{label}: {elapsed * 1000:.1f}ms ({len(results)} resultados, limite 100)")
+        archive.close()
+    return 0
+
+
+def bench_items(args):
+    """Memória de N itens: dataclass original (tudo em texto) vs. Item compacto"""
+    import gc
+    import tracemalloc
+    from dataclasses import dataclass
+    from typing import List, Optional
+
+    @dataclass
+    class LegacyItem:
+        """O Item anterior, para comparação"""
+        listing_id: str
+        name: str
+        item_level: str
+        stats: List[str]
+        price: str
+        seller: str
+        time_left: str
+        url: str
+        slot: Optional[str] = None
+        affix_quality: Optional[str] = None
+
+    monitor = make_monitor()
+    base_items = load_fixture_items(monitor)
+    templates = synthetic_items(monitor, base_items, 20_000)
+
+    def raw_fields(i):
+        # Strings novas a cada item, como sairiam do parse do HTML
+        item = templates[i % len(templates)]
+        listing_id = str(100000 + i)
+        return dict(listing_id=listing_id, name=''.join(item.name), item_level=f"{item.level}",
+                    stats=[f"{stat}" for stat in item.stats], price=f"{(i % 2000 + 1) * 1000:,}g",
+                    seller=f"{item.seller}", time_left=f"{item.time_left}",
+                    url=f"https://dreadmystdb.com/trade/{listing_id}", slot=item.slot,
+                    affix_quality=item.affix_quality)
+
+    print("=" * 60)
+    print(f"Benchmark: memória de {args.items} itens")
+    print("=" * 60)
+
+    results = {}
+    for label, factory in (("dataclass original", LegacyItem), ("Item compacto", Item)):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        items = [factory(**raw_fields(i)) for i in range(args.items)]
+        elapsed = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[label] = (memory, elapsed, items[-1])
+        del items
+        print(f"\n{label}: {memory / 1024 ** 2:.0f} MB ({memory / args.items:.0f} bytes/item), "
+              f"criados em {elapsed:.1f}s")
+
+    legacy, compact = results["dataclass original"], results["Item compacto"]
+    print(f"\nMemória: {legacy[0] / compact[0]:.1f}x menor")
+    identical = legacy[2].__dict__ == compact[2].to_dict()
+    print(f"to_dict compatível: {'sim' if identical else 'NÃO'}")
+    return 0 if identical else 1
+
+
+PROFILE_SLOTS = ["chest", "hands", "head", "feet", "legs", "off hand", "main hand", "ring", "neck", "ranged"]
+PROFILE_STATS = ["STR", "INT", "AGI", "COU", "WIL", "HP", "Mana", "Fire Res", "Frost Res", "Shadow Res",
+                 "Resist Holy", "Melee Crit", "Spell Crit", "Ranged Critical", "Block", "Wpn Dmg", "Meditate"]
+
+
+def random_profile_configs(count: int, seed: int = 7) -> list:
+    """Gera configs de perfis variados (slots, stats, primários, affix, modos, mínimos e pontuação)"""
+    rng = random.Random(seed)
+    slots, stats = PROFILE_SLOTS, PROFILE_STATS
+    configs = []
+    for _ in range(count):
+        config = {"filter_mode": rng.choice(["AND", "OR"])}
+        if rng.random() < 0.6:
+            config["slots"] = rng.sample(slots, rng.randint(1, 3))
+        if rng.random() < 0.7:
+            config["stats"] = rng.sample(stats, rng.randint(1, 3))
+        if rng.random() < 0.4:
+            config["primary_stats"] = rng.sample(stats[:5], rng.randint(1, 2))
+            config["primary_stats_mode"] = rng.choice(["AND", "OR"])
+        if rng.random() < 0.2:
+            config["affix_quality"] = rng.sample(["Fine", "Pristine", "Superior", "Exquisite"], 2)
+        if rng.random() < 0.2:
+            config["stat_min"] = {rng.choice(stats[:7]): rng.randint(5, 30)}
+        if rng.random() < 0.2:
+            config["score_weights"] = {stat: rng.randint(1, 5) for stat in rng.sample(stats, 2)}
+            config["score_per_gold"] = rng.random() < 0.5
+            config["min_score"] = rng.choice([0.5, 5, 40])
+        configs.append(config)
+    return configs
+
+
+def saved_search_configs(count: int, seed: int = 11) -> list:
+    """Gera buscas salvas típicas: um slot, stats obrigatórios e às vezes mínimos ou affix"""
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        config = {"slots": [rng.choice(PROFILE_SLOTS)]}
+        if rng.random() < 0.5:
+            config["primary_stats"] = rng.sample(PROFILE_STATS[:5], rng.randint(1, 2))
+            config["primary_stats_mode"] = "AND"
+        else:
+            config["stats"] = rng.sample(PROFILE_STATS, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            config["stat_min"] = {rng.choice(PROFILE_STATS[:7]): rng.randint(5, 30)}
+        if rng.random() < 0.2:
+            config["affix_quality"] = [rng.choice(["Superior", "Exquisite"])]
+        if rng.random() < 0.1:
+            config["filter_mode"] = "OR"
+        configs.append(config)
+    return configs
+
+
+def bench_batch(args):
+    """Filtros item a item vs. avaliação em lote (NumPy) de vários perfis"""
+    from batch_match import HAS_NUMPY, BatchMatcher
+    if not HAS_NUMPY:
+        print("numpy não está instalado (pip install numpy)")
+        return 1
+
+    monitor = make_monitor()
+    base_items = load_fixture_items(monitor)
+    items = synthetic_items(monitor, base_items, args.items, seed=42)
+    filters = []
+    for config in random_profile_configs(args.profiles):
+        monitor.config = config
+        filters.append(monitor.get_compiled_filter())
+
+    print("=" * 60)
+    print(f"Filtros em lote: {args.profiles} perfis x {args.items} itens")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    expected = [[compiled.matches(item) for compiled in filters] for item in items]
+    loop_time = time.perf_counter() - start
+
+    matcher = BatchMatcher(filters)
+    start = time.perf_counter()
+    sparse = matcher.match(items)
+    batch_time = time.perf_counter() - start
+
+    mismatches = 0
+    for i, row in enumerate(expected):
+        wanted = [j for j, ok in enumerate(row) if ok]
+        if sparse.get(i, []) != wanted:
+            mismatches += 1
+    total_matches = sum(len(profiles) for profiles in sparse.values())
+
+    print(f"Equivalência: {len(items) - mismatches}/{len(items)} itens com os mesmos perfis")
+    print(f"Correspondências: {total_matches} (em {len(sparse)} itens)")
+    print(f"  Item a item (compilado): {loop_time:.3f}s")
+    print(f"  Lote (NumPy):            {batch_time:.3f}s")
+    print(f"  Speedup:                 {loop_time / batch_time:.1f}x")
+    return 1 if mismatches else 0
+
+
+def bench_index(args):
+    """Itens novos de cada verificação: todos os perfis vs. índice invertido (vs. lote com NumPy)"""
+    from batch_match import HAS_NUMPY, match_profiles
+    from profile_index import ProfileIndex
+
+    base_monitor = make_monitor()
+    base_items = load_fixture_items(base_monitor)
+    polls = [synthetic_items(base_monitor, base_items, args.new_items, seed=1000 + poll)
+             for poll in range(args.polls)]
+    monitors = []
+    for config in saved_search_configs(args.profiles):
+        monitor = make_monitor()
+        monitor.config = config
+        monitors.append(monitor)
+
+    print("=" * 60)
+    print(f"Índice de perfis: {args.profiles} buscas salvas, {args.polls} verificações "
+          f"com {args.new_items} itens novos")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    index = ProfileIndex(monitors)
+    print(f"Construção do índice: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    filters = [monitor.get_compiled_filter() for monitor in monitors]
+    start = time.perf_counter()
+    expected = [{monitor: {item.listing_id for item in items if compiled.matches(item)}
+                 for monitor, compiled in zip(monitors, filters)} for items in polls]
+    loop_time = time.perf_counter() - start
+
+    # Aquece os caches de normalização antes de medir o índice
+    index.match_items(polls[0])
+    start = time.perf_counter()
+    results = [index.match_items(items) for items in polls]
+    index_time = time.perf_counter() - start
+    mismatches = sum(1 for got, wanted in zip(results, expected) for monitor in monitors
+                     if got[monitor] != wanted[monitor])
+
+    print(f"Equivalência: {len(polls) * len(monitors) - mismatches}/{len(polls) * len(monitors)} "
+          f"resultados idênticos")
+    print(f"Índice: {index.summary()}")
+    print(f"\nTempo por verificação:")
+    print(f"  Todos os perfis (compilado): {loop_time / args.polls * 1000:.2f} ms")
+    if HAS_NUMPY:
+        start = time.perf_counter()
+        for items in polls:
+            match_profiles(monitors, items)
+        batch_time = time.perf_counter() - start
+        print(f"  Lote (NumPy):                {batch_time / args.polls * 1000:.2f} ms")
+    print(f"  Índice invertido:            {index_time / args.polls * 1000:.2f} ms")
+
+    # Inclusão e remoção em tempo de execução
+    extra = []
+    for config in saved_search_configs(args.churn, seed=99):
+        monitor = make_monitor()
+        monitor.config = config
+        extra.append(monitor)
+    start = time.perf_counter()
+    for monitor in extra:
+        index.add(monitor)
+    for monitor in extra:
+        index.remove(monitor)
+    churn_time = time.perf_counter() - start
+    print(f"\nIncluir e remover {args.churn} perfis: {churn_time / (2 * args.churn) * 1e6:.1f} µs por operação")
+    return 1 if mismatches else 0
+
+
+def legacy_normalize_stat(stat: str) -> str:
+    """normalize_stat original: primeira entrada do STAT_MAPPING que aparece no texto"""
+    stat_clean = stat.replace('+', '').strip()
+    stat_lower = re.sub(r'^\d+\s+', '', stat_clean.lower())
+    for key, value in TradeMonitor.STAT_MAPPING.items():
+        if key in stat_lower or value.lower() in stat_lower:
+            return value
+    return stat_clean.strip()
+
+
+def legacy_detect_slot(item_name: str):
+    """detect_slot original: laço sobre todas as palavras-chave do SLOT_KEYWORDS"""
+    item_name_lower = item_name.lower()
+    for slot, keywords in TradeMonitor.SLOT_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in item_name_lower:
+                return slot
+    return None
+
+
+def regex_detect_slot():
+    """detect_slot com uma regex combinada (KeywordMatcher), só para comparar com o laço"""
+    from bot import KeywordMatcher
+
+    keywords = [(keyword, slot) for slot, words in TradeMonitor.SLOT_KEYWORDS.items() for keyword in words]
+    matcher = KeywordMatcher(keywords)
+    # Mesma regra do laço: vence a palavra que vem primeiro no SLOT_KEYWORDS, não a mais longa
+    matcher.rank = {keyword: position for position, (keyword, _) in reversed(list(enumerate(keywords)))}
+    return lambda item_name: matcher.search(item_name.lower())
+
+
+def bench_keywords(args):
+    """normalize_stat e detect_slot: laços originais vs. atuais (regex combinada nos stats), sem e com memória"""
+    import bot
+
+    monitor = make_monitor()
+    base_items = load_fixture_items(monitor)
+    names = [item.name for item in base_items]
+    stats = [stat for item in base_items for stat in item.stats]
+
+    print("=" * 60)
+    print("Normalização de stats e detecção de slots (vocabulário do retorno.html)")
+    print("=" * 60)
+    print(f"{len(set(stats))} stats distintos, {len(set(names))} nomes distintos")
+
+    changed = sorted({(stat, legacy_normalize_stat(stat), TradeMonitor.normalize_stat(stat))
+                      for stat in stats if legacy_normalize_stat(stat) != TradeMonitor.normalize_stat(stat)})
+    for stat, old, new in changed:
+        print(f"  {stat!r}: {old} -> {new}")
+    slot_regex = regex_detect_slot()
+    slot_mismatches = sum(1 for name in names if legacy_detect_slot(name) != monitor.detect_slot(name)
+                          or legacy_detect_slot(name) != slot_regex(name))
+    print(f"Stats com outra normalização (correspondência mais longa): {len(changed)}")
+    print(f"Slots diferentes do laço original: {slot_mismatches}")
+
+    def measure(function, texts):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for text in texts:
+                function(text)
+        return (time.perf_counter() - start) / (args.repeat * len(texts)) * 1e6
+
+    def uncached(cache, function):
+        def call(text):
+            cache.clear()
+            return function(text)
+        return call
+
+    for label, texts, legacy, current, cache, regex in (
+            ("normalize_stat", stats, legacy_normalize_stat, TradeMonitor.normalize_stat, bot._NORMALIZED_STATS, None),
+            ("detect_slot", names, legacy_detect_slot, monitor.detect_slot, bot._DETECTED_SLOTS, slot_regex)):
+        legacy_time = measure(legacy, texts)
+        cold_time = measure(uncached(cache, current), texts)
+        warm_time = measure(current, texts)
+        print(f"\n{label} ({len(texts)} textos x {args.repeat}):")
+        print(f"  Laço original:     {legacy_time:.2f} µs/chamada")
+        if regex is not None:
+            print(f"  Regex combinada:   {measure(regex, texts):.2f} µs/chamada")
+        print(f"  Sem memória:       {cold_time:.2f} µs/chamada")
+        print(f"  Com memória:       {warm_time:.2f} µs/chamada ({legacy_time / warm_time:.0f}x)")
+    return 1 if slot_mismatches else 0
+
+
+class StubWebhookServer:
+    """Servidor local que aceita os POSTs do WebhookSink (com latência simulada)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.posts = 0
+        self.alerts = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub._lock:
+                    stub.posts += 1
+                    stub.alerts += sum(record.get('coalesced', 1) for record in body['alerts'])
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/alertas"
+
+
+def legacy_alert(monitor: TradeMonitor, item: Item):
+    """alert original: imprime e abre/acrescenta/fecha o alerts.log a cada item"""
+    message = monitor.format_alert(item, monitor.item_score(item))
+    print(message)
+    with open(monitor.config['log_file'], 'a', encoding='utf-8') as f:
+        f.write(f"\n{time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(message)
+        f.write("\n")
+
+
+def bench_alerts(args):
+    """Rajada de correspondências: alertas na verificação (original) vs. filas por destino"""
+    from alerts import close_all_sinks
+
+    monitor = make_monitor()
+    items = synthetic_items(monitor, load_fixture_items(monitor), args.matches)
+
+    print("=" * 60)
+    print(f"Benchmark: rajada de {args.matches} correspondências "
+          f"(webhook com {args.webhook_latency * 1000:.0f}ms por POST)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp, StubWebhookServer(args.webhook_latency) as webhook:
+        scenarios = (
+            ("Original (console + arquivo na verificação)", {}, True),
+            ("Filas, console + arquivo", {}, False),
+            ("Filas, console + arquivo + JSONL + webhook",
+             {"alert_jsonl": os.path.join(tmp, "alertas.jsonl"), "alert_webhook": webhook.url}, False),
+        )
+        for label, extra, legacy in scenarios:
+            log_file = os.path.join(tmp, f"alerts-{len(label)}.log")
+            monitor = make_monitor({"alert_method": "both", "log_file": log_file, "alert_async": True,
+                                    "archive_file": None, **extra})
+            if legacy:
+                monitor.alert = lambda item, monitor=monitor: legacy_alert(monitor, item)
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                matches = monitor.process_items(list(items))
+                poll_time = time.perf_counter() - start
+                stats = monitor.alerts.queue_stats()
+                monitor.alerts.close()
+                close_all_sinks()
+                total_time = time.perf_counter() - start
+            with open(log_file, encoding='utf-8') as f:
+                logged = f.read().count("ITEM ENCONTRADO")
+            print(f"\n{label}:")
+            print(f"  Verificação:      {poll_time * 1000:.1f}ms ({matches} alertas)")
+            print(f"  Até esvaziar:     {total_time * 1000:.1f}ms, {logged} no alerts.log")
+            for name, sink in (stats.items() if not legacy else ()):
+                print(f"  {name.split(':')[0]:<8} máx. {sink['max_depth']} na fila, {sink['batches']} lotes até o fim "
+                      f"da verificação, {sink['coalesced']} agrupados, {sink['dropped']} descartados")
+        print(f"\nWebhook: {webhook.posts} POSTs com {webhook.alerts} alertas")
+    return 0
+
+
+class StubLicenseServer:
+    """Servidor local no lugar do /validate do license_server (aceita qualquer chave)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps({'valid': True, 'message': 'Licença válida'}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/validate"
+
+
+def bench_license(args):
+    """Abertura com a licença: validação completa (fria) vs. token em cache (quente)"""
+    from license import LicenseManager
+
+    print("=" * 60)
+    print(f"Benchmark: validação da licença na abertura (servidor com {args.latency * 1000:.0f}ms de latência)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp, StubLicenseServer(args.latency) as server:
+        manager = LicenseManager(os.path.join(tmp, "license.key"), server_url=server.url)
+        manager.lock_file = os.path.join(tmp, "license.lock")
+        manager.registry_file = os.path.join(tmp, "license.registry")
+        manager.token_file = os.path.join(tmp, "license.token")
+        with open(manager.license_file, 'w', encoding='utf-8') as f:
+            f.write(manager.generate_license_key(30, "bench"))
+        # Primeira abertura: ativa a chave neste diretório temporário
+        with contextlib.redirect_stdout(io.StringIO()):
+            is_valid, message = manager.load_license()
+        if not is_valid:
+            print(f"❌ {message}")
+            return 1
+
+        def launch(cold: bool) -> tuple:
+            if cold:
+                manager.clear_validation_token()
+            requests_before = server.requests
+            start = time.perf_counter()
+            valid, _ = manager.load_license()
+            return time.perf_counter() - start, server.requests - requests_before, valid, manager.validated_from_cache
+
+        for label, cold in (("Fria (validação completa)", True), ("Quente (token em cache)", False)):
+            results = [launch(cold) for _ in range(args.repeat)]
+            timings = sorted(result[0] for result in results)
+            all_valid = all(result[2] for result in results)
+            cached = sum(1 for result in results if result[3])
+            print(f"\n{label}:")
+            print(f"  Mediana: {timings[len(timings) // 2] * 1000:.2f}ms, máx. {timings[-1] * 1000:.2f}ms")
+            print(f"  Requisições ao servidor por abertura: {results[-1][1]}")
+            print(f"  Válida: {'sim' if all_valid else 'NÃO'}, token usado em {cached}/{len(results)} aberturas")
+
+        # Revalidação em segundo plano: renova o token sem bloquear quem chamou
+        done = threading.Event()
+        start = time.perf_counter()
+        thread = manager.revalidate_in_background(lambda valid, message: done.set())
+        returned = time.perf_counter() - start
+        done.wait(30)
+        print(f"\nRevalidação em segundo plano: retorno em {returned * 1000:.2f}ms, "
+              f"concluída em {(time.perf_counter() - start) * 1000:.0f}ms")
+        thread.join()
+    return 0
+
+
+def registry_hash(i: int) -> str:
+    """Hash de licença sintético (mesmo formato do get_original_license_hash)"""
+    return hashlib.sha256(f"licenca-{i}".encode('utf-8')).hexdigest()
+
+
+def fill_registry(registry, start: int, stop: int, batch: int = 50_000):
+    """Acrescenta as ativações sintéticas start..stop-1 ao registro"""
+    from license_registry import JsonLicenseRegistry, DATE_SUFFIX
+
+    date = "2024-01-01 00:00:00"
+    if isinstance(registry, JsonLicenseRegistry):
+        data = registry.load()
+        for i in range(start, stop):
+            data[registry_hash(i)] = f"maquina-{i}"
+            data[registry_hash(i) + DATE_SUFFIX] = date
+        registry.save(data)
+        return
+    for first in range(start, stop, batch):
+        registry.insert_many((registry_hash(i), f"maquina-{i}", date)
+                             for i in range(first, min(stop, first + batch)))
+
+
+def latency_stats(function, calls) -> str:
+    """p50/p99 (µs) de uma função chamada com cada argumento"""
+    timings = []
+    for argument in calls:
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1e6
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1e6
+    return f"p50 {p50:8.0f}µs  p99 {p99:8.0f}µs"
+
+
+def _registry_race(task):
+    """Um worker da corrida de ativações (processo separado, como no gunicorn -w 4)"""
+    from license_registry import open_registry
+
+    backend, path, worker, keys, shared = task
+    registry = open_registry(backend, path)
+    won = []
+    for i in range(keys):
+        # Compartilhadas: as mesmas chaves em todos os processos, depois das exclusivas de cada um
+        key = registry_hash(10 ** 8 + i if shared else worker * keys + i)
+        activated, _ = registry.activate(key, f"worker-{worker}")
+        if activated:
+            won.append(key)
+    registry.close()
+    return won
+
+
+def bench_registry(args):
+    """Registro do servidor de licenças: latência com o registro crescendo e ativações concorrentes"""
+    import multiprocessing
+    from license_registry import JsonLicenseRegistry, SqliteLicenseRegistry
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    rng = random.Random(args.seed)
+
+    print("=" * 60)
+    print(f"Benchmark: registro de licenças com até {max(sizes):,} chaves")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [("SQLite (WAL)", SqliteLicenseRegistry(os.path.join(tmp, "registro.db"), legacy_json=None),
+                     args.ops, max(sizes))]
+        if args.json_max:
+            backends.append(("JSON (anterior)", JsonLicenseRegistry(os.path.join(tmp, "registro.json")),
+                             max(1, args.ops // 100), args.json_max))
+
+        for label, registry, ops, max_size in backends:
+            print(f"\n{label}:")
+            size = 0
+            fresh = 10 ** 9
+            for target in sizes:
+                if target > max_size:
+                    break
+                fill_registry(registry, size, target)
+                size = target
+                lookups = latency_stats(registry.lookup, (registry_hash(rng.randrange(size)) for _ in range(ops)))
+                activations = latency_stats(lambda key: registry.activate(key, "maquina-nova"),
+                                            [registry_hash(fresh + i) for i in range(ops)])
+                fresh += ops
+                size += ops
+                # O que o /stats lê: total, ativações por dia e a primeira página
+                stats = latency_stats(lambda _: (registry.count(), registry.activations_per_day(30),
+                                                 registry.page(None, 10)), range(max(1, ops // 10)))
+                print(f"  {target:>9,} chaves | consulta {lookups} | ativação {activations} | /stats {stats}")
+            registry.close()
+
+        # Vários processos ativando ao mesmo tempo, como os workers do gunicorn
+        print(f"\nAtivações concorrentes ({args.workers} processos x {args.race_keys} chaves):")
+        for backend, path in (("sqlite", os.path.join(tmp, "corrida.db")), ("json", os.path.join(tmp, "corrida.json"))):
+            if backend == 'sqlite':
+                SqliteLicenseRegistry(path, legacy_json=None).close()
+            with multiprocessing.Pool(args.workers) as pool:
+                distinct = pool.map(_registry_race, [(backend, path, w, args.race_keys, False)
+                                                     for w in range(args.workers)])
+                shared = pool.map(_registry_race, [(backend, path, w, args.race_keys, True)
+                                                   for w in range(args.workers)])
+            from license_registry import open_registry
+            registry = open_registry(backend, path)
+            expected = args.workers * args.race_keys + args.race_keys
+            winners = [key for won in shared for key in won]
+            print(f"  {backend:6}: {registry.count():,}/{expected:,} ativações gravadas, "
+                  f"{len(winners) - len(set(winners))} chaves compartilhadas ativadas por mais de um processo")
+            registry.close()
+    return 0
+
+
+def bench_validation(args):
+    """Requisições check no /validate: sem cache vs. cache do registro e memória do hash por worker"""
+    from license import LicenseManager
+    from license_registry import (CachedLicenseRegistry, JsonLicenseRegistry, LRUCache,
+                                  SqliteLicenseRegistry)
+
+    rng = random.Random(args.seed)
+    manager = LicenseManager("license.key")
+    keys = [manager.generate_license_key(30, f"cliente-{i}") for i in range(args.keys)]
+    machines = [f"maquina-{i}" for i in range(args.keys)]
+    requests_order = [rng.randrange(args.keys) for _ in range(args.requests)]
+
+    print("=" * 60)
+    print(f"Benchmark: {args.requests} checks de {args.keys} clientes "
+          f"(registro com {args.registry_size:,} chaves)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # O servidor abre o registro ao ser importado: aponta para o diretório temporário
+        os.environ['LICENSE_REGISTRY_PATH'] = os.path.join(tmp, "importacao.db")
+        try:
+            import license_server
+        finally:
+            del os.environ['LICENSE_REGISTRY_PATH']
+        client = license_server.app.test_client()
+
+        backends = [("SQLite", SqliteLicenseRegistry(os.path.join(tmp, "registro.db"), legacy_json=None))]
+        if args.json:
+            backends.append(("JSON", JsonLicenseRegistry(os.path.join(tmp, "registro.json"))))
+        for label, backend in backends:
+            fill_registry(backend, 0, args.registry_size)
+            # Metade dos clientes já ativou a licença
+            for i in range(0, args.keys, 2):
+                backend.activate(license_server.get_original_license_hash(keys[i]), machines[i])
+
+            print(f"\n{label}:")
+            variants = (
+                ("Sem cache", lambda: backend, lambda: LRUCache(0)),
+                ("Com cache", lambda: CachedLicenseRegistry(backend),
+                 lambda: LRUCache(license_server.HASH_CACHE_SIZE)))
+            for variant, make_registry, make_hash_cache in variants:
+                # Hash + consulta ao registro, sem o Flask
+                license_server.registry, license_server.hash_cache = make_registry(), make_hash_cache()
+                start = time.perf_counter()
+                for i in requests_order:
+                    license_server.registry.lookup(license_server.original_license_hash(keys[i]))
+                lookup_time = (time.perf_counter() - start) / args.requests
+
+                # Requisição completa, com caches novos
+                license_server.registry, license_server.hash_cache = make_registry(), make_hash_cache()
+                answers = []
+                start = time.perf_counter()
+                for i in requests_order:
+                    response = client.post('/validate', json={'license_key': keys[i], 'machine_id': machines[i],
+                                                              'action': 'check'})
+                    answers.append(response.get_json()['already_activated'])
+                elapsed = time.perf_counter() - start
+                print(f"  {variant}: hash + consulta {lookup_time * 1e6:.1f}µs; requisição "
+                      f"{elapsed / args.requests * 1e6:.0f}µs ({args.requests / elapsed:.0f} req/s); "
+                      f"{sum(answers)} já ativadas")
+            cache = client.get('/stats').get_json()['cache']
+            print(f"  Registro: {cache['registry']['hit_rate']:.1%} de acertos; "
+                  f"hash: {cache['license_hash']['hit_rate']:.1%} de acertos")
+            backend.close()
+    return 0
+
+
+def bench_batch_validation(args):
+    """Revendedor ativando N chaves: check + activate por chave vs. /validate/batch"""
+    import logging
+    from werkzeug.serving import make_server
+    from license import LicenseManager
+
+    print("=" * 60)
+    print(f"Benchmark: ativação de {args.keys} chaves (latência simulada de {args.latency * 1000:.0f}ms por requisição)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['LICENSE_REGISTRY_PATH'] = os.path.join(tmp, "registro.db")
+        try:
+            import license_server
+        finally:
+            del os.environ['LICENSE_REGISTRY_PATH']
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        requests_served = [0]
+
+        def app(environ, start_response):
+            # Ida e volta até o servidor de licenças
+            requests_served[0] += 1
+            time.sleep(args.latency)
+            return license_server.app(environ, start_response)
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        manager = LicenseManager(os.path.join(tmp, "license.key"),
+                                 server_url=f"http://127.0.0.1:{server.server_port}/validate")
+        try:
+            for label, prefix in (("Uma chave por vez (check + activate)", "individual"), ("Em lotes", "lote")):
+                keys = [manager.generate_license_key(30, f"{prefix}-{i}") for i in range(args.keys)]
+                requests_served[0] = 0
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if prefix == "individual":
+                        activated = 0
+                        for key in keys:
+                            if manager.check_license_online(key, "revendedor", 'check')[0]:
+                                activated += manager.check_license_online(key, "revendedor", 'activate')[0]
+                    else:
+                        results = manager.check_licenses_online([(key, "revendedor", 'activate') for key in keys],
+                                                                batch_size=args.batch_size)
+                        activated = sum(is_valid for is_valid, _ in results)
+                elapsed = time.perf_counter() - start
+                print(f"\n{label}:")
+                print(f"  {elapsed:.2f}s, {requests_served[0]} requisição(ões), {activated}/{args.keys} ativadas")
+        finally:
+            server.shutdown()
+            license_server.registry.close()
+    return 0
+
+
+def suite_cases(cards: int, seed: int):
+    """
+    Casos da suíte: nome -> (função medida, descrição)
+
+    Cada função devolve um resultado determinístico (itens extraídos, correspondências),
+    gravado no baseline junto com os tempos para detectar mudanças de comportamento.
+    """
+    import bot
+    from bot import iter_card_fragments
+
+    monitor = make_monitor()
+    fixture_html = FIXTURE_HTML.read_text(encoding='utf-8')
+    page_html = generate_trade_page(cards, seed)
+    chunks = [page_html[i:i + 8192] for i in range(0, len(page_html), 8192)]
+    page_items = monitor.parse_items(page_html)
+    stats = [stat for item in page_items for stat in item.stats]
+    names = [item.name for item in page_items]
+
+    def parse(html, backend):
+        return lambda: len(monitor.parse_items(html, backend=backend))
+
+    def stream():
+        return sum(1 for fragment in iter_card_fragments(chunks) if monitor.parse_card_fragment(fragment))
+
+    def cold(cache, function, texts):
+        def run():
+            cache.clear()
+            return len({function(text) for text in texts})
+        return run
+
+    def warm(function, texts):
+        return lambda: len({function(text) for text in texts})
+
+    def matching(function_name):
+        def run():
+            hits = 0
+            for config in FILTER_CONFIGS:
+                monitor.config = dict(config)
+                function = getattr(monitor, function_name)
+                hits += sum(1 for item in page_items if function(item))
+            return hits
+        return run
+
+    cases = {
+        'parse/lxml/retorno': (parse(fixture_html, 'lxml'), "parse_items (lxml) no retorno.html"),
+        'parse/bs4/retorno': (parse(fixture_html, 'bs4'), "parse_items (bs4) no retorno.html"),
+        'parse/lxml/gerada': (parse(page_html, 'lxml'), f"parse_items (lxml), página de {cards} cards"),
+        'parse/stream/gerada': (stream, f"Cards em streaming (chunks de 8KB), página de {cards} cards"),
+        'normalizacao/stat/frio': (cold(bot._NORMALIZED_STATS, TradeMonitor.normalize_stat, stats),
+                                   "normalize_stat sem memória"),
+        'normalizacao/stat/memoria': (warm(TradeMonitor.normalize_stat, stats), "normalize_stat com memória"),
+        'normalizacao/slot/frio': (cold(bot._DETECTED_SLOTS, monitor.detect_slot, names), "detect_slot sem memória"),
+        'normalizacao/slot/memoria': (warm(monitor.detect_slot, names), "detect_slot com memória"),
+        'filtros/compilado': (matching('item_matches_filters'),
+                              f"item_matches_filters, {len(FILTER_CONFIGS)} configs x {cards} itens"),
+        'filtros/referencia': (matching('item_matches_filters_reference'),
+                               f"Implementação de referência, {len(FILTER_CONFIGS)} configs x {cards} itens"),
+    }
+    return cases, fixture_html, page_html
+
+
+def poll_cycle(server: 'StubTradeServer', config: dict):
+    """Verificação completa (fetch_items + process_items) com o registro de vistos vazio"""
+    monitor = make_monitor({"skip_unchanged": False, "archive_file": None, **config})
+    monitor.BASE_URL = server.trade_url
+
+    def run():
+        monitor.seen_items.clear()
+        monitor.crawled_items.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            items = monitor.fetch_items()
+            matches = monitor.process_items(items)
+        return [len(items), matches]
+    return run
+
+
+def measure_case(function, repeat: int) -> dict:
+    """Executa o caso repeat vezes (após um aquecimento) e resume os tempos"""
+    result = function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        current = function()
+        timings.append(time.perf_counter() - start)
+        if current != result:
+            result = None  # Resultado instável: não entra na comparação
+    timings.sort()
+    return {'median': timings[len(timings) // 2], 'min': timings[0], 'max': timings[-1],
+            'rounds': repeat, 'result': result}
+
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> int:
+    """Compara a execução com um baseline; devolve o número de regressões"""
+    same_input = all(baseline.get(key) == results[key] for key in ('cards', 'seed'))
+    if not same_input:
+        print("⚠️  Baseline gerado com outra página (--cards/--seed): só os tempos são comparados")
+    regressions = 0
+    print(f"\nComparação com o baseline de {baseline.get('created', '?')} (tolerância: {tolerance:.0%})")
+    for name, case in results['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if previous is None:
+            print(f"  {name:<28} (novo)")
+            continue
+        ratio = case['median'] / previous['median'] if previous['median'] else 1.0
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "❌ mais lento"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            status = "mais rápido"
+        if same_input and None not in (case['result'], previous['result']) and case['result'] != previous['result']:
+            status = f"❌ resultado mudou ({previous['result']} -> {case['result']})"
+            regressions += 1
+        print(f"  {name:<28} {ratio:>5.2f}x  {status}")
+    return regressions
+
+
+def bench_suite(args):
+    """
+    Suíte offline: parse, normalização, filtros e a verificação completa contra um servidor local
+
+    Os tempos (mediana das rodadas) e os resultados de cada caso podem ser gravados como
+    baseline em JSON (--save) e comparados em execuções futuras (--compare).
+    """
+    from bot import DEFAULT_PARSER
+
+    cases, fixture_html, page_html = suite_cases(args.cards, args.seed)
+
+    print("=" * 60)
+    print(f"Suíte de benchmarks ({args.repeat} rodadas por caso, página gerada com {args.cards} cards)")
+    print("=" * 60)
+
+    results = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'parser': DEFAULT_PARSER,
+        'cards': args.cards,
+        'seed': args.seed,
+        'cases': {}
+    }
+
+    def run(name, function, description):
+        if args.k and args.k not in name:
+            return
+        case = measure_case(function, args.repeat)
+        results['cases'][name] = case
+        print(f"  {name:<28} {case['median'] * 1000:>9.3f} ms  (mín. {case['min'] * 1000:.3f})  {description}")
+
+    for name, (function, description) in cases.items():
+        run(name, function, description)
+
+    config = {"quality": [5, 6], "min_level": 24, "stats": ["STR", "INT"], "stat_min": {"STR": 30}}
+    for label, html in (('retorno', fixture_html), ('gerada', page_html)):
+        with StubTradeServer(html) as server:
+            run(f'ciclo/{label}', poll_cycle(server, config),
+                "fetch_items + process_items (servidor local)")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline gravado em {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_baseline(results, baseline, args.tolerance)
+        print(f"\n{'❌' if regressions else '✅'} {regressions} regressão(ões)")
+        return 1 if regressions else 0
+    return 0
+
+
+def bench_page(args):
+    """Grava uma página de trade gerada (para usar com o servidor local ou o parser)"""
+    html = generate_trade_page(args.cards, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(html)
+    print(f"Página com {args.cards} cards gravada em {args.output} ({len(html) // 1024} KB)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks do Bot DreadmystDB')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    filters_parser = subparsers.add_parser('filtros', help='Filtro compilado vs. implementação original')
+    filters_parser.add_argument('--items', type=int, default=100_000, help='Número de itens (padrão: 100000)')
+    filters_parser.set_defaults(func=bench_filters)
+
+    parser_parser = subparsers.add_parser('parser', help='Backend bs4 vs. lxml no retorno.html')
+    parser_parser.add_argument('--repeat', type=int, default=50, help='Repetições por backend (padrão: 50)')
+    parser_parser.set_defaults(func=bench_parser)
+
+    async_parser = subparsers.add_parser('async', help='Perfis em threads vs. perfis no asyncio (servidor local)')
+    async_parser.add_argument('--profiles', type=int, default=50, help='Número de perfis (padrão: 50)')
+    async_parser.add_argument('--polls', type=int, default=5, help='Verificações por perfil (padrão: 5)')
+    async_parser.add_argument('--latency', type=float, default=0.05,
+                              help='Latência simulada do servidor em segundos (padrão: 0.05)')
+    async_parser.set_defaults(func=bench_async)
+
+    conditional_parser = subparsers.add_parser('condicional',
+                                               help='Verificações ignoradas com GET condicional e hash dos anúncios')
+    conditional_parser.add_argument('--polls', type=int, default=60, help='Número de verificações (padrão: 60)')
+    conditional_parser.add_argument('--change-every', type=int, default=10,
+                                    help='A página muda a cada N verificações (padrão: 10)')
+    conditional_parser.set_defaults(func=bench_conditional)
+
+    seen_parser = subparsers.add_parser('vistos', help='Registro de vistos: set de strings vs. SeenStore')
+    seen_parser.add_argument('--items', type=int, default=100_000, help='Número de anúncios (padrão: 100000)')
+    seen_parser.set_defaults(func=bench_seen)
+
+    scheduler_parser = subparsers.add_parser('agendador', help='Intervalo fixo vs. adaptativo em um dia simulado')
+    scheduler_parser.add_argument('--interval', type=float, default=20, help='check_interval (padrão: 20)')
+    scheduler_parser.set_defaults(func=bench_scheduler)
+
+    archive_parser = subparsers.add_parser('arquivo', help='Gravação e consultas no arquivo histórico (SQLite)')
+    archive_parser.add_argument('--items', type=int, default=1_000_000, help='Número de itens (padrão: 1000000)')
+    archive_parser.add_argument('--repeat', type=int, default=20, help='Repetições por consulta (padrão: 20)')
+    archive_parser.set_defaults(func=bench_archive)
+
+    items_parser = subparsers.add_parser('itens', help='Memória: dataclass original vs. Item compacto')
+    items_parser.add_argument('--items', type=int, default=1_000_000, help='Número de itens (padrão: 1000000)')
+    items_parser.set_defaults(func=bench_items)
+
+    batch_parser = subparsers.add_parser('lote', help='Filtros item a item vs. em lote (NumPy), vários perfis')
+    batch_parser.add_argument('--profiles', type=int, default=1000, help='Número de perfis (padrão: 1000)')
+    batch_parser.add_argument('--items', type=int, default=3000, help='Número de itens (padrão: 3000)')
+    batch_parser.set_defaults(func=bench_batch)
+
+    index_parser = subparsers.add_parser('indice', help='Itens novos x buscas salvas: todos os perfis vs. índice invertido')
+    index_parser.add_argument('--profiles', type=int, default=5000, help='Número de buscas salvas (padrão: 5000)')
+    index_parser.add_argument('--polls', type=int, default=50, help='Número de verificações (padrão: 50)')
+    index_parser.add_argument('--new-items', type=int, default=30, help='Itens novos por verificação (padrão: 30)')
+    index_parser.add_argument('--churn', type=int, default=1000, help='Perfis incluídos e removidos (padrão: 1000)')
+    index_parser.set_defaults(func=bench_index)
+
+    keywords_parser = subparsers.add_parser('normalizacao', help='normalize_stat e detect_slot: laços vs. regex combinada')
+    keywords_parser.add_argument('--repeat', type=int, default=200, help='Repetições do vocabulário (padrão: 200)')
+    keywords_parser.set_defaults(func=bench_keywords)
+
+    alerts_parser = subparsers.add_parser('alertas', help='Rajada de alertas: na verificação vs. filas por destino')
+    alerts_parser.add_argument('--matches', type=int, default=500, help='Correspondências na rajada (padrão: 500)')
+    alerts_parser.add_argument('--webhook-latency', type=float, default=0.05,
+                               help='Latência de cada POST do webhook em segundos (padrão: 0.05)')
+    alerts_parser.set_defaults(func=bench_alerts)
+
+    registry_parser = subparsers.add_parser('registro', help='Registro do servidor de licenças: SQLite vs. JSON, até 1 milhão de chaves')
+    registry_parser.add_argument('--sizes', default='1000,10000,100000,1000000',
+                                 help='Tamanhos do registro medidos, separados por vírgula (padrão: 1000,10000,100000,1000000)')
+    registry_parser.add_argument('--ops', type=int, default=2000, help='Consultas e ativações medidas por tamanho (padrão: 2000)')
+    registry_parser.add_argument('--json-max', type=int, default=100_000,
+                                 help='Maior tamanho medido no registro JSON, 0 para pular (padrão: 100000)')
+    registry_parser.add_argument('--workers', type=int, default=4, help='Processos na corrida de ativações (padrão: 4)')
+    registry_parser.add_argument('--race-keys', type=int, default=200, help='Chaves por processo na corrida (padrão: 200)')
+    registry_parser.add_argument('--seed', type=int, default=1234)
+    registry_parser.set_defaults(func=bench_registry)
+
+    validation_parser = subparsers.add_parser('validacao', help='Checks no /validate: sem cache vs. cache por worker')
+    validation_parser.add_argument('--keys', type=int, default=1000, help='Clientes (chaves de licença) distintos (padrão: 1000)')
+    validation_parser.add_argument('--requests', type=int, default=5000, help='Requisições check (padrão: 5000)')
+    validation_parser.add_argument('--registry-size', type=int, default=100_000,
+                                   help='Outras ativações no registro (padrão: 100000)')
+    validation_parser.add_argument('--json', action='store_true', help='Mede também o registro JSON (lento sem cache)')
+    validation_parser.add_argument('--seed', type=int, default=1234)
+    validation_parser.set_defaults(func=bench_validation)
+
+    activation_parser = subparsers.add_parser('ativacoes', help='Ativação de muitas chaves: uma requisição por chave vs. /validate/batch')
+    activation_parser.add_argument('--keys', type=int, default=500, help='Chaves ativadas (padrão: 500)')
+    activation_parser.add_argument('--latency', type=float, default=0.02,
+                                   help='Latência simulada por requisição em segundos (padrão: 0.02)')
+    activation_parser.add_argument('--batch-size', type=int, default=1000, help='Chaves por requisição em lote (padrão: 1000)')
+    activation_parser.set_defaults(func=bench_batch_validation)
+
+    license_parser = subparsers.add_parser('licenca', help='Abertura: validação completa da licença vs. token em cache')
+    license_parser.add_argument('--latency', type=float, default=0.3,
+                                help='Latência simulada do servidor de licenças em segundos (padrão: 0.3)')
+    license_parser.add_argument('--repeat', type=int, default=10, help='Aberturas por cenário (padrão: 10)')
+    license_parser.set_defaults(func=bench_license)
+
+    suite_parser = subparsers.add_parser('suite', help='Suíte offline (parse, normalização, filtros, verificação) '
+                                                      'com baseline em JSON')
+    suite_parser.add_argument('--repeat', type=int, default=20, help='Rodadas por caso (padrão: 20)')
+    suite_parser.add_argument('--cards', type=int, default=500, help='Cards da página gerada (padrão: 500)')
+    suite_parser.add_argument('--seed', type=int, default=1234, help='Semente da página gerada (padrão: 1234)')
+    suite_parser.add_argument('-k', help='Roda só os casos cujo nome contém o texto')
+    suite_parser.add_argument('--save', metavar='ARQUIVO', help='Grava os resultados como baseline (JSON)')
+    suite_parser.add_argument('--compare', metavar='ARQUIVO', help='Compara com um baseline gravado')
+    suite_parser.add_argument('--tolerance', type=float, default=0.25,
+                              help='Aumento da mediana aceito antes de acusar regressão (padrão: 0.25)')
+    suite_parser.set_defaults(func=bench_suite)
+
+    page_parser = subparsers.add_parser('pagina', help='Gera uma página de trade com N cards')
+    page_parser.add_argument('--cards', type=int, default=500, help='Número de cards (padrão: 500)')
+    page_parser.add_argument('--seed', type=int, default=1234, help='Semente (padrão: 1234)')
+    page_parser.add_argument('-o', '--output', default='pagina_gerada.html', help='Arquivo de saída')
+    page_parser.set_defaults(func=bench_page)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,27 +10,489 @@ import time
 import json
 import re
 from datetime import datetime
-from typing import List, Dict, Set, Optional
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Set, Optional, Iterable, Iterator
 import sys
+import os
+import codecs
+import hashlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from seen_store import SeenStore, open_seen_store, DEFAULT_MAX_ITEMS
+from scheduler import PollScheduler
+from metrics import PhaseMetrics, TimedHTTPAdapter, serve_metrics
+from alerts import AlertDispatcher
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Backend de parse padrão (lxml é bem mais rápido; bs4 é a implementação de referência)
+DEFAULT_PARSER = 'lxml' if HAS_LXML else 'bs4'
+
+# Qualidades de affix exibidas nos cards
+AFFIX_QUALITIES = ['Fine', 'Pristine', 'Superior', 'Exquisite']
+
+
+# Domínio dos links dos anúncios
+SITE_URL = "https://dreadmystdb.com"
+
+_STAT_TEXT_RE = re.compile(r'^\+?(\d+)\s+(.+)$')
+# Nome do stat no card -> posição no vetor de stats (None = stat fora do STAT_MAPPING)
+_STAT_SLOT_CACHE: Dict[str, Optional[int]] = {}
+# Textos dos stats -> (tupla internada, vetor): itens com os mesmos stats compartilham os dois
+_STATS_CACHE: Dict[tuple, tuple] = {}
+_STATS_CACHE_MAX = 50_000
+# Memória de normalize_stat e detect_slot (texto original -> resultado)
+_NORMALIZED_STATS: Dict[str, str] = {}
+_DETECTED_SLOTS: Dict[str, Optional[str]] = {}
+_KEYWORD_CACHE_MAX = 50_000
+_LEADING_NUMBER_RE = re.compile(r'^\d+\s+')
+
+
+def parse_gold(price: str) -> Optional[int]:
+    """Converte o preço do card ("1,800,000g") em gold (None se não houver número)"""
+    digits = re.sub(r'\D', '', price or '')
+    return int(digits) if digits else None
+
+
+def format_gold(gold: Optional[int]) -> str:
+    """Formata o gold como no card ("1,800,000g"), ou "?" se for None"""
+    return f"{gold:,}g" if gold is not None else "?"
+
+
+def _intern(text: Optional[str]) -> Optional[str]:
+    return sys.intern(text) if text else text
+
+
+def stat_vector(stats: Iterable[str]) -> bytes:
+    """
+    Vetor de stats de largura fixa: um uint16 por stat de STAT_NAMES (valores somados)
+    
+    Stats fora do STAT_MAPPING ficam só na lista de textos do item.
+    """
+    values = [0] * len(STAT_NAMES)
+    for text in stats:
+        match = _STAT_TEXT_RE.match(text.strip())
+        if not match:
+            continue
+        name = match.group(2)
+        index = _STAT_SLOT_CACHE.get(name, -1)
+        if index == -1:
+            index = _STAT_SLOT_CACHE[name] = STAT_INDEX.get(TradeMonitor.normalize_stat(name))
+        if index is not None:
+            values[index] = min(0xFFFF, values[index] + int(match.group(1)))
+    return _STAT_VECTOR.pack(*values)
+
+
+def _shared_stats(stats: tuple) -> tuple:
+    """Tupla de stats e vetor de stats compartilhados entre itens com os mesmos stats"""
+    shared = _STATS_CACHE.get(stats)
+    if shared is None:
+        if len(_STATS_CACHE) >= _STATS_CACHE_MAX:
+            _STATS_CACHE.clear()
+        interned = tuple(_intern(stat) for stat in stats)
+        shared = _STATS_CACHE[interned] = (interned, stat_vector(interned))
+    return shared
 
 
-@dataclass
 class Item:
-    """Representa um item encontrado no trade"""
-    listing_id: str
-    name: str
-    item_level: str
-    stats: List[str]
-    price: str
-    seller: str
-    time_left: str
-    url: str
-    slot: Optional[str] = None
-    affix_quality: Optional[str] = None  # Fine, Pristine, Superior, Exquisite
+    """
+    Representa um item encontrado no trade
+    
+    Registro compacto (__slots__): nível e preço já convertidos em inteiros, textos
+    repetidos (vendedor, slot, stats...) internados e os stats também em um vetor
+    de largura fixa (stat_values), preenchido uma única vez na criação. Os atributos
+    item_level, price e url continuam disponíveis como texto, e to_dict() devolve o
+    mesmo dict de antes (price é o texto do card, mesmo quando parse_gold não o entende).
+    """
+    __slots__ = ('listing_id', 'name', 'level', 'stats', 'gold', 'seller', 'time_left',
+                 'slot', 'affix_quality', 'stat_values', '_price', '_url')
+
+    def __init__(self, listing_id: str, name: str, item_level: str, stats: Iterable[str], price: str,
+                 seller: str, time_left: str, url: Optional[str] = None, slot: Optional[str] = None,
+                 affix_quality: Optional[str] = None):
+        self.listing_id = listing_id
+        self.name = _intern(name)
+        self.level = int(item_level) if str(item_level).isdigit() else None
+        self.stats, self.stat_values = _shared_stats(tuple(stats))
+        self.gold = parse_gold(price)
+        # O texto do preço só é guardado se format_gold não o reproduzir ("1.8M", "?"...)
+        self._price = price if price != format_gold(self.gold) else None
+        self.seller = _intern(seller)
+        self.time_left = _intern(time_left)
+        self.slot = _intern(slot)
+        self.affix_quality = _intern(affix_quality)  # Fine, Pristine, Superior, Exquisite
+        # A URL só é guardada se não for a padrão do anúncio
+        self._url = url if url != f"{SITE_URL}/trade/{listing_id}" else None
+
+    @property
+    def item_level(self) -> str:
+        return str(self.level) if self.level is not None else "?"
+
+    @property
+    def price(self) -> str:
+        return self._price if self._price is not None else format_gold(self.gold)
+
+    @property
+    def url(self) -> str:
+        return self._url if self._url is not None else f"{SITE_URL}/trade/{self.listing_id}"
+
+    def stat_tuple(self) -> tuple:
+        """Valores de todos os stats conhecidos, na ordem de STAT_NAMES"""
+        return _STAT_VECTOR.unpack(self.stat_values)
+
+    def stat_value(self, stat: str) -> int:
+        """Valor de um stat normalizado (0 se o item não tiver)"""
+        index = STAT_INDEX.get(stat)
+        if index is None:
+            return 0
+        return struct.unpack_from('<H', self.stat_values, 2 * index)[0]
 
     def to_dict(self):
-        return asdict(self)
+        return {
+            'listing_id': self.listing_id,
+            'name': self.name,
+            'item_level': self.item_level,
+            'stats': list(self.stats),
+            'price': self.price,
+            'seller': self.seller,
+            'time_left': self.time_left,
+            'url': self.url,
+            'slot': self.slot,
+            'affix_quality': self.affix_quality
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.to_dict().items())
+        return f"Item({fields})"
+
+
+# Campos do config que influenciam os filtros locais (usados para detectar mudanças)
+FILTER_CONFIG_KEYS = ('slots', 'primary_stats', 'primary_stats_mode', 'stats', 'affix_quality', 'filter_mode',
+                      'stat_min', 'score_weights', 'score_per_gold', 'min_score')
+
+
+def filter_config_signature(config: Dict) -> tuple:
+    """Retorna uma assinatura imutável dos campos de filtro do config"""
+    signature = []
+    for key in FILTER_CONFIG_KEYS:
+        value = config.get(key)
+        if isinstance(value, list):
+            value = tuple(value)
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        signature.append(value)
+    return tuple(signature)
+
+
+class CompiledFilter:
+    """
+    Filtros do config compilados em um predicado imutável
+
+    Slots e stats configurados são normalizados uma única vez. A normalização dos
+    stats dos itens é memorizada como máscaras de bits (quais stats configurados
+    cada stat do item satisfaz), então cada item custa apenas consultas em dicionário.
+    Mínimos por stat (stat_min) e a pontuação (score_weights) usam as posições do
+    vetor de stats do item. O resultado é idêntico ao de
+    TradeMonitor.item_matches_filters_reference.
+    """
+
+    __slots__ = (
+        'signature', 'filter_mode', 'accept_all',
+        'has_slot_filter', 'slots',
+        'has_primary_stat_filter', 'primary_stats', 'primary_stats_mode', 'primary_full_mask',
+        'has_stat_filter', 'stats',
+        'has_affix_quality_filter', 'affix_qualities',
+        'stat_minimums', 'score_weights', 'score_per_gold', 'min_score', 'has_thresholds',
+        '_normalize_stat', '_normalize_slot', '_stat_masks', '_slot_cache'
+    )
+
+    def __init__(self, config: Dict, normalize_stat, normalize_slot):
+        self.signature = filter_config_signature(config)
+        self._normalize_stat = normalize_stat
+        self._normalize_slot = normalize_slot
+        self._stat_masks: Dict[str, tuple] = {}
+        self._slot_cache: Dict[str, str] = {}
+
+        self.has_slot_filter = bool(config.get('slots'))
+        self.has_primary_stat_filter = bool(config.get('primary_stats'))
+        self.has_stat_filter = bool(config.get('stats'))
+        self.has_affix_quality_filter = bool(config.get('affix_quality'))
+        self.filter_mode = config.get('filter_mode', 'AND').upper()
+
+        self.stat_minimums = tuple((self._stat_index(stat, 'stat_min'), minimum)
+                                   for stat, minimum in (config.get('stat_min') or {}).items())
+        self.score_weights = tuple((self._stat_index(stat, 'score_weights'), weight)
+                                   for stat, weight in (config.get('score_weights') or {}).items())
+        self.score_per_gold = bool(config.get('score_per_gold'))
+        self.min_score = config.get('min_score')
+        self.has_thresholds = bool(self.stat_minimums) or (self.min_score is not None and bool(self.score_weights))
+
+        self.accept_all = not (self.has_slot_filter or self.has_primary_stat_filter
+                               or self.has_stat_filter or self.has_affix_quality_filter
+                               or self.has_thresholds)
+
+        self.slots = frozenset(normalize_slot(s) for s in config['slots']) if self.has_slot_filter else frozenset()
+
+        if self.has_primary_stat_filter:
+            self.primary_stats = tuple(normalize_stat(s).upper() for s in config['primary_stats'])
+        else:
+            self.primary_stats = ()
+        self.primary_stats_mode = config.get('primary_stats_mode', 'OR')
+        self.primary_full_mask = (1 << len(self.primary_stats)) - 1
+
+        self.stats = tuple(normalize_stat(s).upper() for s in config['stats']) if self.has_stat_filter else ()
+
+        if self.has_affix_quality_filter:
+            self.affix_qualities = frozenset(q.lower() for q in config['affix_quality'])
+        else:
+            self.affix_qualities = frozenset()
+
+    def _stat_index(self, stat: str, key: str) -> int:
+        """Posição do stat no vetor de stats dos itens (-1 se não for um stat conhecido)"""
+        index = STAT_INDEX.get(self._normalize_stat(stat))
+        if index is None:
+            print(f"⚠ Stat desconhecido em {key}: {stat} (valor considerado 0)", file=sys.stderr)
+            return -1
+        return index
+
+    @staticmethod
+    def _stat_mask(item_stat_normalized: str, config_stats: tuple) -> int:
+        """Máscara com os stats configurados que correspondem a um stat do item"""
+        mask = 0
+        for i, config_stat in enumerate(config_stats):
+            if (config_stat == item_stat_normalized or config_stat in item_stat_normalized
+                    or item_stat_normalized in config_stat):
+                mask |= 1 << i
+        return mask
+
+    def stat_masks(self, item_stat: str) -> tuple:
+        """Retorna (máscara de stats primários, máscara de outros stats) para um stat do item"""
+        masks = self._stat_masks.get(item_stat)
+        if masks is None:
+            normalized = self._normalize_stat(item_stat).upper()
+            masks = (self._stat_mask(normalized, self.primary_stats), self._stat_mask(normalized, self.stats))
+            self._stat_masks[item_stat] = masks
+        return masks
+
+    def normalized_slot(self, slot: str) -> str:
+        """Normaliza o slot do item (memorizado)"""
+        normalized = self._slot_cache.get(slot)
+        if normalized is None:
+            normalized = self._normalize_slot(slot)
+            self._slot_cache[slot] = normalized
+        return normalized
+
+    def matches(self, item: Item) -> bool:
+        """Verifica se o item corresponde aos filtros compilados"""
+        if self.accept_all:
+            return True
+
+        is_or = self.filter_mode == 'OR'
+
+        if self.has_slot_filter:
+            if not item.slot:
+                if not is_or:
+                    return False
+                slot_matches = False
+            else:
+                slot_matches = self.normalized_slot(item.slot) in self.slots
+        else:
+            slot_matches = True
+
+        primary_mask = 0
+        stat_mask = 0
+        if self.has_primary_stat_filter or self.has_stat_filter:
+            for item_stat in item.stats:
+                p, s = self.stat_masks(item_stat)
+                primary_mask |= p
+                stat_mask |= s
+
+        if self.has_primary_stat_filter:
+            if self.primary_stats_mode == 'AND':
+                if primary_mask != self.primary_full_mask:
+                    return False
+            elif not primary_mask:
+                return False
+
+        stat_matches = bool(stat_mask) if self.has_stat_filter else True
+
+        if self.has_affix_quality_filter:
+            if not item.affix_quality or item.affix_quality.lower() not in self.affix_qualities:
+                return False
+
+        if is_or:
+            result = slot_matches or stat_matches
+        else:
+            result = slot_matches and stat_matches
+        return result and (not self.has_thresholds or self.passes_thresholds(item))
+
+    def score(self, item: Item) -> Optional[float]:
+        """
+        Pontuação do item: soma de peso x valor do stat (None se não houver score_weights)
+        
+        Com score_per_gold, a pontuação é por 1.000 de gold (itens sem preço valem 0).
+        """
+        if not self.score_weights:
+            return None
+        values = item.stat_tuple()
+        total = sum(weight * (values[index] if index >= 0 else 0) for index, weight in self.score_weights)
+        if self.score_per_gold:
+            return total * 1000 / item.gold if item.gold else 0.0
+        return total
+
+    def passes_thresholds(self, item: Item) -> bool:
+        """Verifica os mínimos por stat (stat_min) e a pontuação mínima (min_score)"""
+        values = item.stat_tuple()
+        for index, minimum in self.stat_minimums:
+            if (values[index] if index >= 0 else 0) < minimum:
+                return False
+        if self.min_score is not None and self.score_weights:
+            return self.score(item) >= self.min_score
+        return True
+
+
+def _has_class(name: str) -> str:
+    """Expressão XPath equivalente a class_='name' do BeautifulSoup (uma das classes é igual)"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_LISTING_ID_RE = re.compile(r'listing-\d+')
+_TRADE_HREF_RE = re.compile(r'/trade/\d+')
+
+if HAS_LXML:
+    # XPaths pré-compilados do backend lxml (espelham as buscas do backend bs4)
+    _XPATH_CARDS = etree.XPath(f"//div[{_has_class('entity-card')}]")
+    _XPATH_DIVS_WITH_ID = etree.XPath("//div[@id]")
+    _XPATH_NAME = etree.XPath("descendant::h3[contains(@class, 'quality-')][1]")
+    _XPATH_INFO = etree.XPath(f"descendant::p[{_has_class('text-text-muted')}][1]")
+    _XPATH_AFFIX_SPANS = etree.XPath(f"descendant::span[{_has_class('text-gold')}]")
+    _XPATH_STAT_SPANS = etree.XPath("descendant::span[contains(@class, 'text-')]")
+    _XPATH_PRICE = etree.XPath(f"descendant::div[{_has_class('text-gold')}][1]")
+    _XPATH_TIME = etree.XPath(f"descendant::div[{_has_class('text-text-muted')}][1]")
+    _XPATH_LINKS = etree.XPath("descendant::a[@href]")
+    _XPATH_TEXT = etree.XPath("descendant::text()", smart_strings=False)
+
+
+def _text(element, strip: bool = False) -> str:
+    """Equivalente a get_text() / get_text(strip=True) do BeautifulSoup para elementos lxml"""
+    if strip:
+        return ''.join(part.strip() for part in _XPATH_TEXT(element))
+    return ''.join(_XPATH_TEXT(element))
+
+
+def listing_region_hash(html: str) -> Optional[str]:
+    """
+    Hash da sequência de IDs de anúncios da página (None se não houver nenhum)
+    
+    Duas respostas com o mesmo hash listam os mesmos anúncios na mesma ordem, então
+    parse e filtros podem ser ignorados mesmo que o resto do HTML (tokens, scripts) mude.
+    """
+    listing_ids = _LISTING_ID_RE.findall(html)
+    if not listing_ids:
+        return None
+    return hashlib.sha1(','.join(listing_ids).encode('utf-8')).hexdigest()
+
+
+# Tag de abertura de um card de anúncio: <div ... class="... entity-card ..." ...>
+_CARD_START_RE = re.compile(
+    r"""<div\b[^>]*?\bclass\s*=\s*["'](?:[^"']*\s)?entity-card(?:\s[^"']*)?["'][^>]*>""",
+    re.IGNORECASE
+)
+_DIV_TAG_RE = re.compile(r'<div\b|</div\s*>', re.IGNORECASE)
+# Trecho mantido no fim do buffer para não perder uma tag cortada entre dois chunks
+_STREAM_TAIL = 1024
+
+
+def _find_div_end(html: str, start: int) -> Optional[int]:
+    """Posição logo após o </div> que fecha o <div> em start (None se ainda não chegou)"""
+    depth = 0
+    for match in _DIV_TAG_RE.finditer(html, start):
+        if match.group(0)[1] == '/':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+        else:
+            depth += 1
+    return None
+
+
+def iter_card_fragments(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Encontra os cards de anúncio em um fluxo de HTML
+    
+    Devolve o HTML de cada card assim que ele chega por completo. O restante da
+    página (navegação, scripts, CSS) é descartado sem ser parseado, e o buffer
+    nunca guarda mais do que o card atual e o último chunk.
+    """
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            start_match = _CARD_START_RE.search(buffer)
+            if not start_match:
+                buffer = buffer[-_STREAM_TAIL:]
+                break
+            end = _find_div_end(buffer, start_match.start())
+            if end is None:
+                # Card incompleto: aguarda o próximo chunk
+                buffer = buffer[start_match.start():]
+                break
+            yield buffer[start_match.start():end]
+            buffer = buffer[end:]
+
+
+class KeywordMatcher:
+    """
+    Procura várias palavras-chave em um texto em uma única passada
+
+    As palavras são unidas em uma só regex dentro de um lookahead, então todas as
+    ocorrências são encontradas, inclusive sobrepostas. Vence a palavra mais longa
+    (empate: a mais à esquerda).
+    """
+
+    __slots__ = ('rank', 'result', '_regex')
+
+    def __init__(self, keywords: Iterable[tuple]):
+        values: Dict[str, str] = {}
+        for keyword, value in keywords:
+            values.setdefault(keyword, value)
+        # Rank de cada palavra encontrada (menor vence) e o valor devolvido por ela
+        self.rank: Dict[str, int] = {keyword: -len(keyword) for keyword in values}
+        self.result: Dict[str, str] = values
+        self._regex = re.compile('(?=(' + self._trie_pattern(list(values)) + '))')
+
+    @classmethod
+    def _trie_pattern(cls, keywords: List[str]) -> str:
+        """Regex das palavras fatorada em árvore de prefixos (cada posição testa um caractere por nível)"""
+        ends_here = '' in keywords
+        branches: Dict[str, List[str]] = {}
+        for keyword in keywords:
+            if keyword:
+                branches.setdefault(keyword[0], []).append(keyword[1:])
+        if not branches:
+            return ''
+        alternatives = [re.escape(char) + cls._trie_pattern(rests) for char, rests in sorted(branches.items())]
+        pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        # Quantificador guloso: a palavra mais longa a partir da posição vence
+        return f'(?:{pattern})?' if ends_here else pattern
+
+    def search(self, text: str) -> Optional[str]:
+        """Valor da palavra-chave vencedora no texto (None se nenhuma ocorrer)"""
+        found = self._regex.findall(text)
+        if not found:
+            return None
+        # min é estável: em um empate de rank vence a ocorrência mais à esquerda
+        return self.result[min(found, key=self.rank.__getitem__)]
 
 
 class TradeMonitor:
@@ -104,12 +566,55 @@ class TradeMonitor:
     
     def __init__(self, config_file: str = "config.json"):
         """Inicializa o monitor com configurações"""
+        self.config_file = config_file
         self.config = self.load_config(config_file)
-        self.seen_items: Set[str] = set()
+        self.seen_items: SeenStore = open_seen_store(
+            self.get_seen_file(),
+            max_items=int(self.config.get('seen_max_items') or DEFAULT_MAX_ITEMS),
+            ttl=float(self.config.get('seen_ttl_hours', 168) or 0) * 3600
+        )
+        # Anúncios já lidos em alguma verificação, correspondentes ou não (só em memória):
+        # o crawl para na primeira página só com eles e o agendador conta os novos.
+        # seen_items fica apenas com os anúncios que geraram alerta.
+        self.crawled_items = SeenStore(
+            max_items=int(self.config.get('seen_max_items') or DEFAULT_MAX_ITEMS),
+            ttl=float(self.config.get('seen_ttl_hours', 168) or 0) * 3600
+        )
+        self._compiled_filter: Optional[CompiledFilter] = None
+        # GET condicional e hash da página 1 (ver page_unchanged)
+        self._validators: Dict[str, Optional[str]] = {}
+        self._last_page_hash: Optional[tuple] = None
+        self.last_fetch_unchanged = False
+        # Resultado da última verificação, usado pelo agendador (ver next_poll_delay)
+        self.last_fetch_error: Optional[Exception] = None
+        self.last_new_listings = 0
+        self.scheduler = PollScheduler.from_config(self.config)
+        # Arquivo histórico de todos os itens extraídos (import local: archive.py importa o bot)
+        self.archive = None
+        if self.config.get('archive_file'):
+            from archive import ItemArchive
+            self.archive = ItemArchive(self.config['archive_file'], self.normalize_stat)
+        self.poll_stats = {
+            'polls': 0,  # Buscas da página 1
+            'not_modified': 0,  # Ignoradas por HTTP 304
+            'same_hash': 0,  # Ignoradas por listar os mesmos anúncios
+            'bytes_received': 0,
+            'parsed': 0,
+            'parse_seconds': 0.0
+        }
+        # Duração de cada fase (conexão, TTFB, corpo, parse, filtros, alertas), ver metrics.py
+        self.metrics = PhaseMetrics.from_config(self.config)
+        # Destinos dos alertas, esvaziados fora da verificação (ver alerts.py)
+        self.alerts = AlertDispatcher.from_config(self.config)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Pool de conexões grande o suficiente para os workers do crawl
+        pool_size = max(10, self.get_crawl_workers())
+        # Conexões novas são medidas na fase 'connect' das métricas
+        self.session.mount('https://', TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        self.session.mount('http://', TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
     
     def load_config(self, config_file: str) -> Dict:
         """Carrega configurações do arquivo JSON"""
@@ -127,9 +632,31 @@ class TradeMonitor:
                 "stats": [],  # Lista de stats desejados (ex: ["STR", "INT", "COU", "AGI"])
                 "slots": [],  # Lista de slots desejados (ex: ["chest", "hands", "head"])
                 "check_interval": 20,  # Segundos entre verificações
+                "adaptive_interval": False,  # Ajusta o intervalo à taxa de anúncios novos (menos requisições, alertas mais tardios)
+                "min_interval": 7,  # Menor intervalo do modo adaptativo
+                "max_interval": 80,  # Maior intervalo do modo adaptativo
                 "alert_method": "console",  # console, file, both
+                "alert_jsonl": None,  # Arquivo JSONL com um alerta por linha (None = desativado)
+                "alert_webhook": None,  # URL que recebe os alertas em lote, POST JSON (None = desativado)
+                "alert_queue_size": 1000,  # Alertas que cabem na fila de cada destino
+                "alert_policy": {"webhook": "coalesce"},  # Fila cheia: block, drop_new, drop_oldest ou coalesce
                 "debug": False,  # Ativa modo debug para ver detalhes da verificação
-                "filter_mode": "AND"  # "AND" = ambos filtros devem corresponder, "OR" = pelo menos um deve corresponder
+                "filter_mode": "AND",  # "AND" = ambos filtros devem corresponder, "OR" = pelo menos um deve corresponder
+                "stat_min": {},  # Valor mínimo por stat, sempre obrigatório (ex: {"STR": 40, "Fire Res": 60})
+                "score_weights": {},  # Peso de cada stat na pontuação do item (ex: {"STR": 2, "Crit": 5})
+                "score_per_gold": False,  # Divide a pontuação pelo preço (pontos por 1.000 de gold)
+                "min_score": None,  # Pontuação mínima para alertar (None = sem mínimo)
+                "crawl_pages": 1,  # Máximo de páginas lidas por verificação (1 = apenas a primeira)
+                "crawl_workers": 4,  # Requisições simultâneas ao ler as páginas 2..N
+                "stream": False,  # Verifica cada item assim que seu card chega, sem esperar a página inteira
+                "skip_unchanged": True,  # Ignora a verificação se a página não mudou (HTTP 304 ou mesmos anúncios)
+                "seen_file": None,  # Arquivo dos anúncios já vistos (None = <config>.seen, "" = só em memória)
+                "seen_ttl_hours": 168,  # Anúncio não visto há mais que isso sai do registro (maior que a duração de um anúncio)
+                "seen_max_items": 100000,  # Máximo de anúncios no registro (remove os vistos há mais tempo)
+                "archive_file": None,  # Banco SQLite com o histórico de todos os itens (None = desativado)
+                "metrics_file": None,  # Arquivo JSONL com as métricas de desempenho (None = não grava)
+                "metrics_interval": 60,  # Segundos entre duas gravações das métricas
+                "metrics_port": None  # Porta local do /metrics no formato do Prometheus (None = desativado)
             }
             with open(config_file, 'w', encoding='utf-8') as f:
                 json.dump(default_config, f, indent=2, ensure_ascii=False)
@@ -192,15 +719,31 @@ class TradeMonitor:
         return url + '&'.join(param_parts)
     
     def detect_slot(self, item_name: str) -> Optional[str]:
-        """Detecta o slot do equipamento baseado no nome"""
+        """
+        Detecta o slot do equipamento baseado no nome
+        
+        Vence a palavra-chave que aparece primeiro em SLOT_KEYWORDS (em qualquer posição
+        do nome); o resultado é memorizado por nome. Com nomes curtos e poucas palavras,
+        o laço é mais rápido que uma regex combinada (ver benchmark.py normalizacao).
+        """
+        if item_name in _DETECTED_SLOTS:
+            return _DETECTED_SLOTS[item_name]
+        detected = None
         item_name_lower = item_name.lower()
         for slot, keywords in self.SLOT_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in item_name_lower:
-                    return slot
-        return None
+                    detected = slot
+                    break
+            if detected is not None:
+                break
+        if len(_DETECTED_SLOTS) >= _KEYWORD_CACHE_MAX:
+            _DETECTED_SLOTS.clear()
+        _DETECTED_SLOTS[item_name] = detected
+        return detected
     
-    def normalize_slot_name(self, slot: str) -> str:
+    @classmethod
+    def normalize_slot_name(cls, slot: str) -> str:
         """Normaliza o nome do slot para comparação"""
         slot_lower = slot.lower().strip()
         # Mapeia variações comuns para os slots padrão
@@ -264,25 +807,54 @@ class TradeMonitor:
                 stats.append(f"+{value} {stat_name_clean}")
         return stats
     
-    def normalize_stat(self, stat: str) -> str:
-        """Normaliza o nome do stat para comparação"""
+    @classmethod
+    def normalize_stat(cls, stat: str) -> str:
+        """
+        Normaliza o nome do stat para comparação
+        
+        Procura as chaves e os valores do STAT_MAPPING no texto de uma vez; vence a
+        correspondência mais longa ("Ranged Critical" é Ranged Crit, não Ranged).
+        O resultado é memorizado por texto.
+        """
+        try:
+            return _NORMALIZED_STATS[stat]
+        except KeyError:
+            pass
         # Remove o sinal de + e espaços extras
         stat_clean = stat.replace('+', '').strip()
-        stat_lower = stat_clean.lower()
         
         # Remove números do início (ex: "21 Rng Dmg" -> "Rng Dmg")
-        stat_lower = re.sub(r'^\d+\s+', '', stat_lower)
-        
-        # Tenta encontrar correspondência no mapeamento
-        for key, value in self.STAT_MAPPING.items():
-            if key in stat_lower or value.lower() in stat_lower:
-                return value
+        stat_lower = _LEADING_NUMBER_RE.sub('', stat_clean.lower())
         
-        # Se não encontrou, retorna o stat original sem o +
-        return stat_clean.strip()
+        # Se não encontrou no mapeamento, retorna o stat original sem o +
+        normalized = _STAT_MATCHER.search(stat_lower) or stat_clean
+        if len(_NORMALIZED_STATS) >= _KEYWORD_CACHE_MAX:
+            _NORMALIZED_STATS.clear()
+        _NORMALIZED_STATS[stat] = normalized
+        return normalized
+    
+    def get_compiled_filter(self) -> CompiledFilter:
+        """Retorna os filtros compilados, recompilando apenas se o config mudou"""
+        compiled = self._compiled_filter
+        if compiled is None or compiled.signature != filter_config_signature(self.config):
+            compiled = CompiledFilter(self.config, self.normalize_stat, self.normalize_slot_name)
+            self._compiled_filter = compiled
+        return compiled
     
     def item_matches_filters(self, item: Item, debug: bool = False) -> bool:
         """Verifica se o item corresponde aos filtros configurados"""
+        if debug:
+            # Modo debug usa a implementação interpretada, que explica cada passo
+            return self.item_matches_filters_reference(item, debug=True)
+        return self.get_compiled_filter().matches(item)
+    
+    def item_matches_filters_reference(self, item: Item, debug: bool = False) -> bool:
+        """
+        Implementação original (interpretada) dos filtros
+        
+        Relê e normaliza o config a cada chamada. Usada no modo debug e como
+        referência para validar o CompiledFilter.
+        """
         # Filtros disponíveis
         has_slot_filter = self.config.get('slots') and len(self.config['slots']) > 0
         has_primary_stat_filter = self.config.get('primary_stats') and len(self.config['primary_stats']) > 0
@@ -301,8 +873,8 @@ class TradeMonitor:
         # Se não há filtros, aceita tudo
         if not has_slot_filter and not has_primary_stat_filter and not has_stat_filter and not has_affix_quality_filter:
             if debug:
-                print(f"  [DEBUG] ✓ Sem filtros - aceita todos")
-            return True
+                print(f"  [DEBUG] ✓ Sem filtros de slot/stat/affix - aceita todos")
+            return self.item_passes_thresholds(item, debug)
         
         slot_matches = False
         primary_stat_matches = False
@@ -455,6 +1027,10 @@ class TradeMonitor:
             if debug:
                 print(f"  [DEBUG] Modo AND: Primário={primary_stat_matches} E Affix={affix_quality_matches} E Slot={slot_matches} E Stat={stat_matches} = {result}")
         
+        # Mínimos por stat e pontuação mínima são sempre obrigatórios
+        if result:
+            result = self.item_passes_thresholds(item, debug)
+        
         if result:
             if debug:
                 print(f"  [DEBUG] ✓ Item corresponde aos filtros!")
@@ -464,139 +1040,503 @@ class TradeMonitor:
         
         return result
     
-    def fetch_items(self) -> List[Item]:
-        """Busca itens da página de trade"""
+    def item_score(self, item: Item) -> Optional[float]:
+        """Pontuação do item pelos score_weights do config (None se não configurados)"""
+        return self.get_compiled_filter().score(item)
+    
+    def rank_items(self, items: List[Item]) -> List[Item]:
+        """Ordena os itens pela pontuação, da maior para a menor (sem score_weights, mantém a ordem)"""
+        compiled = self.get_compiled_filter()
+        if not compiled.score_weights:
+            return list(items)
+        return sorted(items, key=compiled.score, reverse=True)
+    
+    def item_passes_thresholds(self, item: Item, debug: bool = False) -> bool:
+        """Verifica stat_min e min_score relendo o config (implementação de referência)"""
+        for stat, minimum in (self.config.get('stat_min') or {}).items():
+            value = item.stat_value(self.normalize_stat(stat))
+            if value < minimum:
+                if debug:
+                    print(f"  [DEBUG] ❌ {stat} = {value}, mínimo {minimum}")
+                return False
+            if debug:
+                print(f"  [DEBUG] ✓ {stat} = {value} (mínimo {minimum})")
+        
+        weights = self.config.get('score_weights') or {}
+        min_score = self.config.get('min_score')
+        if weights and min_score is not None:
+            score = sum(weight * item.stat_value(self.normalize_stat(stat)) for stat, weight in weights.items())
+            if self.config.get('score_per_gold'):
+                score = score * 1000 / item.gold if item.gold else 0.0
+            if debug:
+                print(f"  [DEBUG] Pontuação: {score:.1f} (mínimo {min_score})")
+            if score < min_score:
+                return False
+        return True
+    
+    def get_seen_file(self) -> Optional[str]:
+        """Arquivo do registro de anúncios vistos (None = só em memória)"""
+        seen_file = self.config.get('seen_file')
+        if seen_file is None:
+            return os.path.splitext(self.config_file)[0] + '.seen'
+        return seen_file or None
+    
+    def get_crawl_pages(self) -> int:
+        """Número máximo de páginas lidas por verificação"""
+        return max(1, int(self.config.get('crawl_pages') or 1))
+    
+    def get_crawl_workers(self) -> int:
+        """Número de requisições simultâneas do crawl"""
+        return max(1, int(self.config.get('crawl_workers') or 4))
+    
+    def page_already_seen(self, items: List[Item]) -> bool:
+        """Verifica se todos os itens de uma página já foram lidos em verificações anteriores"""
+        return bool(items) and all(item.listing_id in self.crawled_items for item in items)
+    
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Cabeçalhos If-None-Match/If-Modified-Since para a URL, se o servidor enviou validadores
+        
+        Os validadores valem só para os filtros com que foram obtidos: se os filtros mudaram,
+        a página é baixada de novo para ser reavaliada.
+        """
+        headers = {}
+        if (self._validators.get('url') == url
+                and self._validators.get('signature') == self.get_compiled_filter().signature):
+            if self._validators.get('etag'):
+                headers['If-None-Match'] = self._validators['etag']
+            if self._validators.get('last_modified'):
+                headers['If-Modified-Since'] = self._validators['last_modified']
+        return headers
+    
+    def page_unchanged(self, url: str, status_code: int, headers, html: Optional[str] = None,
+                       size: int = 0) -> bool:
+        """
+        Registra a resposta da página 1 e diz se a verificação pode ser ignorada
+        
+        A página é considerada inalterada se o servidor respondeu 304 ao GET condicional
+        ou se ela lista os mesmos anúncios da verificação anterior com os mesmos filtros
+        (html=None pula o hash). Filtros alterados em execução fazem a página ser reavaliada.
+        """
+        self.poll_stats['polls'] += 1
+        if status_code == 304:
+            self.poll_stats['not_modified'] += 1
+            return True
+        
+        self.poll_stats['bytes_received'] += size
+        signature = self.get_compiled_filter().signature
+        self._validators = {
+            'url': url,
+            'signature': signature,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        }
+        
+        if html is None:
+            return False
+        body_hash = listing_region_hash(html)
+        if body_hash is not None and self._last_page_hash == (url, signature, body_hash):
+            self.poll_stats['same_hash'] += 1
+            return True
+        self._last_page_hash = (url, signature, body_hash)
+        return False
+    
+    def poll_stats_summary(self) -> str:
+        """Resumo das verificações ignoradas e da economia estimada de banda e CPU"""
+        stats = self.poll_stats
+        skipped = stats['not_modified'] + stats['same_hash']
+        downloaded = stats['polls'] - stats['not_modified']
+        avg_bytes = stats['bytes_received'] / downloaded if downloaded else 0
+        avg_parse = stats['parse_seconds'] / stats['parsed'] if stats['parsed'] else 0
+        saved_kb = stats['not_modified'] * avg_bytes / 1024
+        saved_ms = skipped * avg_parse * 1000
+        return (f"{skipped}/{stats['polls']} verificações ignoradas "
+                f"({stats['not_modified']} HTTP 304, {stats['same_hash']} mesmos anúncios), "
+                f"~{saved_kb:.0f} KB baixados e ~{saved_ms:.0f} ms de parse economizados")
+    
+    def fetch_page(self, page: int = 1, conditional: bool = False) -> Optional[List[Item]]:
+        """
+        Busca e extrai os itens de uma página de trade (lança RequestException em erro de rede)
+        
+        Com conditional=True (página 1 de cada verificação), usa GET condicional e o hash
+        dos anúncios; retorna None se a página não mudou desde a verificação anterior.
+        """
         url = self.build_url()
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Debug: mostra status da requisição
-            if self.config.get('debug', False):
-                print(f"  [DEBUG] Status da requisição: {response.status_code}")
-                print(f"  [DEBUG] Tamanho da resposta: {len(response.text)} bytes")
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            items = []
-            
-            # Encontra todos os cards de itens
-            item_cards = soup.find_all('div', class_='entity-card')
-            
-            if not item_cards:
-                # Tenta encontrar de outra forma
-                item_cards = soup.find_all('div', id=re.compile(r'listing-\d+'))
-            
-            if self.config.get('debug', False):
-                print(f"  [DEBUG] Cards encontrados: {len(item_cards)}")
-            
-            for card in item_cards:
-                try:
-                    # ID do listing
-                    listing_id = card.get('id', '').replace('listing-', '')
-                    if not listing_id:
+        if page > 1:
+            url += f"&page={page}"
+        headers = self.conditional_headers(url) if conditional else None
+        start = time.perf_counter()
+        with self.metrics.active():
+            response = self.session.get(url, timeout=30, headers=headers, stream=True)
+        headers_at = time.perf_counter()
+        body = response.content
+        end = time.perf_counter()
+        self.metrics.record('ttfb', headers_at - start)
+        self.metrics.record('body', end - headers_at)
+        self.metrics.record('fetch', end - start)
+        response.raise_for_status()
+        
+        # Debug: mostra status da requisição
+        if self.config.get('debug', False):
+            print(f"  [DEBUG] Página {page} - Status da requisição: {response.status_code}")
+            print(f"  [DEBUG] Página {page} - Tamanho da resposta: {len(body)} bytes")
+        
+        html = response.text if response.status_code != 304 else None
+        if conditional and self.page_unchanged(url, response.status_code, response.headers, html,
+                                               len(body)):
+            return None
+        
+        start = time.perf_counter()
+        items = self.parse_items(html)
+        elapsed = time.perf_counter() - start
+        self.metrics.record('parse', elapsed)
+        # Só a página 1 entra nas estatísticas de economia (as demais rodam em paralelo no crawl)
+        if page == 1:
+            self.poll_stats['parse_seconds'] += elapsed
+            self.poll_stats['parsed'] += 1
+        return items
+    
+    def crawl_pages(self, first_page: int, last_page: int) -> List[Item]:
+        """
+        Busca as páginas first_page..last_page em paralelo, em lotes do tamanho do pool
+        
+        Para na primeira página vazia ou composta apenas de anúncios já vistos: como a
+        listagem é ordenada por mais recentes, as páginas seguintes também já foram vistas.
+        """
+        workers = self.get_crawl_workers()
+        items = []
+        page = first_page
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while page <= last_page:
+                batch = range(page, min(page + workers, last_page + 1))
+                futures = [executor.submit(self.fetch_page, p) for p in batch]
+                stop = False
+                # Processa na ordem das páginas, mesmo que terminem fora de ordem
+                for batch_page, future in zip(batch, futures):
+                    if stop:
+                        future.cancel()
                         continue
-                    
-                    # Nome do item
-                    name_elem = card.find('h3', class_=re.compile('quality-'))
-                    if not name_elem:
+                    try:
+                        page_items = future.result()
+                    except requests.RequestException as e:
+                        print(f"Erro ao buscar página {batch_page}: {e}", file=sys.stderr)
+                        stop = True
                         continue
-                    name = name_elem.get_text(strip=True)
-                    
-                    # Slot
-                    slot = self.detect_slot(name)
-                    
-                    # Info do item (level, stats, seller)
-                    info_elem = card.find('p', class_='text-text-muted')
-                    if not info_elem:
+                    if not page_items or self.page_already_seen(page_items):
+                        if self.config.get('debug', False):
+                            print(f"  [DEBUG] Crawl encerrado na página {batch_page}")
+                        stop = True
                         continue
-                    
-                    # Extrai qualidade de affix (se presente)
-                    affix_quality = None
-                    affix_quality_spans = info_elem.find_all('span', class_='text-gold')
-                    for span in affix_quality_spans:
-                        span_text = span.get_text(strip=True)
-                        # Verifica se é uma qualidade de affix conhecida
-                        if span_text in ['Fine', 'Pristine', 'Superior', 'Exquisite']:
-                            affix_quality = span_text
-                            break
-                    
-                    # Extrai stats dos spans coloridos dentro do parágrafo
-                    stats = []
-                    stat_spans = info_elem.find_all('span', class_=re.compile(r'text-'))
-                    for span in stat_spans:
-                        span_text = span.get_text(strip=True)
-                        # Remove espaços extras e normaliza
-                        span_text = ' '.join(span_text.split())
-                        # Ignora spans que são qualidade de affix
-                        if span_text not in ['Fine', 'Pristine', 'Superior', 'Exquisite']:
-                            if span_text.startswith('+'):
-                                stats.append(span_text)
-                    
-                    info_text = info_elem.get_text()
-                    
-                    # Item level
-                    level_match = re.search(r'iLvl\s+(\d+)', info_text)
-                    item_level = level_match.group(1) if level_match else "?"
-                    
-                    # Stats (se não foram extraídos dos spans, tenta parsear do texto)
-                    if not stats:
-                        stats = self.parse_stats(info_text)
-                    
-                    # Seller
-                    seller_match = re.search(r'by\s+(\w+)', info_text)
-                    seller = seller_match.group(1) if seller_match else "Unknown"
-                    
-                    # Preço
-                    price_elem = card.find('div', class_='text-gold')
-                    price = price_elem.get_text(strip=True) if price_elem else "?"
-                    
-                    # Tempo restante
-                    time_elem = card.find('div', class_='text-text-muted')
-                    time_left = ""
-                    if time_elem:
-                        time_text = time_elem.get_text(strip=True)
-                        if 'left' in time_text or 'day' in time_text or 'hour' in time_text:
-                            time_left = time_text
-                    
-                    # URL
-                    link_elem = card.find('a', href=re.compile(r'/trade/\d+'))
-                    url_path = link_elem['href'] if link_elem else f"/trade/{listing_id}"
-                    full_url = f"https://dreadmystdb.com{url_path}"
-                    
-                    item = Item(
-                        listing_id=listing_id,
-                        name=name,
-                        item_level=item_level,
-                        stats=stats,
-                        price=price,
-                        seller=seller,
-                        time_left=time_left,
-                        url=full_url,
-                        slot=slot,
-                        affix_quality=affix_quality
-                    )
-                    
-                    items.append(item)
-                    
-                except Exception as e:
-                    print(f"Erro ao processar item: {e}", file=sys.stderr)
-                    continue
+                    items.extend(page_items)
+                if stop:
+                    break
+                page += workers
+        return items
+    
+    def fetch_items(self) -> List[Item]:
+        """Busca itens da página de trade (e das seguintes, se crawl_pages > 1)"""
+        self.last_fetch_unchanged = False
+        self.last_fetch_error = None
+        try:
+            items = self.fetch_page(1, conditional=self.config.get('skip_unchanged', True))
+            if items is None:
+                # Página 1 inalterada: nada novo foi listado (nem nas páginas seguintes)
+                self.last_fetch_unchanged = True
+                return []
+            
+            max_pages = self.get_crawl_pages()
+            if max_pages > 1 and items and not self.page_already_seen(items):
+                items.extend(self.crawl_pages(2, max_pages))
+                # Novos anúncios deslocam a listagem durante o crawl e podem repetir itens
+                unique_items = {}
+                for item in items:
+                    unique_items.setdefault(item.listing_id, item)
+                items = list(unique_items.values())
             
             return items
             
         except requests.RequestException as e:
             print(f"Erro ao buscar itens: {e}", file=sys.stderr)
+            self.last_fetch_error = e
             return []
         except Exception as e:
             print(f"Erro inesperado: {e}", file=sys.stderr)
             return []
     
-    def alert(self, item: Item):
-        """Envia alerta sobre item encontrado"""
-        alert_method = self.config.get('alert_method', 'console')
+    def get_parser_backend(self) -> str:
+        """Backend de parse configurado ('lxml' ou 'bs4'); usa 'bs4' se o lxml não estiver instalado"""
+        backend = self.config.get('parser') or DEFAULT_PARSER
+        if backend == 'lxml' and not HAS_LXML:
+            return 'bs4'
+        return backend
+    
+    def parse_items(self, html: str, backend: Optional[str] = None) -> List[Item]:
+        """
+        Extrai os itens do HTML da página de trade
+        
+        Args:
+            html: HTML da página
+            backend: 'lxml' (XPath, rápido) ou 'bs4' (BeautifulSoup, referência).
+                     None = backend do config
+        """
+        backend = backend or self.get_parser_backend()
+        if backend == 'lxml':
+            return self.parse_items_lxml(html)
+        if backend == 'bs4':
+            return self.parse_items_bs4(html)
+        raise ValueError(f"Backend de parse desconhecido: {backend}")
+    
+    def build_item(self, listing_id: str, name: str, info_text: str, affix_texts: List[str],
+                   stat_texts: List[str], price: Optional[str], time_text: Optional[str],
+                   url_path: Optional[str]) -> Item:
+        """Monta o Item a partir dos textos extraídos de um card (comum a todos os backends)"""
+        # Slot
+        slot = self.detect_slot(name)
+        
+        # Extrai qualidade de affix (se presente)
+        affix_quality = None
+        for span_text in affix_texts:
+            # Verifica se é uma qualidade de affix conhecida
+            if span_text in AFFIX_QUALITIES:
+                affix_quality = span_text
+                break
+        
+        # Extrai stats dos spans coloridos dentro do parágrafo
+        stats = []
+        for span_text in stat_texts:
+            # Remove espaços extras e normaliza
+            span_text = ' '.join(span_text.split())
+            # Ignora spans que são qualidade de affix
+            if span_text not in AFFIX_QUALITIES:
+                if span_text.startswith('+'):
+                    stats.append(span_text)
+        
+        # Item level
+        level_match = re.search(r'iLvl\s+(\d+)', info_text)
+        item_level = level_match.group(1) if level_match else "?"
+        
+        # Stats (se não foram extraídos dos spans, tenta parsear do texto)
+        if not stats:
+            stats = self.parse_stats(info_text)
+        
+        # Seller
+        seller_match = re.search(r'by\s+(\w+)', info_text)
+        seller = seller_match.group(1) if seller_match else "Unknown"
+        
+        # Tempo restante
+        time_left = ""
+        if time_text is not None:
+            if 'left' in time_text or 'day' in time_text or 'hour' in time_text:
+                time_left = time_text
+        
+        # URL
+        url_path = url_path if url_path is not None else f"/trade/{listing_id}"
+        full_url = f"{SITE_URL}{url_path}"
+        
+        return Item(
+            listing_id=listing_id,
+            name=name,
+            item_level=item_level,
+            stats=stats,
+            price=price if price is not None else "?",
+            seller=seller,
+            time_left=time_left,
+            url=full_url,
+            slot=slot,
+            affix_quality=affix_quality
+        )
+    
+    def parse_items_bs4(self, html: str) -> List[Item]:
+        """Extrai os itens com BeautifulSoup (implementação de referência)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        items = []
+        
+        # Encontra todos os cards de itens
+        item_cards = soup.find_all('div', class_='entity-card')
+        
+        if not item_cards:
+            # Tenta encontrar de outra forma
+            item_cards = soup.find_all('div', id=re.compile(r'listing-\d+'))
+        
+        if self.config.get('debug', False):
+            print(f"  [DEBUG] Cards encontrados: {len(item_cards)}")
+        
+        for card in item_cards:
+            try:
+                item = self.parse_card_bs4(card)
+                if item:
+                    items.append(item)
+            except Exception as e:
+                print(f"Erro ao processar item: {e}", file=sys.stderr)
+                continue
+        
+        return items
+    
+    def parse_card_bs4(self, card) -> Optional[Item]:
+        """Extrai o Item de um card do BeautifulSoup (None se o card não for um anúncio completo)"""
+        # ID do listing
+        listing_id = card.get('id', '').replace('listing-', '')
+        if not listing_id:
+            return None
+        
+        # Nome do item
+        name_elem = card.find('h3', class_=re.compile('quality-'))
+        if not name_elem:
+            return None
+        name = name_elem.get_text(strip=True)
+        
+        # Info do item (level, stats, seller)
+        info_elem = card.find('p', class_='text-text-muted')
+        if not info_elem:
+            return None
+        
+        affix_texts = [span.get_text(strip=True) for span in info_elem.find_all('span', class_='text-gold')]
+        stat_texts = [span.get_text(strip=True) for span in info_elem.find_all('span', class_=re.compile(r'text-'))]
+        
+        price_elem = card.find('div', class_='text-gold')
+        time_elem = card.find('div', class_='text-text-muted')
+        link_elem = card.find('a', href=re.compile(r'/trade/\d+'))
+        
+        return self.build_item(
+            listing_id=listing_id,
+            name=name,
+            info_text=info_elem.get_text(),
+            affix_texts=affix_texts,
+            stat_texts=stat_texts,
+            price=price_elem.get_text(strip=True) if price_elem else None,
+            time_text=time_elem.get_text(strip=True) if time_elem else None,
+            url_path=link_elem['href'] if link_elem else None
+        )
+    
+    def parse_items_lxml(self, html: str) -> List[Item]:
+        """Extrai os itens com lxml + XPath pré-compilados (mesmo resultado do backend bs4)"""
+        root = lxml.html.document_fromstring(html)
+        items = []
+        
+        item_cards = _XPATH_CARDS(root)
+        if not item_cards:
+            item_cards = [div for div in _XPATH_DIVS_WITH_ID(root) if _LISTING_ID_RE.search(div.get('id'))]
+        
+        if self.config.get('debug', False):
+            print(f"  [DEBUG] Cards encontrados: {len(item_cards)}")
+        
+        for card in item_cards:
+            try:
+                item = self.parse_card_lxml(card)
+                if item:
+                    items.append(item)
+            except Exception as e:
+                print(f"Erro ao processar item: {e}", file=sys.stderr)
+                continue
+        
+        return items
+    
+    def parse_card_lxml(self, card) -> Optional[Item]:
+        """Extrai o Item de um card do lxml (None se o card não for um anúncio completo)"""
+        listing_id = (card.get('id') or '').replace('listing-', '')
+        if not listing_id:
+            return None
+        
+        name_elems = _XPATH_NAME(card)
+        if not name_elems:
+            return None
+        name = _text(name_elems[0], strip=True)
+        
+        info_elems = _XPATH_INFO(card)
+        if not info_elems:
+            return None
+        info_elem = info_elems[0]
+        
+        affix_texts = [_text(span, strip=True) for span in _XPATH_AFFIX_SPANS(info_elem)]
+        stat_texts = [_text(span, strip=True) for span in _XPATH_STAT_SPANS(info_elem)]
         
+        price_elems = _XPATH_PRICE(card)
+        time_elems = _XPATH_TIME(card)
+        link_elems = [a for a in _XPATH_LINKS(card) if _TRADE_HREF_RE.search(a.get('href'))]
+        
+        return self.build_item(
+            listing_id=listing_id,
+            name=name,
+            info_text=_text(info_elem),
+            affix_texts=affix_texts,
+            stat_texts=stat_texts,
+            price=_text(price_elems[0], strip=True) if price_elems else None,
+            time_text=_text(time_elems[0], strip=True) if time_elems else None,
+            url_path=link_elems[0].get('href') if link_elems else None
+        )
+    
+    def parse_card_fragment(self, fragment: str) -> Optional[Item]:
+        """Extrai o Item do HTML de um único card"""
+        if self.get_parser_backend() == 'lxml':
+            return self.parse_card_lxml(lxml.html.fragment_fromstring(fragment))
+        card = BeautifulSoup(fragment, 'html.parser').find('div')
+        return self.parse_card_bs4(card) if card else None
+    
+    def iter_items_stream(self, page: int = 1, chunk_size: int = 8192) -> Iterator[Item]:
+        """
+        Busca uma página em streaming e devolve cada item assim que seu card termina de chegar
+        
+        Lança RequestException em erro de rede.
+        """
+        url = self.build_url()
+        if page > 1:
+            url += f"&page={page}"
+        conditional = page == 1 and self.config.get('skip_unchanged', True)
+        headers = self.conditional_headers(url) if conditional else None
+        start = time.perf_counter()
+        with self.metrics.active():
+            response = self.session.get(url, timeout=30, stream=True, headers=headers)
+        # Corpo e parse se misturam com os filtros de quem consome os itens: só o TTFB é medido
+        self.metrics.record('ttfb', time.perf_counter() - start)
+        with response:
+            response.raise_for_status()
+            size = int(response.headers.get('Content-Length') or 0)
+            # No streaming só o GET condicional se aplica (o hash exigiria a página inteira)
+            if conditional and self.page_unchanged(url, response.status_code, response.headers, size=size):
+                self.last_fetch_unchanged = True
+                return
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            chunks = (decoder.decode(chunk) for chunk in response.iter_content(chunk_size))
+            for fragment in iter_card_fragments(chunks):
+                try:
+                    item = self.parse_card_fragment(fragment)
+                except Exception as e:
+                    print(f"Erro ao processar item: {e}", file=sys.stderr)
+                    continue
+                if item:
+                    yield item
+    
+    def stream_items(self) -> Iterator[Item]:
+        """Versão em streaming de fetch_items (mesmo crawl e mesmo tratamento de erros)"""
+        self.last_fetch_unchanged = False
+        self.last_fetch_error = None
+        yielded: Set[str] = set()
+        page_has_new = False
+        try:
+            for item in self.iter_items_stream(1):
+                if item.listing_id in yielded:
+                    continue
+                yielded.add(item.listing_id)
+                # Verificado antes de entregar: quem consome marca o item como lido
+                if item.listing_id not in self.crawled_items:
+                    page_has_new = True
+                yield item
+            
+            if self.get_crawl_pages() > 1 and page_has_new:
+                for item in self.crawl_pages(2, self.get_crawl_pages()):
+                    if item.listing_id not in yielded:
+                        yielded.add(item.listing_id)
+                        yield item
+        
+        except requests.RequestException as e:
+            print(f"Erro ao buscar itens: {e}", file=sys.stderr)
+            self.last_fetch_error = e
+    
+    def format_alert(self, item: Item, score: Optional[float] = None) -> str:
+        """Texto do alerta de um item encontrado"""
         affix_quality_text = f"Qualidade Affix: {item.affix_quality}" if item.affix_quality else "Qualidade Affix: Nenhuma"
-        message = f"""
+        score_text = f"Pontuação: {score:.1f}\n" if score is not None else ""
+        return f"""
 {'='*60}
 🎯 ITEM ENCONTRADO! 🎯
 {'='*60}
@@ -605,30 +1545,236 @@ Slot: {item.slot or 'Desconhecido'}
 {affix_quality_text}
 Item Level: {item.item_level}
 Stats: {', '.join(item.stats)}
-Preço: {item.price}
+{score_text}Preço: {item.price}
 Vendedor: {item.seller}
 Tempo restante: {item.time_left}
 URL: {item.url}
 {'='*60}
 """
+    
+    def alert(self, item: Item):
+        """Envia alerta sobre item encontrado (enfileirado para os destinos, ver alerts.py)"""
+        score = self.item_score(item)
+        record = item.to_dict()
+        record.update({
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'profile': self.config_file,
+            'score': score,
+            'message': self.format_alert(item, score)
+        })
+        self.alerts.submit(record)
+    
+    def timed_alert(self, item: Item):
+        """Envia o alerta medindo sua duração (fase 'alert' das métricas)"""
+        with self.metrics.span('alert'):
+            self.alert(item)
+    
+    def process_items(self, items: Iterable[Item], unchanged: bool = False,
+                      matched: Optional[Set[str]] = None, evaluated: Optional[Set[str]] = None,
+                      archive: bool = True) -> int:
+        """
+        Verifica os itens de uma busca: ignora os já vistos, aplica os filtros e alerta
+        
+        Aceita a lista de fetch_items ou o gerador de stream_items; no segundo caso
+        cada item é verificado (e alertado) assim que chega. Com score_weights, os
+        alertas de uma lista saem em ordem decrescente de pontuação (o melhor negócio
+        primeiro); no streaming a ordem é a de chegada.
+        
+        Args:
+            items: Itens da busca
+            unchanged: True se a busca foi ignorada por a página não ter mudado
+            matched: listing_ids que passam nos filtros, já avaliados em lote
+                (batch_match.match_profiles); None = avalia item a item
+            evaluated: listing_ids cobertos por matched (None = todos); os demais
+                são avaliados item a item
+            archive: False para não gravar os itens no arquivo histórico (outro perfil
+                com a mesma busca e o mesmo archive_file já grava)
+        
+        Returns:
+            Número de itens novos correspondentes
+        """
+        streaming = not isinstance(items, list)
+        self.last_new_listings = 0
+        archive = archive and self.archive is not None
+        if unchanged:
+            if archive:
+                self.flush_archive(unchanged=True)
+            self.print_unchanged()
+            self.metrics.maybe_dump()
+            return 0
+        if not streaming and not items:
+            self.log(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ Nenhum item encontrado ou erro na requisição.")
+            return 0
+        
+        if streaming:
+            self.log(f"[{datetime.now().strftime('%H:%M:%S')}] Verificando itens (streaming)...")
+        else:
+            self.log(f"[{datetime.now().strftime('%H:%M:%S')}] Verificando {len(items)} itens...")
+        
+        # Modo debug se configurado
+        debug_mode = self.config.get('debug', False)
+        
+        total_items = 0
+        new_items_found = 0
+        items_checked = 0
+        items_already_seen = 0
+        new_listings = 0
+        match_seconds = 0.0
+        # Com pontuação, os alertas da lista esperam o fim da verificação para serem ordenados
+        ranked_matches = [] if not streaming and self.get_compiled_filter().score_weights else None
+        for item in items:
+            total_items += 1
+            if archive:
+                self.archive.add(item)
+            
+            if self.crawled_items.add(item.listing_id):
+                new_listings += 1
+            
+            # Verifica se já alertamos este item
+            if item.listing_id in self.seen_items:
+                # Renova o horário: um anúncio ainda listado não pode expirar do registro
+                self.seen_items.add(item.listing_id)
+                items_already_seen += 1
+                if debug_mode:
+                    self.log(f"  [DEBUG] Item já visto: {item.name} (ID: {item.listing_id})")
+                continue
+            
+            items_checked += 1
+            
+            # Verifica se corresponde aos filtros
+            start = time.perf_counter()
+            if matched is not None and (evaluated is None or item.listing_id in evaluated):
+                item_matches = item.listing_id in matched
+            else:
+                item_matches = self.item_matches_filters(item, debug=debug_mode)
+            match_seconds += time.perf_counter() - start
+            if item_matches:
+                self.seen_items.add(item.listing_id)
+                if ranked_matches is not None:
+                    ranked_matches.append(item)
+                else:
+                    self.timed_alert(item)
+                new_items_found += 1
+            elif debug_mode:
+                self.log(f"  [DEBUG] Item não corresponde aos filtros: {item.name}")
+        
+        if ranked_matches:
+            for item in self.rank_items(ranked_matches):
+                self.timed_alert(item)
+        
+        self.seen_items.flush()
+        if archive:
+            # Streaming com a página inalterada (304): nada foi lido, só renova o last_seen
+            self.flush_archive(unchanged=streaming and self.last_fetch_unchanged)
+        self.last_new_listings = new_listings
+        if items_checked:
+            self.metrics.record('match', match_seconds)
+        self.metrics.maybe_dump()
+        
+        if total_items == 0:
+            if self.last_fetch_unchanged:
+                self.print_unchanged()
+            else:
+                self.log(f"  ⚠ Nenhum item encontrado ou erro na requisição.")
+            return 0
+        
+        if debug_mode:
+            self.log(f"  [DEBUG] Total de itens: {total_items}")
+            self.log(f"  [DEBUG] Itens já vistos: {items_already_seen}")
+            self.log(f"  [DEBUG] Itens novos verificados: {items_checked}")
+            self.log(f"  [DEBUG] Itens correspondentes: {new_items_found}")
+        
+        if new_items_found == 0:
+            if items_checked > 0:
+                self.log(f"  ⚠ Nenhum item novo correspondente aos filtros (verificados {items_checked} novos itens, {items_already_seen} já vistos).")
+                if not debug_mode:
+                    self.log(f"  💡 Dica: Ative 'debug: true' no config.json para ver detalhes")
+            else:
+                self.log(f"  ✓ Nenhum item novo.")
+        else:
+            self.log(f"  ✓ {new_items_found} novo(s) item(ns) encontrado(s)!")
+        return new_items_found
+    
+    def flush_archive(self, unchanged: bool = False):
+        """
+        Grava no arquivo histórico os itens da verificação (erros não interrompem o monitor)
+        
+        Com unchanged=True (página sem alterações), só renova o last_seen dos itens anteriores.
+        """
+        if self.archive is None:
+            return
+        try:
+            if unchanged:
+                self.archive.touch_last_batch()
+            else:
+                self.archive.flush()
+        except Exception as e:
+            print(f"Erro ao gravar no arquivo histórico: {e}", file=sys.stderr)
+    
+    def print_unchanged(self):
+        """Informa que a verificação foi ignorada por a página não ter mudado"""
+        message = f"[{datetime.now().strftime('%H:%M:%S')}] ✓ Página sem alterações"
+        if self.poll_stats['polls']:
+            message += f" ({self.poll_stats_summary()})"
+        self.log(message)
+    
+    def log(self, message: str):
+        """Mensagens de progresso das verificações (a GUI substitui pelo seu painel de log)"""
+        print(message)
+    
+    def next_poll_delay(self, new_listings: Optional[int] = None) -> float:
+        """
+        Segundos até a próxima verificação, segundo o agendador
         
-        if alert_method in ['console', 'both']:
-            print(message)
+        Args:
+            new_listings: Anúncios novos da última verificação (padrão: os contados por process_items)
+        """
+        if new_listings is None:
+            new_listings = self.last_new_listings
+        return self.scheduler.record_poll(new_listings, self.last_fetch_error)
+    
+    def poll(self) -> int:
+        """
+        Faz uma verificação completa (fase 'poll' das métricas): busca, ou streaming
+        com stream, e process_items
         
-        if alert_method in ['file', 'both']:
-            log_file = self.config.get('log_file', 'alerts.log')
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(message)
-                f.write("\n")
+        Returns:
+            Número de itens novos correspondentes
+        """
+        with self.metrics.span('poll'):
+            if self.config.get('stream', False):
+                return self.process_items(self.stream_items())
+            items = self.fetch_items()
+            return self.process_items(items, unchanged=self.last_fetch_unchanged)
     
+    def close(self):
+        """
+        Libera os recursos do monitor: destinos de alerta, registros de vistos, arquivo
+        histórico e sessão HTTP, gravando antes as métricas pendentes
+
+        Pode ser chamado mais de uma vez.
+        """
+        self.alerts.close()
+        self.seen_items.close()
+        self.crawled_items.close()
+        if self.archive is not None:
+            self.archive.close()
+        self.metrics.maybe_dump(force=True)
+        self.session.close()
+
     def run(self):
         """Executa o monitor em loop"""
         print("🤖 Bot de Monitoramento DreadmystDB iniciado!")
         print(f"📋 Configuração carregada:")
         print(json.dumps(self.config, indent=2, ensure_ascii=False))
         print(f"\n🔗 URL monitorada: {self.build_url()}")
-        print(f"⏱️  Intervalo de verificação: {self.config.get('check_interval', 30)} segundos")
+        if self.scheduler.adaptive:
+            print(f"⏱️  Intervalo de verificação: adaptativo, entre {self.scheduler.min_interval:.0f} "
+                  f"e {self.scheduler.max_interval:.0f} segundos")
+        else:
+            print(f"⏱️  Intervalo de verificação: {self.config.get('check_interval', 30)} segundos")
+        if self.get_crawl_pages() > 1:
+            print(f"📄 Crawl: até {self.get_crawl_pages()} páginas ({self.get_crawl_workers()} simultâneas)")
         
         # Mostra resumo dos filtros
         if self.config.get('slots'):
@@ -636,68 +1782,44 @@ URL: {item.url}
         if self.config.get('stats'):
             print(f"⚡ Stats filtrados: {', '.join(self.config['stats'])}")
         
+        metrics_server = serve_metrics([self])
+        
         print("\n" + "="*60)
         print("Aguardando novos itens...")
         print("="*60 + "\n")
         
-        check_interval = self.config.get('check_interval', 30)
-        
         try:
             while True:
-                items = self.fetch_items()
-                
-                if items:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Verificando {len(items)} itens...")
-                    
-                    # Modo debug se configurado
-                    debug_mode = self.config.get('debug', False)
-                    
-                    new_items_found = 0
-                    items_checked = 0
-                    items_already_seen = 0
-                    for item in items:
-                        # Verifica se já vimos este item
-                        if item.listing_id in self.seen_items:
-                            items_already_seen += 1
-                            if debug_mode:
-                                print(f"  [DEBUG] Item já visto: {item.name} (ID: {item.listing_id})")
-                            continue
-                        
-                        items_checked += 1
-                        
-                        # Verifica se corresponde aos filtros
-                        if self.item_matches_filters(item, debug=debug_mode):
-                            self.alert(item)
-                            self.seen_items.add(item.listing_id)
-                            new_items_found += 1
-                        elif debug_mode:
-                            print(f"  [DEBUG] Item não corresponde aos filtros: {item.name}")
-                    
-                    if debug_mode:
-                        print(f"  [DEBUG] Total de itens: {len(items)}")
-                        print(f"  [DEBUG] Itens já vistos: {items_already_seen}")
-                        print(f"  [DEBUG] Itens novos verificados: {items_checked}")
-                        print(f"  [DEBUG] Itens correspondentes: {new_items_found}")
-                    
-                    if new_items_found == 0:
-                        if items_checked > 0:
-                            print(f"  ⚠ Nenhum item novo correspondente aos filtros (verificados {items_checked} novos itens, {items_already_seen} já vistos).")
-                            if not debug_mode:
-                                print(f"  💡 Dica: Ative 'debug: true' no config.json para ver detalhes")
-                        else:
-                            print(f"  ✓ Nenhum item novo.")
-                    else:
-                        print(f"  ✓ {new_items_found} novo(s) item(ns) encontrado(s)!")
-                else:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ Nenhum item encontrado ou erro na requisição.")
-                
-                time.sleep(check_interval)
+                self.poll()
+                if self.config.get('debug', False):
+                    print(f"  [DEBUG] Fases (p50/p95): {self.metrics.summary()}")
+                    print(f"  [DEBUG] Alertas: {self.alerts.summary()}")
+                delay = self.next_poll_delay()
+                if self.scheduler.adaptive or self.scheduler.errors:
+                    print(f"  ⏱️  {self.scheduler.status()}")
+                time.sleep(delay)
                 
         except KeyboardInterrupt:
             print("\n\n🛑 Bot interrompido pelo usuário.")
         except Exception as e:
             print(f"\n❌ Erro fatal: {e}", file=sys.stderr)
             raise
+        finally:
+            self.close()
+            if metrics_server is not None:
+                metrics_server.stop()
+
+
+# Layout do vetor de stats do Item: um valor por stat normalizado do STAT_MAPPING
+STAT_NAMES = tuple(sorted(set(TradeMonitor.STAT_MAPPING.values())))
+STAT_INDEX = {name: index for index, name in enumerate(STAT_NAMES)}
+_STAT_VECTOR = struct.Struct(f'<{len(STAT_NAMES)}H')
+
+# Palavras-chave de normalize_stat (chaves e valores do STAT_MAPPING)
+_STAT_MATCHER = KeywordMatcher(
+    [(key, value) for key, value in TradeMonitor.STAT_MAPPING.items()]
+    + [(value.lower(), value) for value in TradeMonitor.STAT_MAPPING.values()]
+)
 
 
 def main():
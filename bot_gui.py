@@ -11,6 +11,7 @@ import sys
 import os
 import time
 import webbrowser
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 try:
@@ -25,32 +26,157 @@ from bot import TradeMonitor, Item
 from license import LicenseManager
 
 
+# Linhas mantidas no log da interface (as mais antigas são descartadas)
+DEFAULT_LOG_LINES = 2000
+# Intervalo entre duas atualizações do widget de log e da tabela de itens (ms)
+LOG_FLUSH_MS = 100
+# Itens mantidos na tabela de itens encontrados
+MAX_MATCH_ROWS = 500
+# Intervalo mínimo entre dois alertas sonoros (uma rajada toca uma vez só)
+SOUND_MIN_INTERVAL = 5.0
+# Espera após abrir a janela antes de revalidar a licença no servidor (ms)
+LICENSE_REVALIDATE_DELAY_MS = 1000
+# Colunas da tabela de itens encontrados: (id, título, largura)
+MATCH_COLUMNS = (('time', 'Hora', 60), ('name', 'Nome', 220), ('slot', 'Slot', 70), ('affix', 'Affix', 70),
+                 ('level', 'iLvl', 40), ('stats', 'Stats', 200), ('score', 'Pontuação', 70),
+                 ('price', 'Preço', 90), ('seller', 'Vendedor', 90))
+
+
+class LogBuffer:
+    """
+    Modelo do log da interface: anel das últimas max_lines linhas
+
+    append pode ser chamado de qualquer thread; só o loop do Tk chama drain, que
+    junta as mensagens pendentes em um único texto e informa quantas linhas do
+    início do widget devem ser apagadas para ele não passar de max_lines.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_LOG_LINES):
+        self.max_lines = max(1, int(max_lines))
+        self.lines = deque(maxlen=self.max_lines)
+        # Mensagens ainda não exibidas (deque.append e popleft são atômicos)
+        self.pending = deque()
+        # Linhas exibidas atualmente no widget
+        self.widget_lines = 0
+
+    def append(self, message: str):
+        self.pending.append(str(message))
+
+    def drain(self):
+        """
+        Move as mensagens pendentes para o modelo
+
+        Returns:
+            (texto a acrescentar no fim do widget, linhas a apagar do início)
+        """
+        new_lines = []
+        while self.pending:
+            new_lines.extend(self.pending.popleft().split("\n"))
+        if not new_lines:
+            return "", 0
+        # Uma rajada maior que o anel só precisa das suas últimas linhas
+        new_lines = new_lines[-self.max_lines:]
+        self.lines.extend(new_lines)
+        total = self.widget_lines + len(new_lines)
+        trim = min(self.widget_lines, max(0, total - self.max_lines))
+        self.widget_lines = total - trim
+        return "".join(line + "\n" for line in new_lines), trim
+
+    def text(self) -> str:
+        """Conteúdo atual do log (as últimas max_lines linhas)"""
+        return "".join(line + "\n" for line in self.lines)
+
+
+class SoundWorker:
+    """
+    Toca o alerta sonoro em uma thread própria, sem travar o loop do Tk
+
+    Avisos que chegam enquanto o som toca, ou antes de min_interval segundos desde o
+    último, são reunidos em um único som.
+    """
+
+    def __init__(self, play, min_interval: float = SOUND_MIN_INTERVAL):
+        self.play = play
+        self.min_interval = min_interval
+        self._event = threading.Event()
+        self._last = None
+        self._thread = None
+
+    def notify(self):
+        """Pede um alerta sonoro (retorna imediatamente)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alerta-sonoro", daemon=True)
+            self._thread.start()
+        self._event.set()
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            if self._last is not None:
+                wait = self._last + self.min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            self._event.clear()
+            self._last = time.monotonic()
+            self.play()
+
+
 class BotGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Bot DreadmystDB - Monitor de Trade")
-        self.root.geometry("800x700")
+        self.root.geometry("900x850")
         self.root.resizable(True, True)
         
         # Variáveis
         self.monitor = None
         self.monitor_thread = None
+        # Sinal de parada da execução atual (cada Iniciar cria o seu)
+        self.stop_event = None
         self.is_running = False
         self.config_file = "config.json"
         self.license_manager = LicenseManager()
-        
-        # Verifica licença antes de continuar
+        self.log_buffer = LogBuffer()
+        # Itens encontrados pela thread do monitor, ainda não exibidos na tabela
+        self.pending_matches = deque()
+        self.match_rows = {}
+        self.match_sort = None
+        self.sound_worker = SoundWorker(self.play_sound)
+        
+        # Verifica licença antes de continuar (token em cache: sem acessar o servidor)
+        license_start = time.perf_counter()
         if not self.check_license():
             return  # A janela será fechada pelo check_license
+        license_ms = (time.perf_counter() - license_start) * 1000
         
         # Carrega configuração
         self.load_config()
+        self.log_buffer = LogBuffer(self.config.get('log_max_lines') or DEFAULT_LOG_LINES)
         
         # Cria interface
         self.create_widgets()
         
         # Atualiza interface com valores carregados
         self.update_interface_from_config()
+        
+        if self.license_manager.validated_from_cache:
+            self.log(f"🔐 Licença verificada em {license_ms:.0f} ms (token em cache); revalidando em segundo plano...")
+            # Revalida no servidor depois que a janela aparecer
+            self.root.after(LICENSE_REVALIDATE_DELAY_MS, lambda: self.license_manager.revalidate_in_background(
+                lambda is_valid, message: self.root.after(0, lambda: self.on_license_revalidated(is_valid, message))))
+        else:
+            self.log(f"🔐 Licença verificada em {license_ms:.0f} ms")
+    
+    def on_license_revalidated(self, is_valid: bool, message: str):
+        """Resultado da revalidação em segundo plano: se a licença deixou de valer, fecha o app"""
+        if is_valid:
+            self.log(f"🔐 Licença revalidada: {message}")
+            return
+        self.log(f"❌ Licença inválida: {message}")
+        self.stop_monitoring()
+        messagebox.showerror("Licença Inválida", f"{message}\n\nO programa será fechado.")
+        self.root.quit()
+        self.root.destroy()
     
     def check_license(self) -> bool:
         """
@@ -214,7 +340,12 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
             "log_file": "alerts.log",
             "debug": False,
             "filter_mode": "AND",
-            "sound_alert": True
+            "sound_alert": True,
+            "crawl_pages": 1,
+            "crawl_workers": 4,
+            "adaptive_interval": False,
+            "archive_file": None,
+            "log_max_lines": DEFAULT_LOG_LINES
         }
     
     def save_config(self):
@@ -444,6 +575,44 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
         ttk.Checkbutton(config_frame, text="Alerta Sonoro", variable=self.sound_alert_var).grid(
             row=0, column=4, padx=5)
         
+        ttk.Label(config_frame, text="Páginas:").grid(row=0, column=5, padx=5)
+        self.crawl_pages_var = tk.StringVar(value="1")
+        ttk.Spinbox(config_frame, from_=1, to=50, textvariable=self.crawl_pages_var, width=5).grid(
+            row=0, column=6, padx=5)
+        
+        self.adaptive_interval_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Intervalo Adaptativo", variable=self.adaptive_interval_var).grid(
+            row=0, column=7, padx=5)
+        
+        row += 1
+        
+        # === ITENS ENCONTRADOS ===
+        ttk.Label(main_frame, text="Itens Encontrados:", font=("Arial", 10, "bold")).grid(
+            row=row, column=0, sticky=tk.W, pady=5)
+        match_buttons = ttk.Frame(main_frame)
+        match_buttons.grid(row=row, column=1, columnspan=2, sticky=tk.E)
+        ttk.Button(match_buttons, text="🔗 Abrir Link", command=self.open_selected_matches).pack(side=tk.LEFT, padx=5)
+        ttk.Button(match_buttons, text="🧹 Limpar", command=self.clear_matches).pack(side=tk.LEFT, padx=5)
+        row += 1
+        
+        table_frame = ttk.Frame(main_frame)
+        table_frame.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        table_frame.columnconfigure(0, weight=1)
+        table_frame.rowconfigure(0, weight=1)
+        self.match_table = ttk.Treeview(table_frame, columns=[column for column, _, _ in MATCH_COLUMNS],
+                                        show='headings', height=8)
+        for column, title, width in MATCH_COLUMNS:
+            self.match_table.heading(column, text=title, command=lambda c=column: self.on_match_heading(c))
+            self.match_table.column(column, width=width, stretch=column in ('name', 'stats'))
+        table_scroll = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.match_table.yview)
+        self.match_table.configure(yscrollcommand=table_scroll.set)
+        self.match_table.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        table_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        # Duplo clique ou Enter abrem o link do item
+        self.match_table.bind('<Double-1>', self.open_selected_matches)
+        self.match_table.bind('<Return>', self.open_selected_matches)
+        main_frame.rowconfigure(row, weight=1)
+        self.root.after(LOG_FLUSH_MS, self.flush_matches)
         row += 1
         
         # === ÁREA DE LOG ===
@@ -451,9 +620,10 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
             row=row, column=0, sticky=tk.W, pady=5)
         row += 1
         
-        self.log_text = scrolledtext.ScrolledText(main_frame, height=10, width=80)
+        self.log_text = scrolledtext.ScrolledText(main_frame, height=8, width=80)
         self.log_text.grid(row=row, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         main_frame.rowconfigure(row, weight=1)
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
         row += 1
         
         # === BOTÕES ===
@@ -560,6 +730,8 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
         self.interval_var.set(str(self.config.get('check_interval', 30)))
         self.filter_mode_var.set(self.config.get('filter_mode', 'AND'))
         self.sound_alert_var.set(self.config.get('sound_alert', True))
+        self.adaptive_interval_var.set(self.config.get('adaptive_interval', False))
+        self.crawl_pages_var.set(str(self.config.get('crawl_pages', 1)))
     
     def get_config_from_ui(self):
         """Obtém a configuração da interface"""
@@ -632,6 +804,15 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
         config['check_interval'] = int(self.interval_var.get())
         config['filter_mode'] = self.filter_mode_var.get()
         config['sound_alert'] = self.sound_alert_var.get()
+        config['crawl_pages'] = int(self.crawl_pages_var.get())
+        config['crawl_workers'] = self.config.get('crawl_workers', 4)
+        config['adaptive_interval'] = self.adaptive_interval_var.get()
+        config['archive_file'] = self.config.get('archive_file')
+        # Mínimos por stat e pontuação só são editados no config.json
+        for key in ('min_interval', 'max_interval', 'stat_min', 'score_weights', 'score_per_gold', 'min_score',
+                    'log_max_lines'):
+            if self.config.get(key) is not None:
+                config[key] = self.config[key]
         config['alert_method'] = 'console'
         config['log_file'] = 'alerts.log'
         config['debug'] = False
@@ -652,10 +833,23 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
         self.log("✓ Configuração carregada!")
     
     def log(self, message):
-        """Adiciona mensagem ao log"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Adiciona mensagem ao log (pode ser chamado de qualquer thread; exibida em até LOG_FLUSH_MS)"""
+        self.log_buffer.append(message)
+    
+    def flush_log(self):
+        """Exibe as mensagens pendentes de uma vez e apaga as linhas que saíram do anel"""
+        try:
+            text, trim = self.log_buffer.drain()
+            if text:
+                # Só acompanha o fim se o usuário não rolou o log para cima
+                at_end = self.log_text.yview()[1] >= 0.999
+                self.log_text.insert(tk.END, text)
+                if trim:
+                    self.log_text.delete("1.0", f"{trim + 1}.0")
+                if at_end:
+                    self.log_text.see(tk.END)
+        finally:
+            self.root.after(LOG_FLUSH_MS, self.flush_log)
     
     def play_sound(self):
         """Toca som de alerta"""
@@ -683,92 +877,100 @@ A chave deve ser salva em um arquivo chamado 'license.key' no mesmo diretório d
             except:
                 pass
     
-    def alert_item_found(self, item: Item):
-        """Alerta quando item é encontrado"""
-        affix_quality_text = f"Qualidade Affix: {item.affix_quality}" if item.affix_quality else "Qualidade Affix: Nenhuma"
-        message = f"""
-{'='*60}
-🎯 ITEM ENCONTRADO! 🎯
-{'='*60}
-Nome: {item.name}
-Slot: {item.slot or 'Desconhecido'}
-{affix_quality_text}
-Item Level: {item.item_level}
-Stats: {', '.join(item.stats)}
-Preço: {item.price}
-Vendedor: {item.seller}
-Tempo restante: {item.time_left}
-URL: {item.url}
-{'='*60}
-"""
-        self.log(message)
-        self.log(f"🔗 URL completa: {item.url}")
-        
-        # Alerta sonoro
-        sound_enabled = self.config.get('sound_alert', True)
-        self.log(f"🔊 Alerta sonoro configurado: {sound_enabled}")
-        if sound_enabled:
+    def queue_match(self, item: Item):
+        """Enfileira um item encontrado (chamado da thread do monitor; exibido por flush_matches)"""
+        score = self.monitor.item_score(item) if self.monitor else None
+        self.pending_matches.append((item, score, datetime.now()))
+    
+    def flush_matches(self):
+        """Acrescenta à tabela os itens encontrados desde a última chamada, com um único alerta sonoro"""
+        try:
+            entries = []
+            while self.pending_matches:
+                entries.append(self.pending_matches.popleft())
+            if entries:
+                self.alert_items_found(entries)
+        finally:
+            self.root.after(LOG_FLUSH_MS, self.flush_matches)
+    
+    def alert_items_found(self, entries):
+        """Mostra uma rajada de itens encontrados na tabela (mais recentes no topo)"""
+        for item, score, found_at in entries:
+            iid = self.match_table.insert('', 0, values=(
+                found_at.strftime('%H:%M:%S'),
+                item.name,
+                item.slot or '?',
+                item.affix_quality or '',
+                item.item_level,
+                ', '.join(item.stats),
+                f"{score:.1f}" if score is not None else '',
+                item.price,
+                item.seller
+            ))
+            self.match_rows[iid] = (item, score, found_at)
+            self.log(f"🎯 {item.name} | {item.price} | {item.url}")
+        
+        # A tabela guarda só os MAX_MATCH_ROWS mais recentes
+        rows = self.match_table.get_children('')
+        if len(rows) > MAX_MATCH_ROWS:
+            stale = rows[MAX_MATCH_ROWS:]
+            self.match_table.delete(*stale)
+            for iid in stale:
+                self.match_rows.pop(iid, None)
+        if self.match_sort is not None:
+            self.sort_matches(*self.match_sort)
+        
+        self.log(f"🎯 {len(entries)} item(ns) encontrado(s) — veja a tabela de itens")
+        if self.config.get('sound_alert', True):
+            self.sound_worker.notify()
+        # Traz a janela para a frente uma vez por rajada
+        self.root.lift()
+    
+    def match_sort_key(self, column: str):
+        """Chave de ordenação de uma coluna da tabela (numérica onde faz sentido)"""
+        def key(iid):
+            item, score, found_at = self.match_rows[iid]
+            if column == 'price':
+                return item.gold if item.gold is not None else float('inf')
+            if column == 'score':
+                return score if score is not None else float('-inf')
+            if column == 'level':
+                return item.level or 0
+            if column == 'time':
+                return found_at
+            return str(self.match_table.set(iid, column)).lower()
+        return key
+    
+    def sort_matches(self, column: str, descending: bool):
+        """Ordena a tabela de itens pela coluna"""
+        rows = sorted(self.match_table.get_children(''), key=self.match_sort_key(column), reverse=descending)
+        for index, iid in enumerate(rows):
+            self.match_table.move(iid, '', index)
+        self.match_sort = (column, descending)
+    
+    def on_match_heading(self, column: str):
+        """Clique no cabeçalho: ordena pela coluna (outro clique inverte a ordem)"""
+        descending = self.match_sort == (column, False)
+        self.sort_matches(column, descending)
+    
+    def open_selected_matches(self, event=None):
+        """Abre no navegador o link dos itens selecionados"""
+        for iid in self.match_table.selection():
+            item = self.match_rows[iid][0]
+            if not item.url:
+                self.log(f"⚠ Item {item.name} não tem URL")
+                continue
             try:
-                self.log("🔊 Tentando tocar som...")
-                self.play_sound()
-                self.log("🔊 Alerta sonoro tocado com sucesso!")
+                webbrowser.open(item.url)
+                self.log(f"🌐 Abrindo URL: {item.url}")
             except Exception as e:
-                self.log(f"⚠ Erro ao tocar som: {e}")
-                import traceback
-                self.log(f"⚠ Traceback: {traceback.format_exc()}")
-        
-        # Mostra popup
-        popup = tk.Toplevel(self.root)
-        popup.title("🎯 Item Encontrado!")
-        popup.geometry("600x500")
-        
-        # Frame principal
-        main_frame = tk.Frame(popup)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Texto do item
-        text_widget = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD, padx=10, pady=10, height=15)
-        text_widget.pack(fill=tk.BOTH, expand=True)
-        
-        # Remove a linha da URL da mensagem para adicionar como botão
-        message_without_url = message.replace(f"URL: {item.url}\n", "")
-        text_widget.insert(tk.END, message_without_url)
-        text_widget.config(state=tk.DISABLED)
-        
-        # Frame para botões
-        button_frame = tk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=10)
-        
-        # Botão para abrir URL
-        if item.url and item.url.strip():
-            def open_url():
-                import webbrowser
-                try:
-                    webbrowser.open(item.url)
-                    self.log(f"🌐 Abrindo URL: {item.url}")
-                except Exception as e:
-                    self.log(f"⚠ Erro ao abrir URL: {e}")
-                    messagebox.showerror("Erro", f"Erro ao abrir URL:\n{item.url}\n\n{e}")
-            
-            url_button = ttk.Button(button_frame, text="🔗 Abrir Link do Item", command=open_url)
-            url_button.pack(side=tk.LEFT, padx=5)
-        else:
-            # Mostra que não há URL disponível
-            no_url_label = tk.Label(button_frame, text="⚠ URL não disponível", fg="red")
-            no_url_label.pack(side=tk.LEFT, padx=5)
-            self.log(f"⚠ ATENÇÃO: Item {item.name} não tem URL! (item.url = {repr(item.url)})")
-        
-        # Botão fechar
-        close_button = ttk.Button(button_frame, text="Fechar", command=popup.destroy)
-        close_button.pack(side=tk.RIGHT, padx=5)
-        
-        # Faz o popup aparecer na frente
-        popup.lift()
-        popup.attributes('-topmost', True)
-        popup.after_idle(popup.attributes, '-topmost', False)
-        
-        # Foca na janela
-        popup.focus_force()
+                self.log(f"⚠ Erro ao abrir URL: {e}")
+                messagebox.showerror("Erro", f"Erro ao abrir URL:\n{item.url}\n\n{e}")
+    
+    def clear_matches(self):
+        """Limpa a tabela de itens encontrados"""
+        self.match_table.delete(*self.match_table.get_children(''))
+        self.match_rows.clear()
     
     def start_monitoring(self):
         """Inicia o monitoramento"""
@@ -782,13 +984,9 @@ URL: {item.url}
         # Cria monitor
         try:
             self.monitor = TradeMonitor(self.config_file)
-            # Sobrescreve o método alert do monitor para usar nossa interface
-            def custom_alert(item):
-                # Log de debug
-                print(f"[DEBUG] custom_alert chamado para: {item.name}, URL: {item.url}")
-                # Usa lambda com default para capturar corretamente o item
-                self.root.after(0, lambda i=item: self.alert_item_found(i))
-            self.monitor.alert = custom_alert
+            # Sobrescreve os métodos alert e log do monitor para usar nossa interface
+            self.monitor.alert = self.queue_match
+            self.monitor.log = self.log
             
             self.is_running = True
             self.start_button.config(state=tk.DISABLED)
@@ -805,11 +1003,17 @@ URL: {item.url}
                 self.log(f"⚡ Outros Atributos: {stats}")
             if self.config.get('slots'):
                 self.log(f"📦 Slots: {self.config.get('slots')}")
-            self.log(f"⏱️  Intervalo: {self.config.get('check_interval')} segundos")
+            if self.monitor.scheduler.adaptive:
+                self.log(f"⏱️  Intervalo: adaptativo, entre {self.monitor.scheduler.min_interval:.0f} "
+                         f"e {self.monitor.scheduler.max_interval:.0f} segundos")
+            else:
+                self.log(f"⏱️  Intervalo: {self.config.get('check_interval')} segundos")
             self.log("="*60)
             
             # Inicia thread de monitoramento customizado
-            self.monitor_thread = threading.Thread(target=self.run_monitor, daemon=True)
+            self.stop_event = threading.Event()
+            self.monitor_thread = threading.Thread(target=self.run_monitor, args=(self.monitor, self.stop_event),
+                                                   daemon=True)
             self.monitor_thread.start()
             
         except Exception as e:
@@ -819,53 +1023,36 @@ URL: {item.url}
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
     
-    def run_monitor(self):
-        """Executa o monitor em thread separada"""
-        import time
+    def run_monitor(self, monitor: TradeMonitor, stop: threading.Event):
+        """
+        Executa o monitor em thread separada até stop ser sinalizado
+        
+        Cada verificação é a mesma do bot de linha de comando (TradeMonitor.poll); as
+        mensagens e os itens encontrados chegam à interface por log e queue_match. Ao
+        parar, os recursos do monitor são liberados nesta thread.
+        """
         try:
-            check_interval = self.config.get('check_interval', 30)
-            
-            while self.is_running:
-                items = self.monitor.fetch_items()
-                
-                if items:
-                    self.root.after(0, lambda n=len(items): self.log(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] Verificando {n} itens..."))
-                    
-                    new_items_found = 0
-                    for item in items:
-                        if item.listing_id in self.monitor.seen_items:
-                            continue
-                        
-                        if self.monitor.item_matches_filters(item):
-                            # Chama o alerta (que foi sobrescrito para usar a GUI)
-                            self.monitor.alert(item)
-                            self.monitor.seen_items.add(item.listing_id)
-                            new_items_found += 1
-                    
-                    if new_items_found > 0:
-                        self.root.after(0, lambda n=new_items_found: self.log(
-                            f"  ✓ {n} novo(s) item(ns) encontrado(s)!"))
-                    elif len(items) > 0:
-                        self.root.after(0, lambda: self.log(
-                            f"  ⚠ Nenhum item novo correspondente aos filtros."))
-                else:
-                    self.root.after(0, lambda: self.log(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] ⚠ Nenhum item encontrado ou erro na requisição."))
+            while not stop.is_set():
+                monitor.poll()
                 
-                # Aguarda intervalo
-                for _ in range(check_interval):
-                    if not self.is_running:
-                        break
-                    time.sleep(1)
+                # Aguarda o intervalo definido pelo agendador (adaptativo e com recuo em erros)
+                delay = monitor.next_poll_delay()
+                if monitor.scheduler.adaptive or monitor.scheduler.errors:
+                    self.log(f"  ⏱️  {monitor.scheduler.status()}")
+                stop.wait(delay)
                     
         except Exception as e:
-            self.root.after(0, lambda: self.log(f"❌ Erro no monitoramento: {e}"))
-            self.root.after(0, lambda: self.stop_monitoring())
+            self.log(f"❌ Erro no monitoramento: {e}")
+            # Só para a interface se esta ainda for a execução atual
+            self.root.after(0, lambda: self.stop_monitoring() if self.stop_event is stop else None)
+        finally:
+            monitor.close()
     
     def stop_monitoring(self):
         """Para o monitoramento"""
         self.is_running = False
+        if self.stop_event is not None:
+            self.stop_event.set()
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.log("⏹ Monitoramento parado.")
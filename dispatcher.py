@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Despachante de Busca Compartilhada do Bot DreadmystDB
+Agrupa perfis de filtro pela consulta enviada ao site (quality, level, price, affix_score).
+Cada consulta distinta é buscada e extraída uma única vez por ciclo, e a lista de itens
+é distribuída para os filtros locais (stats, slots, primary_stats) de cada perfil do grupo.
+
+Uso: python dispatcher.py -c perfil1.json -c perfil2.json ...
+"""
+
+import os
+import sys
+import time
+from typing import Dict, List
+
+from bot import TradeMonitor, Item
+from metrics import serve_metrics
+from profile_index import ProfileIndex, match_group
+
+
+def query_key(monitor: TradeMonitor) -> str:
+    """
+    Chave da consulta feita ao site por um perfil
+
+    É a própria URL de build_url: filtros locais não fazem parte dela, então perfis
+    que diferem apenas nesses filtros compartilham a mesma chave. Perfis com crawl
+    de páginas diferente ficam em grupos separados.
+    """
+    url = monitor.build_url()
+    pages = monitor.get_crawl_pages()
+    return url if pages == 1 else f"{url} [{pages} páginas]"
+
+
+def group_by_query(monitors: List[TradeMonitor]) -> Dict[str, List[TradeMonitor]]:
+    """Agrupa os perfis pela chave de consulta, preservando a ordem"""
+    groups: Dict[str, List[TradeMonitor]] = {}
+    for monitor in monitors:
+        groups.setdefault(query_key(monitor), []).append(monitor)
+    return groups
+
+
+def archive_writers(group: List[TradeMonitor]) -> List[bool]:
+    """
+    Para cada perfil do grupo, se ele grava os itens no arquivo histórico
+
+    Todos os perfis do grupo recebem os mesmos itens, então cada archive_file é gravado
+    só pelo primeiro perfil que o usa (o líder, se ele tiver arquivo), e não uma vez
+    por perfil.
+    """
+    writers = []
+    paths = set()
+    for monitor in group:
+        path = os.path.abspath(monitor.archive.path) if monitor.archive is not None else None
+        writers.append(path is not None and path not in paths)
+        paths.add(path)
+    return writers
+
+
+class SharedFetchDispatcher:
+    """Executa vários perfis fazendo uma única requisição por consulta distinta"""
+
+    def __init__(self, monitors: List[TradeMonitor] = None):
+        self.groups: Dict[str, List[TradeMonitor]] = {}
+        self.indexes: Dict[str, ProfileIndex] = {}
+        self.next_due: Dict[str, float] = {}
+        self.requests_made = 0
+        self.profile_polls = 0
+        for monitor in monitors or []:
+            self.add_profile(monitor)
+
+    def add_profile(self, monitor: TradeMonitor):
+        """Adiciona um perfil ao grupo da sua consulta"""
+        key = query_key(monitor)
+        self.groups.setdefault(key, []).append(monitor)
+        self.indexes.setdefault(key, ProfileIndex()).add(monitor)
+        self.next_due.setdefault(key, 0.0)
+
+    def remove_profile(self, monitor: TradeMonitor):
+        """Remove um perfil; grupos vazios deixam de ser buscados"""
+        key = query_key(monitor)
+        group = self.groups.get(key, [])
+        if monitor in group:
+            group.remove(monitor)
+            self.indexes[key].remove(monitor)
+        if not group:
+            self.groups.pop(key, None)
+            self.indexes.pop(key, None)
+            self.next_due.pop(key, None)
+
+    def fetch_group(self, key: str) -> List[Item]:
+        """
+        Busca os itens de um grupo uma única vez
+
+        O primeiro perfil faz a requisição (e o crawl, se configurado). Como todos os
+        perfis do grupo recebem os mesmos itens, o crawled_items dele vale para o grupo.
+        """
+        self.requests_made += 1
+        return self.groups[key][0].fetch_items()
+
+    def dispatch(self, key: str, items: List[Item]) -> Dict[TradeMonitor, int]:
+        """
+        Distribui os itens de uma consulta para os filtros locais de cada perfil
+        
+        Em grupos grandes, os itens são avaliados de uma vez para todos os
+        perfis (índice invertido ou lote com NumPy, ver profile_index.match_group).
+        Cada arquivo histórico é gravado uma única vez (ver archive_writers).
+        """
+        results = {}
+        group = self.groups[key]
+        unchanged = group[0].last_fetch_unchanged
+        matches = match_group(self.indexes[key], group, items) if not unchanged else None
+        writers = archive_writers(group)
+        for i, monitor in enumerate(group):
+            if matches is not None:
+                results[monitor] = monitor.process_items(items, unchanged=unchanged, matched=matches[0][i],
+                                                         evaluated=matches[1], archive=writers[i])
+            else:
+                results[monitor] = monitor.process_items(items, unchanged=unchanged, archive=writers[i])
+            self.profile_polls += 1
+        return results
+
+    def tick(self) -> Dict[TradeMonitor, int]:
+        """Executa um ciclo completo: uma busca por grupo, distribuída para todos os perfis"""
+        results = {}
+        for key in list(self.groups):
+            results.update(self.dispatch(key, self.fetch_group(key)))
+        return results
+
+    def run_due(self) -> float:
+        """
+        Busca os grupos cujo intervalo venceu
+
+        A próxima busca de cada grupo é marcada pelo agendador do primeiro perfil,
+        com os anúncios novos e o erro da busca do grupo (intervalo adaptativo e
+        recuo com Retry-After).
+
+        Returns:
+            Segundos até o próximo grupo vencer
+        """
+        now = time.monotonic()
+        for key in list(self.groups):
+            if self.next_due[key] <= now:
+                start = time.perf_counter()
+                self.dispatch(key, self.fetch_group(key))
+                self.groups[key][0].metrics.record('poll', time.perf_counter() - start)
+                self.next_due[key] = time.monotonic() + self.groups[key][0].next_poll_delay()
+        if not self.next_due:
+            return 1.0
+        return max(0.0, min(self.next_due.values()) - time.monotonic())
+
+    def run(self):
+        """Executa os perfis em loop"""
+        profiles = sum(len(group) for group in self.groups.values())
+        print("🤖 Bot de Monitoramento DreadmystDB (busca compartilhada) iniciado!")
+        print(f"📋 {profiles} perfil(is) em {len(self.groups)} consulta(s) distinta(s)")
+        for key, group in self.groups.items():
+            print(f"🔗 {key} -> {len(group)} perfil(is), a cada {group[0].config.get('check_interval', 30)}s")
+        monitors = [monitor for group in self.groups.values() for monitor in group]
+        metrics_server = serve_metrics(monitors)
+        print("\n" + "="*60)
+        print("Aguardando novos itens...")
+        print("="*60 + "\n")
+
+        try:
+            while True:
+                time.sleep(self.run_due())
+        except KeyboardInterrupt:
+            print("\n\n🛑 Bot interrompido pelo usuário.")
+            if self.profile_polls:
+                print(f"📊 {self.requests_made} requisições para {self.profile_polls} verificações de perfis")
+        except Exception as e:
+            print(f"\n❌ Erro fatal: {e}", file=sys.stderr)
+            raise
+        finally:
+            for monitor in monitors:
+                monitor.close()
+            if metrics_server is not None:
+                metrics_server.stop()
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bot de Monitoramento DreadmystDB (vários perfis, busca compartilhada)')
+    parser.add_argument('-c', '--config', action='append', dest='configs',
+                        help='Arquivo de configuração de um perfil (pode ser repetido; padrão: config.json)')
+
+    args = parser.parse_args()
+
+    monitors = [TradeMonitor(config_file) for config_file in (args.configs or ['config.json'])]
+    SharedFetchDispatcher(monitors).run()
+
+
+if __name__ == '__main__':
+    main()
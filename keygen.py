@@ -2,14 +2,55 @@
 """
 Gerador de Chaves de Licença para o Bot DreadmystDB
 Uso: python keygen.py <dias> [customer_id]
+     python keygen.py --verificar <arquivo> [--ativar]
 """
 
 import sys
 from license import LicenseManager
 from datetime import datetime
 
+# Máquina informada ao servidor nas linhas do arquivo sem machine_id
+DEFAULT_MACHINE_ID = "keygen"
+
+
+def verify_keys(args):
+    """
+    Verifica (ou ativa) no servidor todas as chaves de um arquivo, em lotes
+    
+    Cada linha do arquivo tem uma chave e, opcionalmente, o machine_id separado por espaço.
+    """
+    action = 'activate' if '--ativar' in args else 'check'
+    paths = [arg for arg in args if arg != '--ativar']
+    if len(paths) != 1:
+        print("❌ Uso: python keygen.py --verificar <arquivo> [--ativar]")
+        sys.exit(1)
+    
+    entries = []
+    with open(paths[0], 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                entries.append((parts[0], parts[1] if len(parts) > 1 else DEFAULT_MACHINE_ID, action))
+    
+    verb = "Ativando" if action == 'activate' else "Verificando"
+    print(f"\n🔎 {verb} {len(entries)} chave(s) em {paths[0]}")
+    manager = LicenseManager()
+    results = manager.check_licenses_online(entries)
+    if results is None:
+        print("❌ Servidor de licenças não disponível")
+        sys.exit(1)
+    
+    for (license_key, machine_id, _), (is_valid, message) in zip(entries, results):
+        print(f"{'✅' if is_valid else '❌'} {license_key[:16]}... ({machine_id}): {message}")
+    valid_count = sum(1 for is_valid, _ in results if is_valid)
+    print(f"\n📊 {valid_count} válida(s), {len(results) - valid_count} recusada(s)")
+
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--verificar':
+        verify_keys(sys.argv[2:])
+        return
+    
     if len(sys.argv) < 2:
         print("=" * 60)
         print("Gerador de Chaves de Licença - Bot DreadmystDB")
@@ -20,6 +61,8 @@ def main():
         print("  python keygen.py 30              # Licença de 30 dias")
         print("  python keygen.py 90 cliente123    # Licença de 90 dias para cliente123")
         print("  python keygen.py 365              # Licença de 1 ano")
+        print("  python keygen.py --verificar chaves.txt          # Situação de várias chaves no servidor")
+        print("  python keygen.py --verificar chaves.txt --ativar # Ativa as chaves (linha: <chave> [machine_id])")
         print("\nA chave será salva em 'license.key'")
         print("=" * 60)
         sys.exit(1)
@@ -7,6 +7,8 @@ import os
 import json
 import hashlib
 import hmac
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import base64
@@ -27,6 +29,10 @@ LICENSE_SERVER_URL = os.environ.get("LICENSE_SERVER_URL", "https://dreadbot-d4xc
 
 # Timeout para requisições ao servidor (segundos)
 LICENSE_SERVER_TIMEOUT = 10
+# Validações enviadas por requisição ao /validate/batch (o servidor aceita até 10.000)
+LICENSE_BATCH_SIZE = 1000
+# Timeout de cada requisição ao /validate/batch (segundos)
+LICENSE_BATCH_TIMEOUT = 60
 
 # Nome do arquivo de licença
 LICENSE_FILE = "license.key"
@@ -34,6 +40,10 @@ LICENSE_FILE = "license.key"
 LICENSE_LOCK_FILE = "license.lock"
 # Arquivo que armazena registro global de chaves ativadas (hash da chave original -> machine_id)
 LICENSE_REGISTRY_FILE = "license.registry"
+# Resultado assinado da última validação completa, usado para abrir sem acessar o servidor
+LICENSE_TOKEN_FILE = "license.token"
+# Validade do token (segundos): depois disso a abertura volta a validar no servidor
+LICENSE_TOKEN_TTL = 24 * 3600
 
 
 class LicenseManager:
@@ -44,7 +54,11 @@ class LicenseManager:
         self.license_data = None
         self.lock_file = LICENSE_LOCK_FILE
         self.registry_file = LICENSE_REGISTRY_FILE
+        self.token_file = LICENSE_TOKEN_FILE
+        self.token_ttl = LICENSE_TOKEN_TTL
         self.server_url = server_url or LICENSE_SERVER_URL
+        # True se a última load_license usou o token em cache (sem validar no servidor)
+        self.validated_from_cache = False
     
     def get_machine_id(self) -> str:
         """
@@ -214,6 +228,51 @@ class LicenseManager:
             traceback.print_exc()
             return None
     
+    def check_licenses_online(self, entries, batch_size: int = LICENSE_BATCH_SIZE):
+        """
+        Verifica/ativa várias licenças no servidor, em lotes no /validate/batch
+        
+        Uma requisição valida até batch_size licenças, em vez de uma requisição por
+        licença (e ação) como em check_license_online.
+        
+        Args:
+            entries: Sequência de (license_key, machine_id, action), com action 'check' ou 'activate'
+            batch_size: Validações por requisição
+        
+        Returns:
+            Lista de (is_valid, message), na ordem das entradas, ou None se servidor não disponível
+        """
+        if not self.server_url or self.server_url == "None" or self.server_url == "":
+            return None
+        
+        entries = list(entries)
+        batch_url = self.server_url.rstrip('/') + '/batch'
+        results = []
+        try:
+            for start in range(0, len(entries), batch_size):
+                data = {'requests': [
+                    {'license_key': license_key, 'machine_id': machine_id, 'action': action}
+                    for license_key, machine_id, action in entries[start:start + batch_size]
+                ]}
+                req = urllib.request.Request(
+                    batch_url,
+                    data=json.dumps(data).encode('utf-8'),
+                    headers={'Content-Type': 'application/json'},
+                    method='POST'
+                )
+                with urllib.request.urlopen(req, timeout=LICENSE_BATCH_TIMEOUT) as response:
+                    answer = json.loads(response.read().decode('utf-8'))
+                results.extend((result.get('valid', False), result.get('message', 'Erro desconhecido'))
+                               for result in answer['results'])
+            return results
+        
+        except urllib.error.URLError as e:
+            print(f"[DEBUG] Servidor não disponível: {e}")
+            return None
+        except Exception as e:
+            print(f"[DEBUG] Erro ao verificar licenças online: {e}")
+            return None
+    
     def load_license_lock(self) -> dict:
         """
         Carrega o arquivo de lock que vincula chave à máquina
@@ -480,14 +539,93 @@ class LicenseManager:
             error_msg = f"Erro ao validar licença: {str(e)}"
             return (False, error_msg) if not return_activated_key else (False, error_msg, None)
     
-    def load_license(self):
+    def sign_token(self, token_data: dict) -> str:
+        """Assinatura HMAC dos dados de um token de validação"""
+        token_json = json.dumps(token_data, sort_keys=True)
+        return hmac.new(LICENSE_SECRET_KEY, token_json.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    def load_validation_token(self, license_key: str):
+        """
+        Carrega o token da última validação completa, se ainda valer
+        
+        O token só vale para a mesma chave (hash do license.key) e a mesma máquina,
+        até vencer o TTL ou a própria licença.
+        
+        Returns:
+            Dados da licença guardados no token, ou None se não houver token válido
+        """
+        token_path = Path(self.token_file)
+        if not token_path.exists():
+            return None
+        try:
+            with open(token_path, 'r', encoding='utf-8') as f:
+                token = json.load(f)
+            token_data = token.get("data") or {}
+            if not hmac.compare_digest(str(token.get("signature", "")), self.sign_token(token_data)):
+                return None
+            if token_data.get("license_hash") != self.get_license_hash(license_key):
+                return None
+            if token_data.get("machine_id") != self.get_machine_id():
+                return None
+            now = time.time()
+            if not token_data.get("validated_at", 0) <= now < token_data.get("expires_at", 0):
+                return None
+            license_data = token_data.get("license_data") or {}
+            expiration_date = datetime.strptime(license_data["expiration_date"], "%Y-%m-%d %H:%M:%S")
+            if datetime.now() > expiration_date:
+                return None
+            return license_data
+        except Exception:
+            return None
+    
+    def save_validation_token(self, license_key: str, license_data: dict) -> bool:
+        """
+        Grava o token assinado de uma validação completa bem-sucedida
+        
+        Returns:
+            True se gravou com sucesso
+        """
+        now = time.time()
+        token_data = {
+            "license_hash": self.get_license_hash(license_key),
+            "machine_id": self.get_machine_id(),
+            "validated_at": now,
+            "expires_at": now + self.token_ttl,
+            "license_data": license_data
+        }
+        try:
+            token_path = Path(self.token_file)
+            temp_path = token_path.with_name(token_path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"data": token_data, "signature": self.sign_token(token_data)}, f)
+            os.replace(temp_path, token_path)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar token de validação: {e}")
+            return False
+    
+    def clear_validation_token(self):
+        """Apaga o token (a próxima abertura valida no servidor)"""
+        try:
+            Path(self.token_file).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Erro ao apagar token de validação: {e}")
+    
+    def load_license(self, use_cache: bool = True):
         """
         Carrega e valida a licença do arquivo
         
+        Com use_cache, um token de validação ainda válido dispensa a validação
+        completa (assinaturas, registro e servidor); use revalidate_in_background
+        depois para renová-lo.
+        
         Returns:
             (is_valid, message)
         """
         license_path = Path(self.license_file)
+        self.validated_from_cache = False
         
         if not license_path.exists():
             return False, "Arquivo de licença não encontrado"
@@ -496,6 +634,15 @@ class LicenseManager:
             with open(license_path, 'r', encoding='utf-8') as f:
                 license_key = f.read().strip()
             
+            if use_cache:
+                cached_data = self.load_validation_token(license_key)
+                if cached_data is not None:
+                    expiration_date = datetime.strptime(cached_data["expiration_date"], "%Y-%m-%d %H:%M:%S")
+                    days_left = (expiration_date - datetime.now()).days
+                    self.license_data = cached_data
+                    self.validated_from_cache = True
+                    return True, f"Licença válida. {days_left} dia(s) restante(s)"
+            
             # Valida e se foi ativada, salva a versão ativada de volta
             result = self.validate_license_key(license_key, return_activated_key=True)
             
@@ -506,15 +653,40 @@ class LicenseManager:
                     try:
                         with open(license_path, 'w', encoding='utf-8') as f:
                             f.write(activated_key)
+                        license_key = activated_key
                     except:
                         pass  # Se não conseguir salvar, continua com a validação
-                return is_valid, message
             else:
-                return result
+                is_valid, message = result
+            
+            if is_valid:
+                self.save_validation_token(license_key, self.license_data)
+            else:
+                self.clear_validation_token()
+            return is_valid, message
             
         except Exception as e:
             return False, f"Erro ao ler licença: {str(e)}"
     
+    def revalidate_in_background(self, callback=None) -> threading.Thread:
+        """
+        Refaz a validação completa em uma thread e renova o token
+        
+        Args:
+            callback: Chamada com (is_valid, message) ao terminar (na thread de validação)
+        
+        Returns:
+            A thread iniciada
+        """
+        def run():
+            is_valid, message = self.load_license(use_cache=False)
+            if callback is not None:
+                callback(is_valid, message)
+        
+        thread = threading.Thread(target=run, name="revalidacao-licenca", daemon=True)
+        thread.start()
+        return thread
+    
     def save_license(self, license_key: str, skip_validation: bool = False) -> bool:
         """
         Salva a chave de licença no arquivo
@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Registro de Ativações do Servidor de Licenças
+Guarda qual máquina ativou cada licença (hash da chave original -> machine_id).
+
+O registro em SQLite (modo WAL) é o padrão: consultas e ativações custam o mesmo com
+dez ou um milhão de chaves, e a ativação é uma única instrução atômica, então dois
+workers do gunicorn ativando a mesma chave ao mesmo tempo não perdem nem sobrescrevem
+a ativação um do outro. O arquivo JSON antigo continua disponível como backend e é
+importado automaticamente na primeira vez que o banco é aberto.
+
+Cada worker guarda as últimas consultas em memória (CachedLicenseRegistry); o cache é
+descartado quando a geração do backend muda, isto é, quando qualquer processo grava. A
+geração é conferida no máximo a cada GENERATION_CHECK_SECONDS (e logo após as gravações
+do próprio worker), então acertos no cache não consultam o banco.
+
+O SQLite mantém o total de ativações e as ativações por dia em tabelas de contadores,
+atualizadas por triggers na mesma transação de cada gravação: as estatísticas são lidas
+sem percorrer o registro, e valem para todos os workers. As consultas e ativações por
+minuto também ficam no banco (request_minutes); cada worker acumula as suas em memória
+e as soma ao banco a cada RATE_FLUSH_SECONDS.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# Banco SQLite do registro e arquivo JSON das versões anteriores do servidor
+REGISTRY_DB = "license_registry.db"
+REGISTRY_FILE = "license_registry.json"
+# Backend padrão: 'sqlite' ou 'json' (variável de ambiente LICENSE_REGISTRY_BACKEND)
+DEFAULT_BACKEND = "sqlite"
+# Espera máxima por um lock de escrita de outro worker (ms)
+BUSY_TIMEOUT_MS = 5000
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Consultas mantidas no cache de cada worker
+REGISTRY_CACHE_SIZE = 50_000
+# Intervalo entre duas conferências da geração do backend pelo cache (segundos)
+GENERATION_CHECK_SECONDS = 1.0
+# Ações aceitas pelo /validate
+ACTIONS = ('check', 'activate')
+# Minutos de requisições mantidos no registro (RequestRates)
+RATE_WINDOW_MINUTES = 60
+# Intervalo entre duas gravações das requisições acumuladas por um worker (segundos)
+RATE_FLUSH_SECONDS = 5.0
+# Sufixo das entradas de data no formato JSON ({hash: machine_id, "<hash>_date": data})
+DATE_SUFFIX = "_date"
+
+
+class LicenseRegistry:
+    """
+    Interface dos backends do registro
+
+    activate é a única operação de escrita usada pelo /validate e precisa ser atômica:
+    de várias ativações concorrentes da mesma chave, só a primeira é registrada.
+    """
+
+    def lookup(self, license_hash: str) -> Optional[str]:
+        """machine_id que ativou a licença (None se ainda não foi ativada)"""
+        raise NotImplementedError
+
+    def generation(self) -> Hashable:
+        """Valor que muda sempre que o registro é alterado (por este ou por outro processo)"""
+        raise NotImplementedError
+
+    def activate(self, license_hash: str, machine_id: str) -> Tuple[bool, str]:
+        """
+        Ativa a licença para a máquina, se ainda não foi ativada
+
+        Returns:
+            (ativada para esta máquina, machine_id registrado); (False, outro_id) se
+            outra máquina ativou antes
+        """
+        raise NotImplementedError
+
+    def validate_many(self, entries: Sequence[Tuple[str, str, str]]) -> List[Optional[str]]:
+        """
+        Aplica consultas e ativações (hash, machine_id, ação), na ordem, numa única operação
+
+        Uma consulta depois de uma ativação da mesma chave no lote já a vê ativada.
+
+        Returns:
+            Para cada entrada, o machine_id registrado depois dela (None se não ativada)
+        """
+        return [self.activate(license_hash, machine_id)[1] if action == 'activate' else self.lookup(license_hash)
+                for license_hash, machine_id, action in entries]
+
+    def count(self) -> int:
+        """Número de licenças ativadas"""
+        raise NotImplementedError
+
+    def page(self, after: Optional[str], limit: int) -> List[Tuple[str, str, str]]:
+        """
+        Ativações (hash, machine_id, data) em ordem de hash, depois do cursor after
+
+        Passe o último hash de uma página como after para ler a seguinte.
+        """
+        raise NotImplementedError
+
+    def activations_per_day(self, days: int) -> Dict[str, int]:
+        """Ativações dos últimos days dias com alguma ativação (dia -> quantidade)"""
+        raise NotImplementedError
+
+    def add_requests(self, counts: Dict[Tuple[int, str], int]):
+        """Soma requisições aos contadores por minuto ({(minuto, ação): quantidade}, minuto em epoch // 60)"""
+        raise NotImplementedError
+
+    def requests_since(self, minute: int) -> List[Tuple[int, str, int]]:
+        """Contadores (minuto, ação, quantidade) a partir de minute"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Apaga todas as ativações"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonLicenseRegistry(LicenseRegistry):
+    """
+    Registro no arquivo JSON das versões anteriores (relido e regravado a cada acesso)
+
+    Seguro apenas com um processo: o lock não protege workers diferentes do gunicorn.
+    """
+
+    def __init__(self, path: str = REGISTRY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        # Requisições por minuto só em memória: o backend JSON já é de um único processo
+        self._requests: Dict[Tuple[int, str], int] = {}
+
+    def load(self) -> Dict[str, str]:
+        return load_json_registry(self.path)
+
+    def save(self, registry: Dict[str, str]):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f, indent=2)
+        self._writes += 1
+
+    def lookup(self, license_hash: str) -> Optional[str]:
+        return self.load().get(license_hash)
+
+    def generation(self) -> Hashable:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._writes, None
+        return self._writes, stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def activate(self, license_hash: str, machine_id: str) -> Tuple[bool, str]:
+        with self._lock:
+            registry = self.load()
+            registered = registry.get(license_hash)
+            if registered is not None:
+                return registered == machine_id, registered
+            registry[license_hash] = machine_id
+            registry[license_hash + DATE_SUFFIX] = datetime.now().strftime(DATE_FORMAT)
+            self.save(registry)
+            return True, machine_id
+
+    def validate_many(self, entries: Sequence[Tuple[str, str, str]]) -> List[Optional[str]]:
+        with self._lock:
+            registry = self.load()
+            now = datetime.now().strftime(DATE_FORMAT)
+            results = []
+            changed = False
+            for license_hash, machine_id, action in entries:
+                if action == 'activate' and license_hash not in registry:
+                    registry[license_hash] = machine_id
+                    registry[license_hash + DATE_SUFFIX] = now
+                    changed = True
+                results.append(registry.get(license_hash))
+            if changed:
+                self.save(registry)
+            return results
+
+    def count(self) -> int:
+        return sum(1 for key in self.load() if not key.endswith(DATE_SUFFIX))
+
+    def page(self, after: Optional[str], limit: int) -> List[Tuple[str, str, str]]:
+        registry = self.load()
+        hashes = sorted(key for key in registry if not key.endswith(DATE_SUFFIX) and (after is None or key > after))
+        return [(key, registry[key], registry.get(key + DATE_SUFFIX, '')) for key in hashes[:limit]]
+
+    def activations_per_day(self, days: int) -> Dict[str, int]:
+        per_day: Dict[str, int] = {}
+        for key, value in self.load().items():
+            if key.endswith(DATE_SUFFIX):
+                per_day[value[:10]] = per_day.get(value[:10], 0) + 1
+        return dict(sorted(per_day.items(), reverse=True)[:days])
+
+    def add_requests(self, counts: Dict[Tuple[int, str], int]):
+        with self._lock:
+            for key, count in counts.items():
+                self._requests[key] = self._requests.get(key, 0) + count
+            oldest = int(time.time() // 60) - RATE_WINDOW_MINUTES
+            for key in [key for key in self._requests if key[0] < oldest]:
+                del self._requests[key]
+
+    def requests_since(self, minute: int) -> List[Tuple[int, str, int]]:
+        with self._lock:
+            return [(stamp, action, count) for (stamp, action), count in self._requests.items() if stamp >= minute]
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._writes += 1
+
+
+class SqliteLicenseRegistry(LicenseRegistry):
+    """
+    Registro em SQLite no modo WAL, com a chave primária como índice de hash
+
+    Cada thread (e cada processo, depois de um fork) usa a sua própria conexão.
+    Leituras não esperam escritas; escritas de workers diferentes são serializadas
+    pelo SQLite.
+    """
+
+    def __init__(self, path: str = REGISTRY_DB, legacy_json: Optional[str] = REGISTRY_FILE):
+        self.path = path
+        self._local = threading.local()
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""CREATE TABLE IF NOT EXISTS activations (
+                license_hash TEXT PRIMARY KEY,
+                machine_id TEXT NOT NULL,
+                activated_at TEXT NOT NULL
+            ) WITHOUT ROWID""")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS request_minutes (
+                minute INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (minute, action)
+            ) WITHOUT ROWID""")
+            self._create_counters(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if legacy_json:
+            self.migrate_json(legacy_json)
+
+    @staticmethod
+    def _create_counters(conn: sqlite3.Connection):
+        """Tabelas de contadores e os triggers que as mantêm (preenchidas uma vez em bancos antigos)"""
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS daily_activations (day TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        conn.execute("""CREATE TRIGGER IF NOT EXISTS activations_insert AFTER INSERT ON activations BEGIN
+            UPDATE counters SET value = value + 1 WHERE name = 'activations';
+            INSERT OR IGNORE INTO daily_activations (day, count) VALUES (substr(NEW.activated_at, 1, 10), 0);
+            UPDATE daily_activations SET count = count + 1 WHERE day = substr(NEW.activated_at, 1, 10);
+        END""")
+        conn.execute("""CREATE TRIGGER IF NOT EXISTS activations_delete AFTER DELETE ON activations BEGIN
+            UPDATE counters SET value = value - 1 WHERE name = 'activations';
+            UPDATE daily_activations SET count = count - 1 WHERE day = substr(OLD.activated_at, 1, 10);
+            DELETE FROM daily_activations WHERE day = substr(OLD.activated_at, 1, 10) AND count <= 0;
+        END""")
+        # Geração: muda a cada ativação gravada ou apagada, vista igual por todas as conexões
+        conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('generation', 0)")
+        conn.execute("""CREATE TRIGGER IF NOT EXISTS activations_generation_insert AFTER INSERT ON activations BEGIN
+            UPDATE counters SET value = value + 1 WHERE name = 'generation';
+        END""")
+        conn.execute("""CREATE TRIGGER IF NOT EXISTS activations_generation_delete AFTER DELETE ON activations BEGIN
+            UPDATE counters SET value = value + 1 WHERE name = 'generation';
+        END""")
+        if not conn.execute("SELECT 1 FROM counters WHERE name = 'activations'").fetchone():
+            # Banco criado antes dos contadores: conta uma única vez
+            conn.execute("INSERT INTO counters (name, value) SELECT 'activations', COUNT(*) FROM activations")
+            conn.execute("DELETE FROM daily_activations")
+            conn.execute("INSERT INTO daily_activations (day, count) "
+                         "SELECT substr(activated_at, 1, 10), COUNT(*) FROM activations GROUP BY 1")
+
+    def connection(self) -> sqlite3.Connection:
+        """Conexão desta thread (reaberta se o processo foi criado por fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # No WAL, NORMAL só perde as últimas transações numa queda de energia, nunca corrompe
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def lookup(self, license_hash: str) -> Optional[str]:
+        row = self.connection().execute(
+            "SELECT machine_id FROM activations WHERE license_hash = ?", (license_hash,)).fetchone()
+        return row[0] if row else None
+
+    def generation(self) -> Hashable:
+        return self.connection().execute("SELECT value FROM counters WHERE name = 'generation'").fetchone()[0]
+
+    def activate(self, license_hash: str, machine_id: str) -> Tuple[bool, str]:
+        conn = self.connection()
+        # A chave primária decide a corrida: só o primeiro INSERT de cada hash grava
+        conn.execute(
+            "INSERT OR IGNORE INTO activations (license_hash, machine_id, activated_at) VALUES (?, ?, ?)",
+            (license_hash, machine_id, datetime.now().strftime(DATE_FORMAT)))
+        registered = self.lookup(license_hash)
+        return registered == machine_id, registered
+
+    def validate_many(self, entries: Sequence[Tuple[str, str, str]]) -> List[Optional[str]]:
+        conn = self.connection()
+        now = datetime.now().strftime(DATE_FORMAT)
+        # Lotes com ativações reservam a escrita logo no início, para não falhar no meio
+        conn.execute("BEGIN IMMEDIATE" if any(entry[2] == 'activate' for entry in entries) else "BEGIN")
+        try:
+            results = []
+            for license_hash, machine_id, action in entries:
+                if action == 'activate':
+                    conn.execute("INSERT OR IGNORE INTO activations (license_hash, machine_id, activated_at) "
+                                 "VALUES (?, ?, ?)", (license_hash, machine_id, now))
+                results.append(self.lookup(license_hash))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def count(self) -> int:
+        return self.connection().execute("SELECT value FROM counters WHERE name = 'activations'").fetchone()[0]
+
+    def page(self, after: Optional[str], limit: int) -> List[Tuple[str, str, str]]:
+        # Paginação pela chave primária: cada página custa o mesmo, qualquer que seja a posição
+        return self.connection().execute(
+            "SELECT license_hash, machine_id, activated_at FROM activations WHERE license_hash > ? "
+            "ORDER BY license_hash LIMIT ?", (after or '', limit)).fetchall()
+
+    def activations_per_day(self, days: int) -> Dict[str, int]:
+        rows = self.connection().execute(
+            "SELECT day, count FROM daily_activations ORDER BY day DESC LIMIT ?", (days,))
+        return dict(rows)
+
+    def add_requests(self, counts: Dict[Tuple[int, str], int]):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO request_minutes (minute, action, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (minute, action) DO UPDATE SET count = count + excluded.count",
+                [(minute, action, count) for (minute, action), count in counts.items()])
+            conn.execute("DELETE FROM request_minutes WHERE minute < ?",
+                         (int(time.time() // 60) - RATE_WINDOW_MINUTES,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def requests_since(self, minute: int) -> List[Tuple[int, str, int]]:
+        return self.connection().execute(
+            "SELECT minute, action, count FROM request_minutes WHERE minute >= ?", (minute,)).fetchall()
+
+    def clear(self):
+        self.connection().execute("DELETE FROM activations")
+
+    def insert_many(self, activations: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Importa ativações (hash, machine_id, data) em uma única transação
+
+        Hashes já registrados mantêm a ativação existente.
+
+        Returns:
+            Número de ativações novas
+        """
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO activations (license_hash, machine_id, activated_at) "
+                             "VALUES (?, ?, ?)", activations)
+            inserted = conn.total_changes - before
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return inserted
+
+    def migrate_json(self, json_path: str) -> int:
+        """
+        Importa o registro JSON das versões anteriores (uma única vez por banco)
+
+        O arquivo JSON não é apagado e continua servindo de backup. Com vários workers
+        abrindo o banco ao mesmo tempo, só o primeiro faz a importação.
+
+        Returns:
+            Número de ativações importadas
+        """
+        if not os.path.exists(json_path):
+            return 0
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                conn.execute("COMMIT")
+                return 0
+            registry = load_json_registry(json_path)
+            now = datetime.now().strftime(DATE_FORMAT)
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO activations (license_hash, machine_id, activated_at) VALUES (?, ?, ?)",
+                ((key, machine_id, registry.get(key + DATE_SUFFIX) or now)
+                 for key, machine_id in registry.items() if not key.endswith(DATE_SUFFIX)))
+            imported = conn.total_changes - before
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)",
+                         (f"{os.path.abspath(json_path)} em {now} ({imported} ativações)",))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if imported:
+            print(f"📦 {imported} ativações importadas de {json_path} para {self.path}")
+        return imported
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RequestRates:
+    """
+    Consultas e ativações por minuto nos últimos window minutos, guardadas no registro
+
+    As requisições de um worker são acumuladas em memória e somadas aos contadores do
+    registro no máximo a cada flush_interval segundos (uma transação, não uma por
+    requisição). O snapshot lê os contadores do registro, então todos os workers
+    mostram os mesmos números; as requisições de outro worker aparecem com até
+    flush_interval segundos de atraso.
+    """
+
+    def __init__(self, registry: LicenseRegistry, window: int = RATE_WINDOW_MINUTES,
+                 flush_interval: float = RATE_FLUSH_SECONDS):
+        self.registry = registry
+        self.window = window
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[int, str], int] = {}
+        self._next_flush = time.monotonic() + flush_interval
+        self._lock = threading.Lock()
+
+    def add(self, action: str, count: int = 1):
+        key = (int(time.time() // 60), action)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + count
+            due = time.monotonic() >= self._next_flush
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Soma as requisições acumuladas aos contadores do registro"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._next_flush = time.monotonic() + self.flush_interval
+        if not pending:
+            return
+        try:
+            self.registry.add_requests(pending)
+        except sqlite3.Error as e:
+            # Estatística não derruba a validação: tenta de novo na próxima gravação
+            print(f"Erro ao gravar as requisições por minuto: {e}")
+            with self._lock:
+                for key, count in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + count
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Totais do minuto anterior (completo), do minuto atual e da janela inteira (todos os workers)"""
+        self.flush()
+        minute = int(time.time() // 60)
+        result = {'last_minute': dict.fromkeys(ACTIONS, 0), 'current_minute': dict.fromkeys(ACTIONS, 0),
+                  f'last_{self.window}_minutes': dict.fromkeys(ACTIONS, 0)}
+        for stamp, action, count in self.registry.requests_since(minute - self.window + 1):
+            if action not in ACTIONS or stamp > minute:
+                continue
+            targets = [f'last_{self.window}_minutes']
+            if stamp == minute:
+                targets.append('current_minute')
+            elif stamp == minute - 1:
+                targets.append('last_minute')
+            for target in targets:
+                result[target][action] += count
+        return result
+
+
+class LRUCache:
+    """Dicionário limitado que descarta o item usado há mais tempo, com contadores de acertos"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Tamanho, acertos, falhas e taxa de acerto"""
+        lookups = self.hits + self.misses
+        return {'size': len(self._entries), 'max_size': self.max_entries, 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+# Marca de "licença não ativada" no cache (None significa "não está no cache")
+_NOT_ACTIVATED = ''
+
+
+class CachedLicenseRegistry(LicenseRegistry):
+    """
+    Cache das consultas do registro na memória do worker
+
+    A geração do backend é conferida no máximo a cada check_interval segundos e logo
+    após cada gravação deste worker; se outro processo gravou desde a última conferência,
+    o cache é descartado. Assim um acerto não consulta o backend, e uma gravação de outro
+    worker aparece nas consultas em até check_interval segundos (ativações vão sempre ao
+    backend, então continuam atômicas). Também conta as consultas e ativações por minuto
+    (rates), somadas aos contadores do backend.
+    """
+
+    def __init__(self, backend: LicenseRegistry, max_entries: int = REGISTRY_CACHE_SIZE,
+                 check_interval: float = GENERATION_CHECK_SECONDS):
+        self.backend = backend
+        self.cache = LRUCache(max_entries)
+        self.invalidations = 0
+        self.rates = RequestRates(backend)
+        self.check_interval = check_interval
+        self._generation = None
+        self._next_check = 0.0
+
+    def _validate(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        generation = self.backend.generation()
+        if generation != self._generation:
+            if self._generation is not None:
+                self.invalidations += 1
+            self.cache.clear()
+            self._generation = generation
+
+    def lookup(self, license_hash: str) -> Optional[str]:
+        self.rates.add('check')
+        self._validate()
+        machine_id = self.cache.get(license_hash)
+        if machine_id is None:
+            machine_id = self.backend.lookup(license_hash) or _NOT_ACTIVATED
+            self.cache.put(license_hash, machine_id)
+        return machine_id or None
+
+    def generation(self) -> Hashable:
+        return self.backend.generation()
+
+    def activate(self, license_hash: str, machine_id: str) -> Tuple[bool, str]:
+        self.rates.add('activate')
+        result = self.backend.activate(license_hash, machine_id)
+        # A própria gravação muda a geração; o resultado entra no cache já renovado
+        self._validate(force=True)
+        self.cache.put(license_hash, result[1])
+        return result
+
+    def validate_many(self, entries: Sequence[Tuple[str, str, str]]) -> List[Optional[str]]:
+        if all(action != 'activate' for _, _, action in entries):
+            return [self.lookup(license_hash) for license_hash, _, _ in entries]
+        activations = sum(1 for _, _, action in entries if action == 'activate')
+        self.rates.add('activate', activations)
+        self.rates.add('check', len(entries) - activations)
+        results = self.backend.validate_many(entries)
+        self._validate(force=True)
+        for (license_hash, _, _), machine_id in zip(entries, results):
+            self.cache.put(license_hash, machine_id or _NOT_ACTIVATED)
+        return results
+
+    def count(self) -> int:
+        return self.backend.count()
+
+    def page(self, after: Optional[str], limit: int) -> List[Tuple[str, str, str]]:
+        return self.backend.page(after, limit)
+
+    def activations_per_day(self, days: int) -> Dict[str, int]:
+        return self.backend.activations_per_day(days)
+
+    def add_requests(self, counts: Dict[Tuple[int, str], int]):
+        self.backend.add_requests(counts)
+
+    def requests_since(self, minute: int) -> List[Tuple[int, str, int]]:
+        return self.backend.requests_since(minute)
+
+    def clear(self):
+        self.backend.clear()
+        self._validate(force=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores do cache, incluindo quantas vezes foi descartado"""
+        return {**self.cache.snapshot(), 'invalidations': self.invalidations}
+
+    def close(self):
+        self.rates.flush()
+        self.backend.close()
+
+
+def load_json_registry(path: str) -> Dict[str, str]:
+    """Lê um registro no formato JSON ({} se não existir ou estiver corrompido)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def open_registry(backend: Optional[str] = None, path: Optional[str] = None) -> LicenseRegistry:
+    """
+    Abre o registro configurado
+
+    Args:
+        backend: 'sqlite' ou 'json' (padrão: LICENSE_REGISTRY_BACKEND ou sqlite)
+        path: Arquivo do registro (padrão: LICENSE_REGISTRY_PATH ou o nome padrão do backend)
+    """
+    backend = (backend or os.environ.get('LICENSE_REGISTRY_BACKEND') or DEFAULT_BACKEND).lower()
+    path = path or os.environ.get('LICENSE_REGISTRY_PATH')
+    if backend == 'json':
+        return JsonLicenseRegistry(path or REGISTRY_FILE)
+    if backend == 'sqlite':
+        return SqliteLicenseRegistry(path or REGISTRY_DB)
+    raise ValueError(f"Backend de registro desconhecido: {backend} (use 'sqlite' ou 'json')")
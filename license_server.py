@@ -8,36 +8,34 @@ from flask import Flask, request, jsonify
 import json
 import hashlib
 import hmac
-from datetime import datetime
 import os
 
+from license_registry import ACTIONS, CachedLicenseRegistry, LRUCache, open_registry
+
 app = Flask(__name__)
 
 # Chave secreta (DEVE SER A MESMA do license.py!)
 LICENSE_SECRET_KEY = b"dreadmyst_bot_secret_key_2024_secure_v1"
 
-# Arquivo para armazenar registros de ativação
-REGISTRY_FILE = "license_registry.json"
+# Chaves de licença cujo hash original fica memorizado em cada worker
+HASH_CACHE_SIZE = 10_000
+# Máximo de validações em uma requisição ao /validate/batch
+MAX_BATCH_SIZE = 10_000
+# Dias de ativações mostrados no /stats
+STATS_DAYS = 30
+# Tamanho padrão e máximo de uma página do /licenses
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Token exigido pelo /licenses no cabeçalho X-Admin-Token (sem a variável, o endpoint fica desativado)
+LICENSE_ADMIN_TOKEN = os.environ.get('LICENSE_ADMIN_TOKEN') or None
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
 
-def load_registry():
-    """Carrega o registro de licenças ativadas"""
-    if not os.path.exists(REGISTRY_FILE):
-        return {}
-    try:
-        with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
-        return {}
+ALREADY_ACTIVATED_MESSAGE = 'Esta licença já foi ativada em outra máquina. Cada licença só pode ser usada uma vez.'
 
-def save_registry(registry):
-    """Salva o registro de licenças ativadas"""
-    try:
-        with open(REGISTRY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(registry, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Erro ao salvar registro: {e}")
-        return False
+# Registro de ativações (SQLite por padrão; ver license_registry.py), com cache por worker
+registry = CachedLicenseRegistry(open_registry())
+# Chave de licença -> hash da chave original
+hash_cache = LRUCache(HASH_CACHE_SIZE)
 
 def get_original_license_hash(license_key: str) -> str:
     """Gera hash da chave original (antes da ativação)"""
@@ -71,6 +69,26 @@ def get_original_license_hash(license_key: str) -> str:
     except:
         return hashlib.sha256(license_key.encode('utf-8')).hexdigest()
 
+def original_license_hash(license_key: str) -> str:
+    """get_original_license_hash memorizado (os clientes revalidam sempre a mesma chave)"""
+    original_hash = hash_cache.get(license_key)
+    if original_hash is None:
+        original_hash = get_original_license_hash(license_key)
+        hash_cache.put(license_key, original_hash)
+    return original_hash
+
+def validation_result(action: str, machine_id: str, registered_machine_id) -> dict:
+    """Resposta do /validate para a máquina, dado quem está registrado após a ação"""
+    if action == 'activate':
+        if registered_machine_id != machine_id:
+            return {'valid': False, 'message': ALREADY_ACTIVATED_MESSAGE, 'already_activated': True}
+        return {'valid': True, 'message': 'Licença ativada com sucesso', 'activated': True}
+    if registered_machine_id is None:
+        return {'valid': True, 'message': 'Licença disponível para ativação', 'already_activated': False}
+    if registered_machine_id != machine_id:
+        return {'valid': False, 'message': ALREADY_ACTIVATED_MESSAGE, 'already_activated': True}
+    return {'valid': True, 'message': 'Licença válida para esta máquina', 'already_activated': True}
+
 @app.route('/validate', methods=['POST'])
 def validate_license():
     """
@@ -96,60 +114,23 @@ def validate_license():
             }), 400
         
         # Obtém hash da chave original
-        original_hash = get_original_license_hash(license_key)
-        
-        # Carrega registro
-        registry = load_registry()
+        original_hash = original_license_hash(license_key)
         
         if action == 'check':
             # Apenas verifica se já foi ativada
-            if original_hash in registry:
-                registered_machine_id = registry[original_hash]
-                if registered_machine_id != machine_id:
-                    return jsonify({
-                        'valid': False,
-                        'message': 'Esta licença já foi ativada em outra máquina. Cada licença só pode ser usada uma vez.',
-                        'already_activated': True
-                    }), 200
-                else:
-                    return jsonify({
-                        'valid': True,
-                        'message': 'Licença válida para esta máquina',
-                        'already_activated': True
-                    }), 200
-            else:
-                return jsonify({
-                    'valid': True,
-                    'message': 'Licença disponível para ativação',
-                    'already_activated': False
-                }), 200
+            return jsonify(validation_result(action, machine_id, registry.lookup(original_hash))), 200
         
         elif action == 'activate':
-            # Tenta ativar a licença
-            if original_hash in registry:
-                registered_machine_id = registry[original_hash]
-                if registered_machine_id != machine_id:
-                    return jsonify({
-                        'valid': False,
-                        'message': 'Esta licença já foi ativada em outra máquina. Cada licença só pode ser usada uma vez.',
-                        'already_activated': True
-                    }), 200
-            
-            # Registra a ativação
-            registry[original_hash] = machine_id
-            registry[f"{original_hash}_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            if save_registry(registry):
-                return jsonify({
-                    'valid': True,
-                    'message': 'Licença ativada com sucesso',
-                    'activated': True
-                }), 200
-            else:
+            # Verifica e registra a ativação em uma única operação atômica
+            try:
+                _, registered_machine_id = registry.activate(original_hash, machine_id)
+            except Exception as e:
+                print(f"Erro ao registrar ativação: {e}")
                 return jsonify({
                     'valid': False,
                     'message': 'Erro ao registrar ativação'
                 }), 500
+            return jsonify(validation_result(action, machine_id, registered_machine_id)), 200
         
         else:
             return jsonify({
@@ -163,6 +144,73 @@ def validate_license():
             'message': f'Erro no servidor: {str(e)}'
         }), 500
 
+@app.route('/validate/batch', methods=['POST'])
+def validate_batch():
+    """
+    Valida (ou ativa) várias licenças em uma requisição, numa única transação do registro
+    
+    As entradas são aplicadas na ordem; entradas incompletas ou com ação inválida
+    recebem um erro próprio sem afetar as demais.
+    
+    Body JSON:
+    {
+        "requests": [
+            {"license_key": "...", "machine_id": "...", "action": "check" ou "activate"},
+            ...
+        ]
+    }
+    
+    Resposta: {"results": [...]}, um resultado por entrada, no formato do /validate
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        entries = data.get('requests')
+        if not isinstance(entries, list):
+            return jsonify({
+                'valid': False,
+                'message': 'Dados incompletos'
+            }), 400
+        if len(entries) > MAX_BATCH_SIZE:
+            return jsonify({
+                'valid': False,
+                'message': f'Lote muito grande (máximo de {MAX_BATCH_SIZE} validações por requisição)'
+            }), 413
+        
+        results = [None] * len(entries)
+        pending = []
+        positions = []
+        for position, entry in enumerate(entries):
+            entry = entry if isinstance(entry, dict) else {}
+            license_key = entry.get('license_key')
+            machine_id = entry.get('machine_id')
+            action = entry.get('action', 'check')
+            if not license_key or not machine_id:
+                results[position] = {'valid': False, 'message': 'Dados incompletos'}
+            elif action not in ACTIONS:
+                results[position] = {'valid': False, 'message': 'Ação inválida'}
+            else:
+                pending.append((original_license_hash(license_key), machine_id, action))
+                positions.append(position)
+        
+        try:
+            registered = registry.validate_many(pending) if pending else []
+        except Exception as e:
+            print(f"Erro ao registrar ativações do lote: {e}")
+            return jsonify({
+                'valid': False,
+                'message': 'Erro ao registrar ativação'
+            }), 500
+        
+        for position, (_, machine_id, action), registered_machine_id in zip(positions, pending, registered):
+            results[position] = validation_result(action, machine_id, registered_machine_id)
+        return jsonify({'results': results}), 200
+    
+    except Exception as e:
+        return jsonify({
+            'valid': False,
+            'message': f'Erro no servidor: {str(e)}'
+        }), 500
+
 @app.route('/health', methods=['GET'])
 def health():
     """Endpoint de health check"""
@@ -175,8 +223,7 @@ def clear_registry():
     ⚠️ REMOVA este endpoint em produção ou adicione autenticação!
     """
     try:
-        if os.path.exists(REGISTRY_FILE):
-            os.remove(REGISTRY_FILE)
+        registry.clear()
         return jsonify({
             'status': 'ok',
             'message': 'Registro limpo com sucesso'
@@ -189,14 +236,70 @@ def clear_registry():
 
 @app.route('/stats', methods=['GET'])
 def stats():
-    """Retorna estatísticas do registro"""
+    """
+    Retorna estatísticas do registro
+    
+    Total, ativações por dia e requisições por minuto vêm dos contadores do registro
+    (valem para todos os workers); os caches são do worker que respondeu.
+    Nada é calculado percorrendo o registro.
+    """
+    try:
+        return jsonify({
+            'total_licenses': registry.count(),
+            'licenses': [license_hash for license_hash, _, _ in registry.page(None, 10)],  # Primeiras 10
+            'activations_per_day': registry.activations_per_day(STATS_DAYS),
+            'worker_pid': os.getpid(),
+            'requests': registry.rates.snapshot(),
+            'cache': {
+                'registry': registry.snapshot(),
+                'license_hash': hash_cache.snapshot()
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/licenses', methods=['GET'])
+def list_licenses():
+    """
+    Lista as ativações em páginas, em ordem de hash
+    
+    Query string: limit (padrão 100, máximo 1000) e after (o next_cursor da página
+    anterior). Cada página custa o mesmo, qualquer que seja a posição no registro.
+    Expõe os machine_ids, então só responde com LICENSE_ADMIN_TOKEN definido e o
+    mesmo token no cabeçalho X-Admin-Token.
+    """
+    if LICENSE_ADMIN_TOKEN is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Endpoint desativado (defina LICENSE_ADMIN_TOKEN)'
+        }), 404
+    token = request.headers.get(ADMIN_TOKEN_HEADER, '')
+    if not hmac.compare_digest(token.encode('utf-8'), LICENSE_ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({
+            'status': 'error',
+            'message': 'Token de administração inválido'
+        }), 403
     try:
-        registry = load_registry()
-        # Conta apenas hashes (não as datas)
-        licenses = [k for k in registry.keys() if not k.endswith('_date')]
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            limit = None
+        if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({
+                'status': 'error',
+                'message': f'limit deve ser um número inteiro entre 1 e {MAX_PAGE_SIZE}'
+            }), 400
+        rows = registry.page(request.args.get('after') or None, limit)
         return jsonify({
-            'total_licenses': len(licenses),
-            'licenses': licenses[:10]  # Primeiras 10
+            'licenses': [
+                {'license_hash': license_hash, 'machine_id': machine_id, 'activated_at': activated_at}
+                for license_hash, machine_id, activated_at in rows
+            ],
+            # None quando não há mais páginas
+            'next_cursor': rows[-1][0] if len(rows) == limit else None
         }), 200
     except Exception as e:
         return jsonify({
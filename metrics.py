@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Métricas de Desempenho do Bot DreadmystDB
+Mede a duração de cada fase da verificação (conexão, TTFB, corpo, parse, filtros,
+alertas) e guarda as últimas amostras de cada uma em histogramas móveis (p50/p95/p99).
+As métricas podem ser lidas por snapshot(), gravadas periodicamente em um arquivo JSONL
+e servidas em /metrics no formato texto do Prometheus.
+"""
+
+import contextvars
+import json
+import socket
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# Amostras mantidas por fase (os percentis valem para essa janela)
+DEFAULT_WINDOW = 1024
+# Segundos entre duas gravações no arquivo de métricas
+DEFAULT_DUMP_INTERVAL = 60
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Fases, na ordem em que aparecem nos resumos
+PHASES = ('dns', 'connect', 'ttfb', 'body', 'fetch', 'parse', 'match', 'alert', 'poll')
+
+# Métricas do monitor que está fazendo a requisição na thread/tarefa atual
+_active_metrics: contextvars.ContextVar = contextvars.ContextVar('dreadbot_metrics', default=None)
+
+# Outras métricas do processo (ex.: filas de alertas): nome -> (snapshot, linhas do Prometheus)
+_COLLECTORS: Dict[str, Tuple[Callable[[], Dict], Callable[[Dict], List[str]]]] = {}
+
+
+def register_collector(name: str, snapshot: Callable[[], Dict], prometheus: Callable[[Dict], List[str]]):
+    """
+    Inclui métricas de outro módulo nas gravações do metrics_file e no /metrics
+
+    Args:
+        name: Chave do snapshot na linha JSONL
+        snapshot: Função que devolve o estado atual (dicionário serializável em JSON)
+        prometheus: Função que converte o snapshot em linhas do formato texto do Prometheus
+    """
+    _COLLECTORS[name] = (snapshot, prometheus)
+
+
+def collector_snapshots() -> Dict[str, Dict]:
+    """Snapshot de cada coletor registrado (os vazios são omitidos)"""
+    snapshots = {name: snapshot() for name, (snapshot, _) in _COLLECTORS.items()}
+    return {name: values for name, values in snapshots.items() if values}
+
+
+class RollingHistogram:
+    """Últimas window amostras de uma fase, mais contagem e soma desde o início"""
+
+    __slots__ = ('window', '_samples', '_next', 'count', 'total', 'max')
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._samples = array('d')
+        self._next = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        if len(self._samples) < self.window:
+            self._samples.append(seconds)
+        else:
+            self._samples[self._next] = seconds
+            self._next = (self._next + 1) % self.window
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentiles(self, quantiles: Iterable[float] = QUANTILES) -> Dict[float, float]:
+        """Percentis da janela (vizinho mais próximo)"""
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {q: 0.0 for q in quantiles}
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(q * len(ordered)))] for q in quantiles}
+
+    def snapshot(self) -> Dict[str, float]:
+        p50, p95, p99 = (self.percentiles()[q] for q in QUANTILES)
+        return {'count': self.count, 'sum': self.total, 'p50': p50, 'p95': p95, 'p99': p99,
+                'max': self.max}
+
+
+class PhaseMetrics:
+    """Histogramas móveis das fases de um monitor (seguro para as threads do crawl)"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, dump_file: Optional[str] = None,
+                 dump_interval: float = DEFAULT_DUMP_INTERVAL):
+        self.window = window
+        self.dump_file = dump_file
+        self.dump_interval = dump_interval
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+        self._next_dump = time.monotonic() + dump_interval
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'PhaseMetrics':
+        """Cria as métricas a partir do config do monitor"""
+        return cls(
+            window=int(config.get('metrics_window') or DEFAULT_WINDOW),
+            dump_file=config.get('metrics_file'),
+            dump_interval=float(config.get('metrics_interval') or DEFAULT_DUMP_INTERVAL)
+        )
+
+    def record(self, phase: str, seconds: float):
+        """Registra a duração de uma fase"""
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = RollingHistogram(self.window)
+            histogram.add(seconds)
+
+    @contextmanager
+    def span(self, phase: str):
+        """Mede o bloco como uma amostra da fase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    @contextmanager
+    def active(self):
+        """Atribui a este monitor as conexões abertas dentro do bloco (ver TimedHTTPAdapter)"""
+        token = _active_metrics.set(self)
+        try:
+            yield
+        finally:
+            _active_metrics.reset(token)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Contagem, soma, p50/p95/p99 e máximo (em segundos) de cada fase medida"""
+        with self._lock:
+            phases = sorted(self.histograms, key=lambda p: (PHASES.index(p) if p in PHASES else len(PHASES), p))
+            return {phase: self.histograms[phase].snapshot() for phase in phases}
+
+    def summary(self) -> str:
+        """Resumo de uma linha: p50/p95 de cada fase em milissegundos"""
+        return ", ".join(f"{phase} {stats['p50'] * 1000:.0f}/{stats['p95'] * 1000:.0f} ms"
+                         for phase, stats in self.snapshot().items())
+
+    def dump(self, path: Optional[str] = None):
+        """Acrescenta o snapshot atual como uma linha JSON ao arquivo de métricas"""
+        path = path or self.dump_file
+        if not path:
+            return
+        line = json.dumps({'time': time.time(), 'phases': self.snapshot(), **collector_snapshots()})
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+    def maybe_dump(self, force: bool = False):
+        """Grava o snapshot se o intervalo de gravação venceu (erros não interrompem o monitor)"""
+        if not self.dump_file or (not force and time.monotonic() < self._next_dump):
+            return
+        self._next_dump = time.monotonic() + self.dump_interval
+        try:
+            self.dump()
+        except OSError as e:
+            print(f"Erro ao gravar métricas: {e}", file=sys.stderr)
+
+
+def record_active(phase: str, seconds: float):
+    """Registra a fase nas métricas ativas na thread/tarefa atual (se houver)"""
+    metrics = _active_metrics.get()
+    if metrics is not None:
+        metrics.record(phase, seconds)
+
+
+class _TimedConnectionMixin:
+    """
+    Mede a abertura de conexões do urllib3: resolução do nome ('dns') e conexão ('connect')
+
+    _new_conn faz o mesmo que o do urllib3 (tenta cada endereço resolvido, na ordem,
+    e converte os erros nas mesmas exceções), mas com a resolução separada e medida.
+    'connect' inclui a resolução, o TCP e o TLS, como antes.
+    """
+
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host.strip('[]')
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            record_active('dns', time.perf_counter() - start)
+        error = None
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            try:
+                for option in self.socket_options or ():
+                    sock.setsockopt(*option)
+                if self.timeout is not None:
+                    sock.settimeout(self.timeout)
+                if self.source_address:
+                    sock.bind(self.source_address)
+                sock.connect(address)
+            except socket.timeout as e:
+                sock.close()
+                error = ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+                error.__cause__ = e
+            except OSError as e:
+                sock.close()
+                error = NewConnectionError(self, f"Failed to establish a new connection: {e}")
+                error.__cause__ = e
+            else:
+                sys.audit("http.client.connect", self, self.host, self.port)
+                return sock
+        raise error or NewConnectionError(self, "Failed to establish a new connection: getaddrinfo returns an empty list")
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_active('connect', time.perf_counter() - start)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter do requests cujas conexões novas entram nas fases 'dns' e 'connect'"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+def _label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(sources: Dict[str, PhaseMetrics]) -> str:
+    """
+    Métricas no formato texto do Prometheus (tipo summary)
+
+    Os quantis valem para a janela móvel; _sum e _count são acumulados desde o início.
+
+    Args:
+        sources: Nome do perfil -> métricas
+    """
+    lines = [
+        "# HELP dreadbot_phase_seconds Duração das fases da verificação (quantis da janela móvel)",
+        "# TYPE dreadbot_phase_seconds summary"
+    ]
+    for profile, metrics in sources.items():
+        for phase, stats in metrics.snapshot().items():
+            labels = f'profile="{_label(profile)}",phase="{_label(phase)}"'
+            for quantile, key in zip(QUANTILES, ('p50', 'p95', 'p99')):
+                lines.append(f'dreadbot_phase_seconds{{{labels},quantile="{quantile}"}} {stats[key]:.6f}')
+            lines.append(f'dreadbot_phase_seconds_sum{{{labels}}} {stats["sum"]:.6f}')
+            lines.append(f'dreadbot_phase_seconds_count{{{labels}}} {stats["count"]}')
+    for name, values in collector_snapshots().items():
+        lines.extend(_COLLECTORS[name][1](values))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Servidor HTTP local com /metrics (Prometheus) e /metrics.json, em uma thread daemon"""
+
+    def __init__(self, sources: Dict[str, PhaseMetrics], port: int, host: str = '127.0.0.1'):
+        self.sources = sources
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = prometheus_text(server.sources).encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    snapshot = {profile: metrics.snapshot() for profile, metrics in server.sources.items()}
+                    snapshot.update(collector_snapshots())
+                    body = json.dumps(snapshot).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self) -> 'MetricsServer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def serve_metrics(monitors) -> Optional[MetricsServer]:
+    """
+    Inicia o /metrics na porta metrics_port do primeiro perfil que a configurar
+
+    Todos os perfis são servidos, identificados pelo arquivo de configuração.
+    """
+    port = next((monitor.config.get('metrics_port') for monitor in monitors
+                 if monitor.config.get('metrics_port')), None)
+    if not port:
+        return None
+    try:
+        server = MetricsServer({monitor.config_file: monitor.metrics for monitor in monitors}, int(port)).start()
+    except OSError as e:
+        print(f"Erro ao iniciar o servidor de métricas na porta {port}: {e}", file=sys.stderr)
+        return None
+    print(f"📈 Métricas em http://127.0.0.1:{server.port}/metrics")
+    return server
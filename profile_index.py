@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Índice Invertido de Perfis do Bot DreadmystDB
+Com milhares de buscas salvas, nem a avaliação em lote escala: a maioria dos perfis
+não tem chance de aceitar um dado anúncio. O índice publica cada perfil sob as chaves
+compostas (slot, stat, qualidade de affix) que um item precisa ter para passar nos
+seus filtros; cada anúncio novo só é verificado contra os perfis publicados
+sob as suas chaves. Perfis entram e saem em tempo de execução, sem reconstruir nada.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from batch_match import HAS_NUMPY, BATCH_MIN_PROFILES, match_profiles
+from bot import TradeMonitor, Item, CompiledFilter
+
+# A partir desse número de itens (ex.: crawl de várias páginas), a avaliação em lote
+# com NumPy é mais rápida que consultar o índice item a item
+BATCH_MIN_ITEMS = 256
+
+# Preferência entre famílias de stats igualmente numerosas (as primeiras costumam ser mais seletivas)
+_STAT_KEY_PREFERENCE = {'value': 0, 'stat': 1}
+
+
+def _stat_options(compiled: CompiledFilter) -> Optional[tuple]:
+    """Menor família de stats da qual todo item aceito tem pelo menos um (None se não houver)"""
+    families = []
+    # Mínimo positivo em um stat conhecido: o item precisa ter o stat
+    for index, minimum in compiled.stat_minimums:
+        if index >= 0 and minimum > 0:
+            families.append((('value', index),))
+    if compiled.has_primary_stat_filter:
+        if compiled.primary_stats_mode == 'AND':
+            # Basta um dos stats primários, já que todos são obrigatórios
+            families.extend((('stat', term),) for term in compiled.primary_stats)
+        else:
+            families.append(tuple(('stat', term) for term in compiled.primary_stats))
+    if compiled.has_stat_filter and compiled.filter_mode != 'OR':
+        families.append(tuple(('stat', term) for term in compiled.stats))
+    if not families:
+        return None
+    return min(families, key=lambda family: (len(set(family)), _STAT_KEY_PREFERENCE[family[0][0]]))
+
+
+def profile_keys(compiled: CompiledFilter) -> Optional[Tuple[tuple, ...]]:
+    """
+    Chaves (slot, stat, qualidade de affix) sob as quais um perfil é publicado
+
+    Cada posição da chave é uma condição obrigatória do filtro, ou None se o perfil
+    não restringe aquela dimensão; todo item aceito pelo perfil tem pelo menos uma
+    das chaves. No modo OR com slots e stats (e sem stats primários), o perfil é
+    publicado sob os slots e, separadamente, sob os stats.
+
+    Returns:
+        Chaves do perfil, ou None se qualquer item pode passar (perfil sem índice)
+    """
+    if compiled.accept_all:
+        return None
+    affixes = tuple(compiled.affix_qualities) if compiled.has_affix_quality_filter else (None,)
+    stats = _stat_options(compiled)
+
+    if compiled.filter_mode != 'OR':
+        alternatives = [(tuple(compiled.slots) if compiled.has_slot_filter else (None,), stats or (None,))]
+    elif stats is None and compiled.has_slot_filter and compiled.has_stat_filter:
+        # Slot ou stat: as duas famílias de chaves levam ao perfil
+        alternatives = [(tuple(compiled.slots), (None,)),
+                        ((None,), tuple(('stat', term) for term in compiled.stats))]
+    else:
+        alternatives = [((None,), stats or (None,))]
+
+    keys = tuple(dict.fromkeys(
+        (slot, stat, affix)
+        for slots, stat_keys in alternatives
+        for slot in slots for stat in stat_keys for affix in affixes
+    ))
+    if keys == ((None, None, None),):
+        return None
+    return keys
+
+
+class ProfileIndex:
+    """
+    Índice invertido chave -> perfis, com inclusão e remoção em tempo de execução
+
+    Os perfis são os próprios monitores; o filtro compilado de cada um é relido a
+    cada consulta (get_compiled_filter) e o perfil é reindexado se o config mudou.
+    """
+
+    def __init__(self, monitors: Iterable[TradeMonitor] = ()):
+        self.postings: Dict[tuple, Set[TradeMonitor]] = {}
+        self.unindexed: Set[TradeMonitor] = set()
+        self.profiles: Dict[TradeMonitor, Tuple[CompiledFilter, Optional[tuple]]] = {}
+        # Ordem de inclusão, para devolver os perfis sempre na mesma ordem
+        self.order: Dict[TradeMonitor, int] = {}
+        self._next_order = 0
+        # Stats configurados (normalizados) -> número de perfis que os usam
+        self.terms: Dict[str, int] = {}
+        self._value_keys = 0
+        # Stat do item (texto do card) -> termos configurados que ele satisfaz
+        self._term_cache: Dict[str, tuple] = {}
+        self._slot_cache: Dict[str, str] = {}
+        self.stats = {'items': 0, 'candidates': 0, 'matches': 0}
+        for monitor in monitors:
+            self.add(monitor)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __contains__(self, monitor: TradeMonitor) -> bool:
+        return monitor in self.profiles
+
+    def add(self, monitor: TradeMonitor):
+        """Publica um perfil (ou reindexa, se já estiver no índice)"""
+        if monitor in self.profiles:
+            self._unpost(monitor)
+        else:
+            self.order[monitor] = self._next_order
+            self._next_order += 1
+        compiled = monitor.get_compiled_filter()
+        keys = profile_keys(compiled)
+        self.profiles[monitor] = (compiled, keys)
+        if keys is None:
+            self.unindexed.add(monitor)
+            return
+        for key in keys:
+            self.postings.setdefault(key, set()).add(monitor)
+            stat = key[1]
+            if stat is None:
+                continue
+            if stat[0] == 'stat':
+                if stat[1] not in self.terms:
+                    self._term_cache.clear()
+                self.terms[stat[1]] = self.terms.get(stat[1], 0) + 1
+            else:
+                self._value_keys += 1
+
+    def remove(self, monitor: TradeMonitor):
+        """Remove um perfil do índice"""
+        if monitor not in self.profiles:
+            return
+        self._unpost(monitor)
+        del self.profiles[monitor]
+        del self.order[monitor]
+
+    def _unpost(self, monitor: TradeMonitor):
+        _, keys = self.profiles[monitor]
+        if keys is None:
+            self.unindexed.discard(monitor)
+            return
+        for key in keys:
+            posting = self.postings.get(key)
+            if posting is not None:
+                posting.discard(monitor)
+                if not posting:
+                    del self.postings[key]
+            stat = key[1]
+            if stat is None:
+                continue
+            if stat[0] == 'stat':
+                self.terms[stat[1]] -= 1
+                if not self.terms[stat[1]]:
+                    del self.terms[stat[1]]
+                    self._term_cache.clear()
+            else:
+                self._value_keys -= 1
+
+    def refresh(self):
+        """Reindexa os perfis cujo config de filtros mudou"""
+        for monitor, (compiled, _) in list(self.profiles.items()):
+            if monitor.get_compiled_filter() is not compiled:
+                self.add(monitor)
+
+    def item_terms(self, item_stat: str) -> tuple:
+        """Termos configurados satisfeitos por um stat do item (mesma regra de CompiledFilter)"""
+        terms = self._term_cache.get(item_stat)
+        if terms is None:
+            normalized = TradeMonitor.normalize_stat(item_stat).upper()
+            terms = tuple(term for term in self.terms
+                          if term == normalized or term in normalized or normalized in term)
+            self._term_cache[item_stat] = terms
+        return terms
+
+    def item_keys(self, item: Item) -> Iterable[tuple]:
+        """Chaves (slot, stat, qualidade de affix) que o item possui, com as posições curinga"""
+        slots = [None]
+        if item.slot:
+            slot = self._slot_cache.get(item.slot)
+            if slot is None:
+                slot = self._slot_cache[item.slot] = TradeMonitor.normalize_slot_name(item.slot)
+            slots.append(slot)
+        affixes = (None, item.affix_quality.lower()) if item.affix_quality else (None,)
+        stats = [None]
+        for item_stat in item.stats:
+            stats.extend(('stat', term) for term in self.item_terms(item_stat))
+        if self._value_keys:
+            stats.extend(('value', index) for index, value in enumerate(item.stat_tuple()) if value)
+        for slot in slots:
+            for stat in stats:
+                for affix in affixes:
+                    yield (slot, stat, affix)
+
+    def candidates(self, item: Item) -> Set[TradeMonitor]:
+        """Perfis que podem aceitar o item (superconjunto dos que aceitam)"""
+        candidates = set(self.unindexed)
+        postings = self.postings
+        for key in self.item_keys(item):
+            posting = postings.get(key)
+            if posting:
+                candidates |= posting
+        return candidates
+
+    def _matching(self, item: Item) -> List[TradeMonitor]:
+        candidates = self.candidates(item)
+        profiles = self.profiles
+        matched = [monitor for monitor in candidates if profiles[monitor][0].matches(item)]
+        self.stats['items'] += 1
+        self.stats['candidates'] += len(candidates)
+        self.stats['matches'] += len(matched)
+        return matched
+
+    def matches(self, item: Item) -> List[TradeMonitor]:
+        """Perfis que aceitam o item, na ordem em que foram incluídos"""
+        return sorted(self._matching(item), key=self.order.__getitem__)
+
+    def match_items(self, items: Iterable[Item]) -> Dict[TradeMonitor, Set[str]]:
+        """Para cada perfil do índice, os listing_ids dos itens que ele aceita"""
+        self.refresh()
+        matched = {monitor: set() for monitor in self.profiles}
+        for item in items:
+            for monitor in self._matching(item):
+                matched[monitor].add(item.listing_id)
+        return matched
+
+    def summary(self) -> str:
+        """Resumo do índice e da média de candidatos verificados por item"""
+        items = self.stats['items'] or 1
+        return (f"{len(self.profiles)} perfis, {len(self.postings)} chaves, "
+                f"{len(self.unindexed)} sem índice, "
+                f"{self.stats['candidates'] / items:.1f} candidatos/item, "
+                f"{self.stats['matches'] / items:.1f} correspondências/item")
+
+
+def match_group(index: ProfileIndex, monitors: Sequence[TradeMonitor],
+                items: Sequence[Item]) -> Optional[Tuple[List[Set[str]], Set[str]]]:
+    """
+    Avalia os filtros de um grupo de perfis para os itens da busca
+
+    Cada perfil só registra os anúncios que lhe geraram alerta, então todos os itens
+    são avaliados (process_items ignora os já alertados por cada perfil). Poucos itens
+    passam pelo índice; muitos (e NumPy instalado), pela avaliação em lote.
+
+    Returns:
+        (listing_ids aceitos por cada perfil, listing_ids avaliados), ou None se não
+        compensar (grupo pequeno, nenhum item ou algum perfil em debug)
+    """
+    if (len(monitors) < BATCH_MIN_PROFILES or not items
+            or any(monitor.config.get('debug', False) for monitor in monitors)):
+        return None
+    evaluated = {item.listing_id for item in items}
+    if HAS_NUMPY and len(items) >= BATCH_MIN_ITEMS:
+        return match_profiles(monitors, items), evaluated
+    matched = index.match_items(items)
+    return [matched.get(monitor, set()) for monitor in monitors], evaluated
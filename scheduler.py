@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Agendador de Verificações do Bot DreadmystDB
+Estima a taxa de chegada de anúncios novos (média móvel exponencial) e ajusta o intervalo
+entre verificações entre min_interval e max_interval: encurta nos picos e alonga nas horas
+paradas. Em erros de rede ou HTTP 429 recua exponencialmente, com jitter.
+"""
+
+import random
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+# Peso da última verificação na média móvel da taxa de chegada
+EWMA_ALPHA = 0.3
+# Anúncios novos que se quer encontrar, em média, a cada verificação
+TARGET_NEW_PER_POLL = 0.5
+# Limite do recuo em caso de erros consecutivos (segundos)
+DEFAULT_MAX_BACKOFF = 600
+# Maior expoente do recuo (2 ** 16 x o intervalo já passa de qualquer max_backoff razoável)
+MAX_BACKOFF_EXPONENT = 16
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Segundos pedidos pelo servidor no Retry-After de uma resposta de erro (requests ou aiohttp)"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Verifica se o erro é um HTTP 429 (requests ou aiohttp)"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    return status == 429
+
+
+class PollScheduler:
+    """
+    Decide quando fazer a próxima verificação
+
+    Com adaptive=False o intervalo é sempre check_interval (o comportamento original),
+    mas o recuo em caso de erro continua valendo.
+    """
+
+    def __init__(self, check_interval: float = 30, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, adaptive: bool = False,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        self.check_interval = check_interval
+        self.min_interval = min_interval if min_interval is not None else max(1.0, check_interval / 3)
+        self.max_interval = max_interval if max_interval is not None else check_interval * 4
+        self.adaptive = adaptive
+        self.max_backoff = max_backoff
+        # Anúncios novos por segundo (None até a segunda verificação bem-sucedida)
+        self.rate: Optional[float] = None
+        self.interval = float(check_interval)
+        self.errors = 0
+        self.next_poll_at: Optional[float] = None
+        self._last_poll: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'PollScheduler':
+        """Cria o agendador a partir do config do monitor"""
+        return cls(
+            check_interval=config.get('check_interval', 30),
+            min_interval=config.get('min_interval'),
+            max_interval=config.get('max_interval'),
+            adaptive=config.get('adaptive_interval', False),
+            max_backoff=config.get('max_backoff') or DEFAULT_MAX_BACKOFF
+        )
+
+    def record_poll(self, new_listings: int, error: Optional[Exception] = None,
+                    now: Optional[float] = None) -> float:
+        """
+        Registra o resultado de uma verificação e calcula a espera até a próxima
+
+        Args:
+            new_listings: Anúncios ainda não vistos encontrados na verificação
+            error: Exceção da busca, se ela falhou
+            now: Horário da verificação (time.monotonic)
+
+        Returns:
+            Segundos até a próxima verificação
+        """
+        now = time.monotonic() if now is None else now
+        if error is not None:
+            delay = self._backoff(error)
+        else:
+            self.errors = 0
+            if self.adaptive:
+                self._update_rate(new_listings, now)
+            delay = self.interval
+        self.next_poll_at = time.time() + delay
+        return delay
+
+    def _update_rate(self, new_listings: int, now: float):
+        """Atualiza a média móvel da taxa de chegada e o intervalo"""
+        previous, self._last_poll = self._last_poll, now
+        # A primeira verificação encontra tudo como novo: não diz nada sobre a taxa
+        if previous is None:
+            return
+        elapsed = max(now - previous, 1e-3)
+        observed = new_listings / elapsed
+        self.rate = observed if self.rate is None else EWMA_ALPHA * observed + (1 - EWMA_ALPHA) * self.rate
+        interval = TARGET_NEW_PER_POLL / self.rate if self.rate > 0 else self.max_interval
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    def _backoff(self, error: Exception) -> float:
+        """Recuo exponencial com jitter (metade fixa, metade aleatória) após erros consecutivos"""
+        self.errors += 1
+        # Sem o limite no expoente, uma queda longa estoura o float (OverflowError)
+        delay = min(self.max_backoff, self.interval * 2 ** min(self.errors, MAX_BACKOFF_EXPONENT))
+        delay = random.uniform(delay / 2, delay)
+        if is_rate_limited(error):
+            delay = max(delay, retry_after(error) or 0.0)
+        return delay
+
+    @property
+    def rate_per_minute(self) -> Optional[float]:
+        """Taxa estimada de anúncios novos por minuto (None antes da estimativa)"""
+        return self.rate * 60 if self.rate is not None else None
+
+    def status(self) -> str:
+        """Resumo da taxa estimada e da próxima verificação"""
+        parts = []
+        if self.errors:
+            parts.append(f"recuo após {self.errors} erro(s)")
+        elif self.adaptive and self.rate is not None:
+            parts.append(f"taxa: {self.rate_per_minute:.1f} novos/min")
+        if self.next_poll_at is not None:
+            when = datetime.fromtimestamp(self.next_poll_at)
+            wait = max(0.0, self.next_poll_at - time.time())
+            parts.append(f"próxima verificação às {when.strftime('%H:%M:%S')} (em {wait:.0f}s)")
+        return ", ".join(parts)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Registro de Anúncios Já Vistos do Bot DreadmystDB
+Substitui o set de strings do TradeMonitor por uma estrutura limitada e persistente:
+IDs numéricos ficam em arrays ordenados (12 bytes por anúncio em memória), anúncios que não
+aparecem há mais de ttl segundos expiram, e o total é limitado a max_items (LRU).
+A versão persistente grava cada anúncio em um log binário, lido em milissegundos
+na inicialização, para que reiniciar o bot não gere alertas repetidos.
+"""
+
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, Optional
+
+# Padrões: um anúncio no site dura menos que isso, e 100 mil anúncios ocupam ~1,2 MB
+DEFAULT_MAX_ITEMS = 100_000
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Um anúncio visto de novo só tem o horário renovado (e regravado) após esse intervalo
+TOUCH_GRANULARITY = 3600
+# Intervalo mínimo entre duas varreduras de anúncios expirados
+EXPIRY_CHECK_INTERVAL = 60
+# Ao passar de max_items, remove os menos vistos até sobrar esta fração
+LRU_TRIM_RATIO = 0.9
+
+
+class SeenStore:
+    """
+    Conjunto limitado de IDs de anúncios já vistos (somente em memória)
+
+    Mesma interface usada do set original (in, add, discard, len, iteração) com IDs
+    em string; IDs não numéricos são aceitos, mas ficam em um dict à parte.
+    """
+
+    def __init__(self, max_items: int = DEFAULT_MAX_ITEMS, ttl: Optional[float] = DEFAULT_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        # IDs ordenados e o horário (epoch em segundos) em que cada um foi visto por último
+        self._ids = array('q')
+        self._seen_at = array('I')
+        self._other: Dict[str, int] = {}
+        self._next_expiry_check = 0.0
+        self.stats = {'expired': 0, 'evicted': 0}
+
+    @staticmethod
+    def _key(listing_id: str) -> Optional[int]:
+        return int(listing_id) if listing_id.isdigit() else None
+
+    def _index(self, key: int) -> int:
+        """Posição de key em _ids (-1 se não estiver)"""
+        i = bisect_left(self._ids, key)
+        if i < len(self._ids) and self._ids[i] == key:
+            return i
+        return -1
+
+    def __contains__(self, listing_id: str) -> bool:
+        key = self._key(listing_id)
+        if key is None:
+            return listing_id in self._other
+        return self._index(key) >= 0
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._other)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._ids:
+            yield str(key)
+        yield from self._other
+
+    def add(self, listing_id: str, now: Optional[float] = None) -> bool:
+        """
+        Marca um anúncio como visto (ou renova o horário de um já visto)
+
+        Returns:
+            True se o anúncio ainda não estava no registro
+        """
+        now = int(time.time() if now is None else now)
+        key = self._key(listing_id)
+        if key is None:
+            is_new = listing_id not in self._other
+            self._other[listing_id] = now
+            return is_new
+
+        i = bisect_left(self._ids, key)
+        if i < len(self._ids) and self._ids[i] == key:
+            if now - self._seen_at[i] >= TOUCH_GRANULARITY:
+                self._seen_at[i] = now
+                self._record(key, now)
+            return False
+
+        # Anúncios novos têm IDs maiores, então quase sempre é um append
+        self._ids.insert(i, key)
+        self._seen_at.insert(i, now)
+        self._record(key, now)
+        if len(self) > self.max_items or now >= self._next_expiry_check:
+            self.evict(now)
+        return True
+
+    def discard(self, listing_id: str):
+        """Remove um anúncio do registro, se estiver nele"""
+        key = self._key(listing_id)
+        if key is None:
+            self._other.pop(listing_id, None)
+            return
+        i = self._index(key)
+        if i >= 0:
+            del self._ids[i]
+            del self._seen_at[i]
+
+    def clear(self):
+        """Esvazia o registro"""
+        self._ids = array('q')
+        self._seen_at = array('I')
+        self._other.clear()
+
+    def evict(self, now: Optional[float] = None):
+        """Remove os anúncios expirados (ttl) e, acima de max_items, os vistos há mais tempo"""
+        now = int(time.time() if now is None else now)
+        self._next_expiry_check = now + EXPIRY_CHECK_INTERVAL
+
+        if self.ttl and self._seen_at and min(self._seen_at) < now - self.ttl:
+            cutoff = now - self.ttl
+            before = len(self._ids)
+            self._retain([seen_at >= cutoff for seen_at in self._seen_at])
+            self.stats['expired'] += before - len(self._ids)
+            self._other = {k: t for k, t in self._other.items() if t >= cutoff}
+
+        if len(self) > self.max_items:
+            target = int(self.max_items * LRU_TRIM_RATIO)
+            excess = len(self._ids) - target
+            if excess > 0:
+                # Descarta os excess anúncios vistos há mais tempo
+                oldest = sorted(range(len(self._ids)), key=self._seen_at.__getitem__)[:excess]
+                keep = [True] * len(self._ids)
+                for i in oldest:
+                    keep[i] = False
+                self._retain(keep)
+                self.stats['evicted'] += excess
+
+    def _retain(self, keep):
+        """Mantém apenas as posições marcadas em keep"""
+        self._ids = array('q', [key for key, ok in zip(self._ids, keep) if ok])
+        self._seen_at = array('I', [seen_at for seen_at, ok in zip(self._seen_at, keep) if ok])
+
+    def _record(self, key: int, seen_at: int):
+        """Gancho de persistência (sem efeito em memória)"""
+
+    def flush(self):
+        """Grava as alterações pendentes (sem efeito em memória)"""
+
+    def close(self):
+        """Libera os recursos do registro"""
+
+    def memory_bytes(self) -> int:
+        """Memória ocupada pelos arrays de IDs numéricos"""
+        return self._ids.buffer_info()[1] * self._ids.itemsize + \
+            self._seen_at.buffer_info()[1] * self._seen_at.itemsize
+
+
+class FileSeenStore(SeenStore):
+    """
+    Registro de anúncios vistos persistido em um log binário
+
+    Cada registro tem 16 bytes (ID e horário, int64 little-endian); um horário negativo
+    marca um anúncio removido com discard. O arquivo é lido
+    direto em um array: o trecho inicial, ordenado pela última compactação, vira o
+    registro sem parse; só os registros gravados depois dela são aplicados um a um.
+    Quando o log passa do dobro dos anúncios vivos, ele é reescrito.
+    """
+
+    RECORD = struct.Struct('<qq')
+    # Horário gravado por discard: o anúncio sai do registro ao carregar o log
+    TOMBSTONE = -1
+    # Abaixo disso o log nunca é compactado
+    COMPACT_MIN_RECORDS = 10_000
+
+    def __init__(self, path: str, max_items: int = DEFAULT_MAX_ITEMS, ttl: Optional[float] = DEFAULT_TTL):
+        super().__init__(max_items, ttl)
+        self.path = path
+        self._log = None
+        self._records = 0
+        self.load()
+
+    def load(self):
+        """Carrega o log (ignora um registro final incompleto, de uma gravação interrompida)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % self.RECORD.size
+        raw = array('q')
+        raw.frombytes(data[:usable])
+        if sys.byteorder == 'big':
+            raw.byteswap()
+        ids, seen_at = raw[0::2], raw[1::2]
+
+        sorted_end = next((i for i in range(1, len(ids)) if ids[i] <= ids[i - 1]), len(ids))
+        self._ids = ids[:sorted_end]
+        self._seen_at = array('I', seen_at[:sorted_end])
+        for key, key_seen_at in zip(ids[sorted_end:], seen_at[sorted_end:]):
+            self._apply(key, key_seen_at)
+
+        self._records = usable // self.RECORD.size
+        self.evict()
+        if usable != len(data) or self._needs_compaction() or len(ids) - sorted_end > self.COMPACT_MIN_RECORDS:
+            self.compact()
+
+    def _apply(self, key: int, seen_at: int):
+        """Aplica um registro do log (o horário mais recente de cada ID prevalece)"""
+        i = bisect_left(self._ids, key)
+        if seen_at < 0:
+            # Remoção: os IDs removidos já apareceram antes no log, nunca no trecho ordenado
+            if i < len(self._ids) and self._ids[i] == key:
+                del self._ids[i]
+                del self._seen_at[i]
+            return
+        if i < len(self._ids) and self._ids[i] == key:
+            self._seen_at[i] = max(self._seen_at[i], seen_at)
+        else:
+            self._ids.insert(i, key)
+            self._seen_at.insert(i, seen_at)
+
+    def _needs_compaction(self) -> bool:
+        return self._records > max(self.COMPACT_MIN_RECORDS, 2 * len(self._ids))
+
+    def _record(self, key: int, seen_at: int):
+        if self._log is None:
+            self._log = open(self.path, 'ab')
+        self._log.write(self.RECORD.pack(key, seen_at))
+        self._records += 1
+
+    def discard(self, listing_id: str):
+        key = self._key(listing_id)
+        if key is not None and self._index(key) >= 0:
+            self._record(key, self.TOMBSTONE)
+        super().discard(listing_id)
+
+    def flush(self):
+        if self._log is not None:
+            self._log.flush()
+        if self._needs_compaction():
+            self.compact()
+
+    def compact(self):
+        """Reescreve o log só com os anúncios vivos, em ordem de ID (troca atômica do arquivo)"""
+        self.close()
+        raw = array('q', bytes(16 * len(self._ids)))
+        raw[0::2] = self._ids
+        raw[1::2] = array('q', self._seen_at)
+        if sys.byteorder == 'big':
+            raw.byteswap()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            raw.tofile(f)
+        os.replace(tmp_path, self.path)
+        self._records = len(self._ids)
+
+    def clear(self):
+        super().clear()
+        self.compact()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def open_seen_store(path: Optional[str] = None, max_items: int = DEFAULT_MAX_ITEMS,
+                    ttl: Optional[float] = DEFAULT_TTL) -> SeenStore:
+    """Cria o registro de anúncios vistos: persistente se path for informado, senão em memória"""
+    if path:
+        return FileSeenStore(path, max_items, ttl)
+    return SeenStore(max_items, ttl)
@@ -0,0 +1,68 @@
+"""Fixtures comuns dos testes"""
+
+import json
+import random
+
+import pytest
+
+from bot import AFFIX_QUALITIES, Item, TradeMonitor
+
+# Vocabulário dos itens gerados: nomes e slots de todos os tipos e stats escritos de formas diferentes
+ITEM_NAMES = [
+    ("Godly Breastplate of the Dispatching Lion", "chest"), ("Holy Vestments of the Owl", "chest"),
+    ("Holy Gloves of the Bear", "hands"), ("Blessed Handwraps", "hands"), ("Holy Helmet of Wisdom", "head"),
+    ("Godly Coif", "head"), ("Radiant Sash", "waist"), ("Holy Leggings", "legs"), ("Godly Boots of Haste", "feet"),
+    ("Holy Ring of Fire", "ring"), ("Blessed Amulet", "necklace"), ("Godly Sword of Kings", "main hand"),
+    ("Holy Staff", "main hand"), ("Holy Barricade", "off hand"), ("Godly Shield of Dawn", "off hand"),
+    ("Holy Crossbow", "ranged"), ("Holy Trinket of Nothing", None),
+]
+ITEM_STATS = [
+    "+58 STR", "+12 Strength", "+40 AGI", "+33 Agility", "+25 INT", "+20 Intelligence", "+18 COU",
+    "+15 Courage", "+22 WIL", "+11 Willpower", "+9 Wpn Dmg", "+30 HP", "+15 Health", "+14 Fire Res",
+    "+9 Fire Resistance", "+6 Frost Res", "+5 Melee Crit", "+4 Spell Crit", "+12 Ranged Critical",
+    "+7 Block Rating", "+40 Meditate", "+3 Unknown Stat",
+]
+
+
+@pytest.fixture
+def make_monitor(tmp_path):
+    """
+    Cria monitores a partir de um config em memória (fechados no fim do teste)
+
+    O registro de vistos fica só em memória e os alertas são escritos na própria
+    verificação, para que nada seja gravado fora do tmp_path.
+    """
+    monitors = []
+
+    def make(config=None, monitor_class=TradeMonitor):
+        path = tmp_path / f"perfil{len(monitors)}.json"
+        path.write_text(json.dumps({"seen_file": "", "alert_async": False, **(config or {})}), encoding='utf-8')
+        monitor = monitor_class(str(path))
+        monitors.append(monitor)
+        return monitor
+
+    yield make
+    for monitor in monitors:
+        monitor.close()
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    """Itens variados (gerados com semente fixa), com stats repetidos, sem stats e sem preço"""
+    rng = random.Random(1234)
+    items = []
+    for i in range(600):
+        listing_id = str(100000 + i)
+        name, slot = rng.choice(ITEM_NAMES)
+        items.append(Item(
+            listing_id=listing_id,
+            name=name,
+            item_level=str(rng.randint(20, 25)),
+            stats=rng.sample(ITEM_STATS, rng.randint(0, 4)),
+            price=rng.choice([f"{rng.randint(1, 2000) * 1000:,}g", f"{rng.randint(1, 2000) * 1000:,}g", "?"]),
+            seller="teste",
+            time_left="1 day left",
+            slot=slot,
+            affix_quality=rng.choice([None, None] + AFFIX_QUALITIES)
+        ))
+    return items
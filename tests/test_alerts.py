@@ -0,0 +1,122 @@
+"""Filas dos destinos de alerta: políticas da fila cheia e escrita em lotes"""
+
+import json
+import time
+
+import pytest
+
+from alerts import AlertSink, JsonlSink
+
+
+class RecordingSink(AlertSink):
+    """Destino que guarda os lotes escritos (com uma espera opcional por lote)"""
+
+    kind = 'teste'
+
+    def __init__(self, delay=0.0, **options):
+        super().__init__(**options)
+        self.delay = delay
+        self.batches = []
+
+    def write_batch(self, records):
+        if self.delay:
+            time.sleep(self.delay)
+        self.batches.append(list(records))
+
+    @property
+    def written(self):
+        return [record for batch in self.batches for record in batch]
+
+
+def alert(i):
+    return {'name': f"item {i}", 'url': f"https://example.com/trade/{i}", 'message': f"alerta {i}"}
+
+
+def offer_all(sink, count):
+    return [sink.offer(alert(i)) for i in range(count)]
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        RecordingSink(policy='ignore')
+
+
+def test_drop_new_keeps_the_queued_alerts():
+    sink = RecordingSink(queue_size=2, policy='drop_new')
+    assert offer_all(sink, 4) == [True, True, False, False]
+    sink.drain()
+    assert [record['name'] for record in sink.written] == ['item 0', 'item 1']
+    assert sink.stats['dropped'] == 2 and sink.stats['sent'] == 2
+
+
+def test_drop_oldest_keeps_the_newest_alerts():
+    sink = RecordingSink(queue_size=2, policy='drop_oldest')
+    assert offer_all(sink, 4) == [True] * 4
+    sink.drain()
+    assert [record['name'] for record in sink.written] == ['item 2', 'item 3']
+    assert sink.stats['dropped'] == 2
+
+
+def test_coalesce_summarizes_the_overflow():
+    sink = RecordingSink(queue_size=2, policy='coalesce')
+    assert offer_all(sink, 5) == [True] * 5
+    assert sink.snapshot()['depth'] == 5
+    sink.drain()
+
+    first, second, summary = sink.written
+    assert [first['name'], second['name']] == ['item 0', 'item 1']
+    assert summary['coalesced'] == 3
+    assert summary['names'] == ['item 2', 'item 3', 'item 4']
+    assert summary['urls'] == [alert(i)['url'] for i in (2, 3, 4)]
+    assert sink.stats['coalesced'] == 3
+
+
+def test_coalesce_summary_lists_at_most_ten_names():
+    summary = AlertSink.summary_record([alert(i) for i in range(15)])
+    assert len(summary['names']) == 10
+    assert 'e mais 5' in summary['message']
+
+
+def test_block_without_thread_drops():
+    # Sem a thread, ninguém esvazia a fila: a verificação não pode ficar presa
+    sink = RecordingSink(queue_size=1, policy='block')
+    assert offer_all(sink, 2) == [True, False]
+
+
+def test_block_waits_for_the_thread():
+    sink = RecordingSink(delay=0.01, queue_size=1, policy='block')
+    sink.start()
+    assert offer_all(sink, 5) == [True] * 5
+    sink.close()
+    assert [record['name'] for record in sink.written] == [f"item {i}" for i in range(5)]
+    assert sink.stats['dropped'] == 0
+
+
+def test_drain_writes_in_batches():
+    sink = RecordingSink(batch_size=3)
+    offer_all(sink, 7)
+    sink.drain()
+    assert [len(batch) for batch in sink.batches] == [3, 3, 1]
+    assert sink.stats['batches'] == 3
+
+
+def test_write_errors_are_counted():
+    class FailingSink(RecordingSink):
+        def write_batch(self, records):
+            raise OSError("disco cheio")
+
+    sink = FailingSink()
+    offer_all(sink, 2)
+    sink.drain()
+    assert sink.stats['failed'] == 2 and sink.stats['sent'] == 0
+
+
+def test_jsonl_sink_writes_one_line_per_alert(tmp_path):
+    path = tmp_path / 'alertas.jsonl'
+    sink = JsonlSink(str(path), queue_size=1, policy='coalesce')
+    offer_all(sink, 3)
+    sink.close()
+    lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert len(lines) == 2
+    assert lines[0]['name'] == 'item 0' and 'message' not in lines[0]
+    assert lines[1]['coalesced'] == 2
@@ -0,0 +1,101 @@
+"""Arquivo histórico: gravação em lote (upsert) e consultas"""
+
+import pytest
+
+from archive import ItemArchive, parse_stat_condition
+from bot import Item
+
+NOW = 1_700_000_000.0
+
+
+def make_item(listing_id, name='Holy Breastplate', level='40', stats=('+40 Strength',), price='50,000g',
+              slot='chest', time_left='2d'):
+    return Item(listing_id=str(listing_id), name=name, item_level=level, stats=list(stats), price=price,
+                seller='vendedor', time_left=time_left, slot=slot)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ItemArchive(str(tmp_path / 'arquivo.db'))
+    yield archive
+    archive.close()
+
+
+def test_upsert_keeps_first_seen(archive):
+    archive.add(make_item(1, price='50,000g', time_left='2d'))
+    assert archive.flush(now=NOW) == 1
+    archive.add(make_item(1, price='40,000g', time_left='1d'))
+    archive.flush(now=NOW + 60)
+
+    [row] = archive.query()
+    assert (row['first_seen'], row['last_seen']) == (NOW, NOW + 60)
+    assert (row['price'], row['time_left']) == (40_000, '1d')
+    assert archive.summary()['items'] == 1
+
+
+def test_flush_without_pending_items(archive):
+    assert archive.flush(now=NOW) == 0
+
+
+def test_non_numeric_ids_are_not_archived(archive):
+    archive.add_many([make_item(1), make_item('abc')])
+    assert archive.flush(now=NOW) == 1
+
+
+def test_touch_last_batch(archive):
+    archive.add_many([make_item(1), make_item(2)])
+    archive.flush(now=NOW)
+    archive.touch_last_batch(now=NOW + 300)
+    assert {row['last_seen'] for row in archive.query()} == {NOW + 300}
+
+
+def test_duplicate_stats_are_summed(archive):
+    archive.add(make_item(1, stats=['+10 Strength', '+5 Strength', '+20 Fire Resistance']))
+    archive.flush(now=NOW)
+    [row] = archive.query()
+    assert row['stats'] == {'STR': 15, 'Fire Res': 20}
+
+
+def test_query_filters(archive):
+    archive.add_many([
+        make_item(1, name='Holy Breastplate', level='40', stats=['+40 Strength'], price='90,000g'),
+        make_item(2, name='Godly Breastplate', level='50', stats=['+45 Strength'], price='150,000g'),
+        make_item(3, name='Holy Gloves', level='35', stats=['+12 Agility'], price='20,000g', slot='hands'),
+        make_item(4, name='Holy Breastplate', level='45', stats=['+30 Strength'], price='60,000g'),
+    ])
+    archive.flush(now=NOW)
+
+    def ids(**conditions):
+        return sorted(row['listing_id'] for row in archive.query(**conditions))
+
+    assert ids(quality=5, slot='chest') == [1, 4]
+    assert ids(min_level=40, max_level=45) == [1, 4]
+    assert ids(max_price=90_000) == [1, 3, 4]
+    # Condições de stat com e sem slot/qualidade (os dois planos da consulta)
+    assert ids(stats=[('STR', '>=', 40)]) == [1, 2]
+    assert ids(slot='chest', stats=[('Strength', '>=', 40)]) == [1, 2]
+    assert ids(stats=[('STR', '>=', 30), ('STR', '<=', 40)]) == [1, 4]
+    assert ids(stats=[('AGI', '=', 12)]) == [3]
+
+
+def test_query_since_and_limit(archive):
+    archive.add(make_item(1))
+    archive.flush(now=NOW)
+    archive.add(make_item(2))
+    archive.flush(now=NOW + 100)
+
+    assert [row['listing_id'] for row in archive.query(since=NOW + 50)] == [2]
+    assert [row['listing_id'] for row in archive.query(limit=1)] == [2]
+    assert len(archive.query(limit=None)) == 2
+
+
+def test_query_rejects_invalid_operator(archive):
+    with pytest.raises(ValueError):
+        archive.query(stats=[('STR', '>', 10)])
+
+
+def test_parse_stat_condition():
+    assert parse_stat_condition('STR>=40') == ('STR', '>=', 40)
+    assert parse_stat_condition(' Fire Res = 20 ') == ('Fire Res', '=', 20)
+    with pytest.raises(ValueError):
+        parse_stat_condition('STR>40')
@@ -0,0 +1,37 @@
+"""Filtro compilado (CompiledFilter) contra a implementação de referência"""
+
+import pytest
+
+FILTER_CONFIGS = [
+    {},
+    {"stats": ["STR", "INT", "COU"], "slots": ["chest", "hands"]},
+    {"stats": ["STR", "INT", "COU"], "slots": ["chest", "hands"], "filter_mode": "OR"},
+    {"primary_stats": ["AGI", "STR"], "primary_stats_mode": "AND"},
+    {"primary_stats": ["AGI", "STR"], "primary_stats_mode": "OR", "stats": ["Fire Res", "HP"]},
+    {"primary_stats": ["INT"], "slots": ["head", "Helmet"], "affix_quality": ["Superior", "Exquisite"]},
+    {"stats": ["Resist Fire", "Ranged Critical", "Spell Crit"], "filter_mode": "or"},
+    {"slots": ["off hand", "shield", "ranged"], "stats": ["Crit"]},
+    {"affix_quality": ["Fine"]},
+    {"primary_stats": ["Courage", "Willpower"], "stats": ["Wpn Dmg"], "slots": ["main hand"], "filter_mode": "OR"},
+    {"stat_min": {"STR": 10, "Fire Res": 5}},
+    {"stats": ["Crit", "HP"], "filter_mode": "OR", "stat_min": {"HP": 20}},
+    {"score_weights": {"STR": 2, "Melee Crit": 5, "Resist Fire": 1}, "min_score": 60},
+    {"slots": ["chest"], "score_weights": {"INT": 1, "HP": 0.5}, "score_per_gold": True, "min_score": 1},
+]
+
+
+@pytest.mark.parametrize('config', FILTER_CONFIGS, ids=range(len(FILTER_CONFIGS)))
+def test_compiled_filter_matches_reference(make_monitor, corpus, config):
+    monitor = make_monitor(config)
+    for item in corpus:
+        assert monitor.item_matches_filters(item) == monitor.item_matches_filters_reference(item), \
+            (item.name, item.stats)
+
+
+def test_recompiles_when_config_changes(make_monitor, corpus):
+    monitor = make_monitor({'slots': ['chest']})
+    chest = {item.listing_id for item in corpus if monitor.item_matches_filters(item)}
+    monitor.config['slots'] = ['hands']
+    hands = {item.listing_id for item in corpus if monitor.item_matches_filters(item)}
+    assert chest and hands
+    assert not chest & hands
@@ -0,0 +1,87 @@
+"""Palavras-chave: KeywordMatcher (correspondência mais longa), normalize_stat e detect_slot"""
+
+import pytest
+
+import bot
+from bot import KeywordMatcher, TradeMonitor
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher([('fire', 'Fire'), ('fire res', 'Fire Res'), ('fire resistance', 'Fire Res'),
+                           ('res', 'Resist'), ('crit', 'Crit'), ('melee crit', 'Melee Crit'),
+                           ('ice', 'Frost'), ('ice', 'Gelo')])
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('fire', 'Fire'),
+    ('+12 fire res', 'Fire Res'),
+    ('fire resistance', 'Fire Res'),
+    ('melee crit chance', 'Melee Crit'),
+    ('crit', 'Crit'),
+    ('resolve', 'Resist'),
+    ('nothing here', None),
+    ('', None),
+])
+def test_longest_keyword_wins(matcher, text, expected):
+    assert matcher.search(text) == expected
+
+
+def test_overlapping_keywords_are_found(matcher):
+    # "res" começa dentro de "fire res"; a palavra mais longa vence mesmo depois de outra
+    assert matcher.search('res and fire res') == 'Fire Res'
+    assert matcher.search('crit then melee crit') == 'Melee Crit'
+
+
+def test_tie_goes_to_leftmost(matcher):
+    assert matcher.search('crit fire') == 'Crit'
+    assert matcher.search('fire crit') == 'Fire'
+    assert KeywordMatcher([('ab', 1), ('cd', 2)]).search('cd ab') == 2
+
+
+def test_first_value_of_repeated_keyword(matcher):
+    assert matcher.search('ice') == 'Frost'
+
+
+def test_keywords_with_regex_characters():
+    matcher = KeywordMatcher([('c++', 'C'), ('a.b', 'dot')])
+    assert matcher.search('c++ code') == 'C'
+    assert matcher.search('axb') is None
+    assert matcher.search('a.b') == 'dot'
+
+
+@pytest.mark.parametrize('stat, expected', [
+    ('+12 Strength', 'STR'),
+    ('STR', 'STR'),
+    ('Fire Resistance', 'Fire Res'),
+    ('Resist Fire', 'Fire Res'),
+    ('Ranged Critical', 'Ranged Crit'),
+    ('Block Rating', 'Block'),
+    ('Armor Value', 'Armor'),
+    ('Unknown Stat', 'Unknown Stat'),
+])
+def test_normalize_stat(stat, expected):
+    assert TradeMonitor.normalize_stat(stat) == expected
+
+
+def test_normalize_stat_is_memoized():
+    bot._NORMALIZED_STATS.clear()
+    assert TradeMonitor.normalize_stat('+40 Agility') == 'AGI'
+    assert bot._NORMALIZED_STATS['+40 Agility'] == 'AGI'
+    assert TradeMonitor.normalize_stat('+40 Agility') == 'AGI'
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Godly Breastplate of the Dispatching Lion', 'chest'),
+    ('Holy Gloves of the Bear', 'hands'),
+    ('Holy Crossbow', 'ranged'),
+    ('Godly Shield of Dawn', 'off hand'),
+    ('Holy Trinket of Nothing', None),
+])
+def test_detect_slot(make_monitor, name, expected):
+    monitor = make_monitor()
+    bot._DETECTED_SLOTS.clear()
+    assert monitor.detect_slot(name) == expected
+    # Segunda chamada vem da memória
+    assert bot._DETECTED_SLOTS[name] == expected
+    assert monitor.detect_slot(name) == expected
@@ -0,0 +1,206 @@
+"""Registro de ativações: corrida entre processos e ordem das validações em lote"""
+
+import hashlib
+import multiprocessing
+
+import pytest
+
+from license_registry import CachedLicenseRegistry, JsonLicenseRegistry, RequestRates, SqliteLicenseRegistry
+
+WORKERS = 4
+KEYS = 500
+
+
+def license_hash(i):
+    """Hash de licença sintético (mesmo formato do get_original_license_hash)"""
+    return hashlib.sha256(f"licenca-{i}".encode('utf-8')).hexdigest()
+
+
+def activation_race(task):
+    """Um worker da corrida de ativações (processo separado, como no gunicorn -w 4)"""
+    path, worker, shared = task
+    registry = SqliteLicenseRegistry(path, legacy_json=None)
+    won = []
+    for i in range(KEYS):
+        # Compartilhadas: as mesmas chaves em todos os processos; senão, exclusivas de cada um
+        key = license_hash(10 ** 8 + i if shared else worker * KEYS + i)
+        activated, _ = registry.activate(key, f"worker-{worker}")
+        if activated:
+            won.append(key)
+    registry.close()
+    return won
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    path = str(tmp_path / 'registro.db')
+    SqliteLicenseRegistry(path, legacy_json=None).close()
+    return path
+
+
+def test_shared_keys_have_one_winner(sqlite_path):
+    with multiprocessing.Pool(WORKERS) as pool:
+        won = pool.map(activation_race, [(sqlite_path, w, True) for w in range(WORKERS)])
+    winners = [key for keys in won for key in keys]
+    assert sorted(winners) == sorted(license_hash(10 ** 8 + i) for i in range(KEYS))
+
+    registry = SqliteLicenseRegistry(sqlite_path, legacy_json=None)
+    for worker, keys in enumerate(won):
+        for key in keys:
+            assert registry.lookup(key) == f"worker-{worker}"
+    assert registry.count() == KEYS
+
+
+def test_distinct_keys_are_not_lost(sqlite_path):
+    with multiprocessing.Pool(WORKERS) as pool:
+        won = pool.map(activation_race, [(sqlite_path, w, False) for w in range(WORKERS)])
+    assert [len(keys) for keys in won] == [KEYS] * WORKERS
+
+    registry = SqliteLicenseRegistry(sqlite_path, legacy_json=None)
+    assert registry.count() == WORKERS * KEYS
+    assert sum(registry.activations_per_day(30).values()) == WORKERS * KEYS
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def registry(request, tmp_path):
+    if request.param == 'json':
+        return JsonLicenseRegistry(str(tmp_path / 'registro.json'))
+    return SqliteLicenseRegistry(str(tmp_path / 'registro.db'), legacy_json=None)
+
+
+def test_validate_many_applies_entries_in_order(registry):
+    a, b = license_hash(1), license_hash(2)
+    results = registry.validate_many([
+        (a, 'maquina-1', 'check'),
+        (a, 'maquina-1', 'activate'),
+        (a, 'maquina-1', 'check'),
+        (a, 'maquina-2', 'activate'),
+        (b, 'maquina-2', 'check'),
+    ])
+    assert results == [None, 'maquina-1', 'maquina-1', 'maquina-1', None]
+    assert registry.lookup(a) == 'maquina-1'
+    assert registry.lookup(b) is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('LICENSE_REGISTRY_PATH', str(tmp_path / 'servidor.db'))
+    import license_server
+
+    backend = SqliteLicenseRegistry(str(tmp_path / 'registro.db'), legacy_json=None)
+    monkeypatch.setattr(license_server, 'registry', CachedLicenseRegistry(backend))
+    return license_server.app.test_client()
+
+
+def test_batch_check_sees_earlier_activation(client):
+    response = client.post('/validate/batch', json={'requests': [
+        {'license_key': 'chave-1', 'machine_id': 'maquina-1', 'action': 'check'},
+        {'license_key': 'chave-1', 'machine_id': 'maquina-1', 'action': 'activate'},
+        {'license_key': 'chave-1', 'machine_id': 'maquina-1', 'action': 'check'},
+        {'license_key': 'chave-1', 'machine_id': 'maquina-2', 'action': 'check'},
+        {'license_key': 'chave-1', 'machine_id': 'maquina-2', 'action': 'activate'},
+        {'license_key': 'chave-2', 'action': 'check'},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results[0] == {'valid': True, 'message': 'Licença disponível para ativação', 'already_activated': False}
+    assert results[1]['activated'] is True
+    assert results[2] == {'valid': True, 'message': 'Licença válida para esta máquina', 'already_activated': True}
+    assert results[3]['valid'] is False and results[3]['already_activated'] is True
+    assert results[4]['valid'] is False and results[4]['already_activated'] is True
+    assert results[5] == {'valid': False, 'message': 'Dados incompletos'}
+
+    single = client.post('/validate', json={'license_key': 'chave-1', 'machine_id': 'maquina-1'})
+    assert single.get_json()['already_activated'] is True
+
+
+class CountingRegistry(SqliteLicenseRegistry):
+    """Backend que conta as consultas que chegam ao banco"""
+
+    def __init__(self, *args, **kwargs):
+        self.lookups = 0
+        self.generations = 0
+        super().__init__(*args, **kwargs)
+
+    def lookup(self, license_hash):
+        self.lookups += 1
+        return super().lookup(license_hash)
+
+    def generation(self):
+        self.generations += 1
+        return super().generation()
+
+
+def test_cached_hit_skips_backend(tmp_path):
+    backend = CountingRegistry(str(tmp_path / 'registro.db'), legacy_json=None)
+    backend.activate(license_hash(1), 'maquina-1')
+    cached = CachedLicenseRegistry(backend, check_interval=60)
+
+    assert cached.lookup(license_hash(1)) == 'maquina-1'
+    assert cached.lookup(license_hash(2)) is None
+    lookups, generations = backend.lookups, backend.generations
+    for _ in range(100):
+        assert cached.lookup(license_hash(1)) == 'maquina-1'
+        assert cached.lookup(license_hash(2)) is None
+    assert (backend.lookups, backend.generations) == (lookups, generations)
+    assert cached.cache.hits == 200
+
+
+def test_cache_survives_other_threads(tmp_path):
+    import threading
+
+    backend = SqliteLicenseRegistry(str(tmp_path / 'registro.db'), legacy_json=None)
+    backend.activate(license_hash(1), 'maquina-1')
+    cached = CachedLicenseRegistry(backend, check_interval=0)
+    cached.lookup(license_hash(1))
+
+    threads = [threading.Thread(target=cached.lookup, args=(license_hash(1),)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cached.invalidations == 0
+    assert cached.cache.hits == 4
+
+
+def test_cache_sees_writes_of_other_processes(tmp_path):
+    path = str(tmp_path / 'registro.db')
+    cached = CachedLicenseRegistry(SqliteLicenseRegistry(path, legacy_json=None), check_interval=0)
+    assert cached.lookup(license_hash(1)) is None
+
+    # Outra conexão faz o papel de outro worker do gunicorn
+    SqliteLicenseRegistry(path, legacy_json=None).activate(license_hash(1), 'maquina-1')
+    assert cached.lookup(license_hash(1)) == 'maquina-1'
+    assert cached.invalidations == 1
+
+
+def test_request_rates_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'registro.db')
+    workers = [CachedLicenseRegistry(SqliteLicenseRegistry(path, legacy_json=None)) for _ in range(4)]
+    for worker in workers:
+        for i in range(10):
+            worker.lookup(license_hash(i))
+        worker.activate(license_hash(100), 'maquina-1')
+    generation = workers[0].backend.generation()
+    # Cada worker grava as suas a cada RATE_FLUSH_SECONDS; aqui, sem esperar
+    for worker in workers:
+        worker.rates.flush()
+
+    for worker in workers:
+        snapshot = worker.rates.snapshot()
+        assert snapshot['last_60_minutes'] == {'check': 40, 'activate': 4}
+        assert snapshot['current_minute']['check'] + snapshot['last_minute']['check'] == 40
+    # Contar requisições não muda a geração (não invalida os caches)
+    assert workers[0].backend.generation() == generation
+
+
+def test_request_rates_flush_on_interval(tmp_path):
+    backend = SqliteLicenseRegistry(str(tmp_path / 'registro.db'), legacy_json=None)
+    rates = RequestRates(backend, flush_interval=0)
+    rates.add('check', 3)
+    assert sum(count for _, _, count in backend.requests_since(0)) == 3
+    rates = RequestRates(backend, flush_interval=60)
+    rates.add('check', 2)
+    assert sum(count for _, _, count in backend.requests_since(0)) == 3
+    rates.flush()
+    assert sum(count for _, _, count in backend.requests_since(0)) == 5
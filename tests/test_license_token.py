@@ -0,0 +1,105 @@
+"""Token de validação da licença: assinatura, chave, máquina e vencimento"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import license
+from license import LicenseManager
+
+KEY = "CHAVE-DE-TESTE"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = LicenseManager(license_file=str(tmp_path / 'license.key'))
+    manager.token_file = str(tmp_path / 'license.token')
+    manager.lock_file = str(tmp_path / 'license.lock')
+    manager.registry_file = str(tmp_path / 'license.registry')
+    return manager
+
+
+def license_data(days=30):
+    expiration = datetime.now() + timedelta(days=days)
+    return {"customer_id": "teste", "expiration_date": expiration.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def read_token(manager):
+    with open(manager.token_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_token(manager, token):
+    with open(manager.token_file, 'w', encoding='utf-8') as f:
+        json.dump(token, f)
+
+
+def test_saved_token_loads(manager):
+    data = license_data()
+    assert manager.save_validation_token(KEY, data)
+    assert manager.load_validation_token(KEY) == data
+
+
+def test_missing_token(manager):
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_tampered_token_is_rejected(manager):
+    manager.save_validation_token(KEY, license_data())
+    token = read_token(manager)
+    token["data"]["expires_at"] += 365 * 24 * 3600
+    write_token(manager, token)
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_corrupted_token_is_rejected(manager):
+    with open(manager.token_file, 'w', encoding='utf-8') as f:
+        f.write('{"data": ')
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_token_is_bound_to_key_and_machine(manager, monkeypatch):
+    manager.save_validation_token(KEY, license_data())
+    assert manager.load_validation_token(KEY + "-OUTRA") is None
+    monkeypatch.setattr(manager, 'get_machine_id', lambda: "outra-maquina")
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_token_expires_after_ttl(manager, monkeypatch):
+    manager.save_validation_token(KEY, license_data())
+    now = time.time()
+    monkeypatch.setattr(license.time, 'time', lambda: now + manager.token_ttl - 1)
+    assert manager.load_validation_token(KEY) is not None
+    monkeypatch.setattr(license.time, 'time', lambda: now + manager.token_ttl + 1)
+    assert manager.load_validation_token(KEY) is None
+    # Relógio voltou para antes da validação: o token também não vale
+    monkeypatch.setattr(license.time, 'time', lambda: now - 60)
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_token_expires_with_the_license(manager):
+    manager.save_validation_token(KEY, license_data(days=-1))
+    assert manager.load_validation_token(KEY) is None
+
+
+def test_load_license_uses_the_token(manager, monkeypatch):
+    with open(manager.license_file, 'w', encoding='utf-8') as f:
+        f.write(KEY + "\n")
+    manager.save_validation_token(KEY, license_data())
+
+    def validate(*args, **kwargs):
+        raise AssertionError("validação completa com token válido")
+
+    monkeypatch.setattr(manager, 'validate_license_key', validate)
+    is_valid, message = manager.load_license()
+    assert is_valid and manager.validated_from_cache
+    assert manager.license_data["customer_id"] == "teste"
+
+    manager.clear_validation_token()
+    manager.clear_validation_token()
+    monkeypatch.setattr(manager, 'validate_license_key',
+                        lambda key, return_activated_key=False: (False, "Licença inválida", None))
+    assert manager.load_license() == (False, "Licença inválida")
+    assert not manager.validated_from_cache
@@ -0,0 +1,86 @@
+"""Log da interface (LogBuffer): anel de linhas e linhas apagadas do widget"""
+
+import random
+import threading
+
+import pytest
+
+pytest.importorskip('tkinter')
+
+from bot_gui import LogBuffer
+
+
+class FakeWidget:
+    """Aplica o resultado de drain como o widget de texto do Tk (insere no fim, apaga do início)"""
+
+    def __init__(self):
+        self.lines = []
+
+    def apply(self, drained):
+        text, trim = drained
+        del self.lines[:trim]
+        self.lines.extend(text.split("\n")[:-1])
+
+
+def test_drain_without_messages():
+    assert LogBuffer(10).drain() == ("", 0)
+
+
+def test_appends_until_full():
+    log = LogBuffer(max_lines=3)
+    log.append("um")
+    log.append("dois\ntrês")
+    assert log.drain() == ("um\ndois\ntrês\n", 0)
+    assert log.widget_lines == 3
+
+
+def test_trims_oldest_lines():
+    log = LogBuffer(max_lines=3)
+    log.append("a\nb\nc")
+    log.drain()
+    log.append("d\ne")
+    assert log.drain() == ("d\ne\n", 2)
+    assert log.text() == "c\nd\ne\n"
+    assert log.widget_lines == 3
+
+
+def test_burst_larger_than_ring():
+    log = LogBuffer(max_lines=3)
+    log.append("a\nb")
+    log.drain()
+    for i in range(10):
+        log.append(f"linha {i}")
+    text, trim = log.drain()
+    assert text == "linha 7\nlinha 8\nlinha 9\n"
+    assert trim == 2
+
+
+def test_widget_follows_the_model():
+    rng = random.Random(7)
+    log = LogBuffer(max_lines=50)
+    widget = FakeWidget()
+    counter = 0
+    for _ in range(300):
+        for _ in range(rng.randint(0, 8)):
+            lines = rng.randint(1, 30)
+            log.append("\n".join(f"linha {counter + i}" for i in range(lines)))
+            counter += lines
+        widget.apply(log.drain())
+        assert len(widget.lines) <= log.max_lines
+        assert "".join(line + "\n" for line in widget.lines) == log.text()
+
+
+def test_append_from_threads():
+    log = LogBuffer(max_lines=10_000)
+
+    def worker(n):
+        for i in range(500):
+            log.append(f"{n}:{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    text, trim = log.drain()
+    assert len(text.splitlines()) == 2000 and trim == 0
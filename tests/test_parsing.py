@@ -0,0 +1,184 @@
+"""Parse dos cards: streaming contra a página inteira e verificações ignoradas (HTTP 304 e hash)"""
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import bot
+from bot import iter_card_fragments, listing_region_hash
+
+CARD = """<div class="entity-card" id="listing-{listing_id}">
+  <div class="entity-icon border-2 quality-legendary-border"><img alt="{name}" src="/icon.png" /></div>
+  <div class="flex-1 min-w-0">
+    <a class="block" href="/trade/{listing_id}">
+      <h3 class="font-medium quality-legendary truncate hover:underline">
+        {name}
+      </h3>
+</a>    <p class="text-text-muted text-sm">
+      iLvl {level}
+          {spans}
+      <span class="mx-1">&bull;</span>
+      by <span class="text-text-secondary">{seller}</span>
+    </p>
+  </div>
+  <div class="text-right flex-shrink-0">
+    <div class="text-gold font-medium">{price}</div>
+    <div class="text-text-muted text-xs">
+      1 day left
+    </div>
+  </div>
+</div>"""
+
+LISTINGS = [
+    (13158, 'Godly Breastplate of the Dispatching Lion', 25, ['+9 Wpn Dmg', '+58 STR', '+58 COU'], '1,800,000g'),
+    (13159, 'Holy Gloves of the Bear', 30, ['Exquisite', '+12 AGI'], '45,000g'),
+    (13160, 'Holy Crossbow', 40, ['+20 Crit'], '1.2M'),
+]
+
+
+def card(listing_id, name, level, stats, price, seller='vendedor'):
+    spans = "\n          ".join(
+        f'<span class="text-gold ml-1">{stat}</span>' if not stat.startswith('+')
+        else f'<span class="text-orange-400 ml-1">{stat}</span>'
+        for stat in stats)
+    return CARD.format(listing_id=listing_id, name=name, level=level, spans=spans, seller=seller, price=price)
+
+
+def page(listings=LISTINGS, token='abc'):
+    """Página de trade com navegação, scripts e os cards (token muda a cada resposta no site)"""
+    cards = "\n".join(card(*listing) for listing in listings)
+    return (f'<html><head><meta name="csrf-token" content="{token}"><script>var x = "<div>";</script></head>'
+            f'<body><nav><div class="menu"><div>Trade</div></div></nav>'
+            f'<div class="grid">\n{cards}\n</div><footer><div>rodapé</div></footer></body></html>')
+
+
+class TradeServer:
+    """Servidor local da página de trade (ETag do corpo e 304 para GETs condicionais, se etag=True)"""
+
+    def __init__(self, html, etag=True):
+        self.html = html
+        self.etag = etag
+        self.statuses = []
+
+    def __enter__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.html.encode('utf-8')
+                etag = f'"{hashlib.md5(body).hexdigest()}"' if server.etag else None
+                status = 304 if etag and self.headers.get('If-None-Match') == etag else 200
+                server.statuses.append(status)
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                if status == 304:
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/trade"
+
+
+BACKENDS = ['bs4'] + (['lxml'] if bot.HAS_LXML else [])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 100_000])
+def test_fragments_do_not_depend_on_chunks(chunk_size):
+    html = page()
+    chunks = [html[i:i + chunk_size] for i in range(0, len(html), chunk_size)]
+    fragments = list(iter_card_fragments(chunks))
+    assert fragments == [card(*listing) for listing in LISTINGS]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_stream_parse_matches_full_page(make_monitor, backend):
+    monitor = make_monitor({'parser': backend})
+    html = page()
+    expected = monitor.parse_items(html)
+    streamed = [monitor.parse_card_fragment(fragment) for fragment in iter_card_fragments([html])]
+    assert streamed == expected
+    assert [item.listing_id for item in expected] == [str(listing[0]) for listing in LISTINGS]
+
+    breastplate, gloves, crossbow = expected
+    assert (breastplate.slot, breastplate.item_level, breastplate.price) == ('chest', '25', '1,800,000g')
+    assert breastplate.stats == ('+9 Wpn Dmg', '+58 STR', '+58 COU')
+    assert (gloves.slot, gloves.affix_quality, gloves.stats) == ('hands', 'Exquisite', ('+12 AGI',))
+    # Preço fora do formato usual: mantido como no site
+    assert (crossbow.slot, crossbow.price) == ('ranged', '1.2M')
+
+
+def test_stream_items_matches_fetch_items(make_monitor):
+    with TradeServer(page(), etag=False) as server:
+        monitor = make_monitor({'skip_unchanged': False})
+        monitor.BASE_URL = server.url
+        assert list(monitor.stream_items()) == monitor.fetch_items()
+
+
+def test_listing_hash_ignores_the_rest_of_the_page():
+    assert listing_region_hash(page(token='a')) == listing_region_hash(page(token='b'))
+    assert listing_region_hash(page()) != listing_region_hash(page(LISTINGS[1:]))
+    assert listing_region_hash('<html></html>') is None
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_not_modified_skips_the_page(make_monitor, stream):
+    with TradeServer(page()) as server:
+        monitor = make_monitor()
+        monitor.BASE_URL = server.url
+        fetch = (lambda: list(monitor.stream_items())) if stream else monitor.fetch_items
+        assert len(fetch()) == len(LISTINGS)
+        assert not monitor.last_fetch_unchanged
+
+        assert fetch() == []
+        assert monitor.last_fetch_unchanged
+        assert server.statuses == [200, 304]
+        assert monitor.poll_stats['not_modified'] == 1
+
+
+def test_same_listings_skip_parse(make_monitor):
+    with TradeServer(page(token='a'), etag=False) as server:
+        monitor = make_monitor()
+        monitor.BASE_URL = server.url
+        assert len(monitor.fetch_items()) == len(LISTINGS)
+
+        server.html = page(token='b')
+        assert monitor.fetch_items() == []
+        assert monitor.last_fetch_unchanged
+        assert monitor.poll_stats['same_hash'] == 1
+
+        server.html = page(LISTINGS[1:], token='c')
+        assert len(monitor.fetch_items()) == len(LISTINGS) - 1
+        assert not monitor.last_fetch_unchanged
+
+
+def test_filter_change_rechecks_page(make_monitor):
+    with TradeServer(page()) as server:
+        monitor = make_monitor()
+        monitor.BASE_URL = server.url
+        monitor.fetch_items()
+        assert monitor.fetch_items() == []
+
+        monitor.config['slots'] = ['chest']
+        assert len(monitor.fetch_items()) == len(LISTINGS)
+        # Sem If-None-Match: os validadores eram dos filtros antigos
+        assert server.statuses == [200, 304, 200]
@@ -0,0 +1,103 @@
+"""Avaliação de vários perfis de uma vez (BatchMatcher e ProfileIndex) contra CompiledFilter.matches"""
+
+import pytest
+
+from batch_match import BATCH_MIN_PROFILES, HAS_NUMPY, BatchMatcher, match_profiles
+from profile_index import ProfileIndex, match_group
+
+# Buscas salvas de vários usuários: perfis repetidos e perfis que o índice não consegue publicar
+PROFILES = [
+    {"slots": ["chest"], "stats": ["STR"]},
+    {"slots": ["chest"], "stats": ["STR"]},
+    {"slots": ["hands", "head"], "primary_stats": ["AGI"]},
+    {"primary_stats": ["INT", "WIL"], "primary_stats_mode": "AND"},
+    {"stats": ["Fire Res", "Crit"], "affix_quality": ["Superior", "Exquisite"]},
+    {"slots": ["main hand"], "stats": ["Wpn Dmg"], "filter_mode": "OR"},
+    {"affix_quality": ["Fine"], "stat_min": {"HP": 20}},
+    {"stat_min": {"STR": 30}},
+    {"slots": ["off hand", "ranged"]},
+    {"score_weights": {"STR": 2, "Melee Crit": 5}, "min_score": 60},
+    {"slots": ["chest"], "score_weights": {"INT": 1, "HP": 0.5}, "score_per_gold": True, "min_score": 0.01},
+    {},
+]
+
+needs_numpy = pytest.mark.skipif(not HAS_NUMPY, reason="numpy não está instalado")
+
+
+@pytest.fixture
+def monitors(make_monitor):
+    return [make_monitor(config) for config in PROFILES]
+
+
+def expected_matches(monitors, items):
+    """Para cada perfil, os listing_ids aceitos item a item"""
+    return [{item.listing_id for item in items if monitor.get_compiled_filter().matches(item)}
+            for monitor in monitors]
+
+
+@needs_numpy
+def test_batch_matrix_matches_compiled_filter(monitors, corpus):
+    filters = [monitor.get_compiled_filter() for monitor in monitors]
+    matrix = BatchMatcher(filters).match_matrix(corpus)
+    assert matrix.shape == (len(corpus), len(filters))
+    for i, item in enumerate(corpus):
+        assert matrix[i].tolist() == [compiled.matches(item) for compiled in filters], (item.name, item.stats)
+
+
+@needs_numpy
+def test_batch_sparse_matches(monitors, corpus):
+    filters = [monitor.get_compiled_filter() for monitor in monitors]
+    sparse = BatchMatcher(filters).match(corpus)
+    expected = {i: [j for j, compiled in enumerate(filters) if compiled.matches(item)]
+                for i, item in enumerate(corpus)}
+    assert sparse == {i: profiles for i, profiles in expected.items() if profiles}
+
+
+@needs_numpy
+def test_match_profiles(monitors, corpus):
+    assert match_profiles(monitors, corpus) == expected_matches(monitors, corpus)
+    # Poucos perfis ou nenhum item: não compensa montar o lote
+    assert match_profiles(monitors[:BATCH_MIN_PROFILES - 1], corpus) is None
+    assert match_profiles(monitors, []) is None
+
+
+def test_index_matches_compiled_filter(monitors, corpus):
+    index = ProfileIndex(monitors)
+    assert index.unindexed
+    for item in corpus:
+        expected = [monitor for monitor in monitors if monitor.get_compiled_filter().matches(item)]
+        assert index.matches(item) == expected, (item.name, item.stats)
+        assert set(expected) <= index.candidates(item)
+    # O índice só serve se descartar perfis sem avaliá-los
+    assert index.stats['candidates'] < len(corpus) * len(monitors)
+
+
+def test_index_add_and_remove(monitors, corpus):
+    index = ProfileIndex(monitors[:4])
+    for monitor in monitors[4:]:
+        index.add(monitor)
+    index.remove(monitors[0])
+    index.remove(monitors[-1])
+    assert len(index) == len(monitors) - 2 and monitors[0] not in index
+
+    remaining = monitors[1:-1]
+    assert index.match_items(corpus) == dict(zip(remaining, expected_matches(remaining, corpus)))
+    assert not any(monitors[0] in posting for posting in index.postings.values())
+
+
+def test_index_follows_config_changes(monitors, corpus):
+    index = ProfileIndex(monitors)
+    monitors[0].config['slots'] = ['feet']
+    monitors[-1].config['stats'] = ['Meditate']
+    matched = index.match_items(corpus)
+    assert [matched[monitor] for monitor in monitors] == expected_matches(monitors, corpus)
+
+
+def test_match_group(monitors, corpus):
+    index = ProfileIndex(monitors)
+    # Poucos itens passam pelo índice; muitos (com NumPy), pela avaliação em lote
+    for items in (corpus[:20], corpus):
+        matched, evaluated = match_group(index, monitors, items)
+        assert matched == expected_matches(monitors, items)
+        assert evaluated == {item.listing_id for item in items}
+    assert match_group(index, monitors[:BATCH_MIN_PROFILES - 1], corpus) is None
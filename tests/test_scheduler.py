@@ -0,0 +1,62 @@
+"""Agendador de verificações: recuo em erros e Retry-After"""
+
+import requests
+
+from scheduler import PollScheduler, is_rate_limited, retry_after
+
+
+def http_error(status: int, retry_after_header: str = None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    if retry_after_header is not None:
+        response.headers['Retry-After'] = retry_after_header
+    return requests.HTTPError(response=response)
+
+
+def test_fixed_interval_without_errors():
+    scheduler = PollScheduler(check_interval=30)
+    assert scheduler.record_poll(5, now=0) == 30
+    assert scheduler.record_poll(0, now=30) == 30
+
+
+def test_backoff_grows_and_is_capped():
+    scheduler = PollScheduler(check_interval=10, max_backoff=600)
+    error = requests.ConnectionError()
+    delays = [scheduler.record_poll(0, error, now=i) for i in range(8)]
+    # Jitter: entre metade e o total de interval * 2 ** erros, limitado a max_backoff
+    for errors, delay in enumerate(delays, start=1):
+        full = min(600, 10 * 2 ** errors)
+        assert full / 2 <= delay <= full
+
+
+def test_backoff_after_many_errors_does_not_overflow():
+    scheduler = PollScheduler(check_interval=30, max_backoff=600)
+    error = requests.ConnectionError()
+    for i in range(2000):
+        delay = scheduler.record_poll(0, error, now=i)
+    assert scheduler.errors == 2000
+    assert 300 <= delay <= 600
+
+
+def test_success_resets_backoff():
+    scheduler = PollScheduler(check_interval=30)
+    for i in range(5):
+        scheduler.record_poll(0, requests.ConnectionError(), now=i)
+    assert scheduler.record_poll(0, now=10) == 30
+    assert scheduler.errors == 0
+
+
+def test_rate_limited_waits_for_retry_after():
+    error = http_error(429, '120')
+    assert is_rate_limited(error)
+    assert retry_after(error) == 120
+    scheduler = PollScheduler(check_interval=10)
+    assert scheduler.record_poll(0, error, now=0) == 120
+
+
+def test_retry_after_ignored_for_other_errors():
+    error = http_error(503, '900')
+    assert not is_rate_limited(error)
+    scheduler = PollScheduler(check_interval=10, max_backoff=600)
+    assert scheduler.record_poll(0, error, now=0) <= 20
+    assert retry_after(http_error(429, 'amanhã')) is None
@@ -0,0 +1,130 @@
+"""Registro de anúncios vistos: persistência, remoções, compactação, TTL e LRU"""
+
+import os
+import time
+
+import pytest
+
+import seen_store
+from seen_store import FileSeenStore, SeenStore, open_seen_store
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'vistos.seen')
+
+
+def test_behaves_like_a_set():
+    store = SeenStore()
+    assert store.add('10', now=NOW)
+    assert store.add('abc', now=NOW)
+    assert not store.add('10', now=NOW)
+    assert '10' in store and 'abc' in store and '11' not in store
+    assert sorted(store) == ['10', 'abc']
+    store.discard('10')
+    store.discard('abc')
+    store.discard('999')
+    assert len(store) == 0
+
+
+def test_persists_across_restarts(path):
+    store = FileSeenStore(path)
+    for listing_id in ('30', '10', '20'):
+        store.add(listing_id, now=NOW)
+    store.close()
+
+    reloaded = FileSeenStore(path, ttl=None)
+    assert sorted(reloaded, key=int) == ['10', '20', '30']
+    reloaded.close()
+
+
+def test_tombstone_removes_on_reload(path):
+    store = FileSeenStore(path, ttl=None)
+    store.add('10', now=NOW)
+    store.add('20', now=NOW)
+    store.discard('10')
+    store.discard('99')  # Nunca visto: não grava remoção
+    store.close()
+    assert os.path.getsize(path) == 3 * FileSeenStore.RECORD.size
+
+    reloaded = FileSeenStore(path, ttl=None)
+    assert '10' not in reloaded and '20' in reloaded
+    reloaded.close()
+
+
+def test_ignores_truncated_last_record(path):
+    store = FileSeenStore(path, ttl=None)
+    store.add('10', now=NOW)
+    store.add('20', now=NOW)
+    store.close()
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    reloaded = FileSeenStore(path, ttl=None)
+    assert sorted(reloaded, key=int) == ['10', '20']
+    reloaded.close()
+    # A carga reescreve o log sem o registro incompleto
+    assert os.path.getsize(path) == 2 * FileSeenStore.RECORD.size
+
+
+def test_compacts_when_log_grows(path, monkeypatch):
+    monkeypatch.setattr(FileSeenStore, 'COMPACT_MIN_RECORDS', 4)
+    store = FileSeenStore(path, ttl=None)
+    for i in range(4):
+        store.add(str(i), now=NOW)
+    for i in range(3):
+        store.discard(str(i))
+    store.flush()
+    store.close()
+    # 7 registros para 1 anúncio vivo: reescrito só com ele
+    assert os.path.getsize(path) == FileSeenStore.RECORD.size
+
+    reloaded = FileSeenStore(path, ttl=None)
+    assert list(reloaded) == ['3']
+    reloaded.close()
+
+
+def test_touch_keeps_most_recent_time(path):
+    # A carga expira com o relógio real: o anúncio só continua pelo horário renovado
+    now = int(time.time())
+    store = FileSeenStore(path, ttl=1.5 * seen_store.TOUCH_GRANULARITY)
+    store.add('10', now=now - 2 * seen_store.TOUCH_GRANULARITY)
+    store.add('10', now=now - seen_store.TOUCH_GRANULARITY)
+    store.close()
+
+    reloaded = FileSeenStore(path, ttl=1.5 * seen_store.TOUCH_GRANULARITY)
+    assert '10' in reloaded
+    reloaded.close()
+
+
+def test_ttl_expires_old_listings():
+    store = SeenStore(ttl=100)
+    store.add('1', now=NOW)
+    store.add('x', now=NOW)
+    store.add('2', now=NOW + 50)
+    store.evict(now=NOW + 120)
+    assert '1' not in store and 'x' not in store and '2' in store
+    assert store.stats['expired'] == 1
+
+
+def test_lru_evicts_least_recently_seen():
+    store = SeenStore(max_items=10, ttl=None)
+    for i in range(10):
+        store.add(str(i), now=NOW + i)
+    # O anúncio 0 é visto de novo: passa a ser um dos mais recentes
+    store.add('0', now=NOW + 20 + seen_store.TOUCH_GRANULARITY)
+    store.add('10', now=NOW + 30 + seen_store.TOUCH_GRANULARITY)
+
+    assert len(store) == int(10 * seen_store.LRU_TRIM_RATIO)
+    assert '0' in store and '10' in store
+    assert '1' not in store and '2' not in store
+    assert store.stats['evicted'] == 2
+
+
+def test_open_seen_store(path):
+    assert type(open_seen_store()) is SeenStore
+    store = open_seen_store(path)
+    assert isinstance(store, FileSeenStore)
+    store.close()